@@ -0,0 +1,243 @@
+from cache_file import load_cache, save_cache
+from post import GitPostsRepository, PostData
+from rule_keeper import CONTENT, CORPUS, RuleCheckResults, requires
+from tokens import PostTokens
+from hashlib import sha1
+from typing import Iterable, Iterator, NamedTuple
+from urllib.parse import unquote, urlsplit
+import os
+import re
+
+site_hosts = ['dev.solita.fi']
+asset_reference_pattern = re.compile(
+    r'(?:https?://([^/\s()"\'<>]+)|(?<![\w.~%:/-]))(/img/(?:[^\s()"\'<>]|\([^\s()"\'<>]*\))+)'
+)
+site_text_files_extensions = ('.md', '.markdown', '.html', '.xml', '.yml', '.json', '.scss', '.css', '.js')
+skipped_site_directories = ['img', '_site', 'rule-keeper', 'node_modules', 'vendor']
+
+
+def find_asset_references(lines: Iterable[str]) -> list[str]:
+    references = {}
+
+    for line in lines:
+        if '/img/' not in line:
+            continue
+        for host, reference in asset_reference_pattern.findall(line):
+            if host and host not in site_hosts:
+                continue
+            references[unquote(urlsplit(reference).path).lstrip('/')] = None
+
+    return list(references)
+
+
+def find_asset_path(url: str) -> str | None:
+    # Only root-relative references and references to the site itself point to the assets of the site
+    parts = urlsplit(url)
+    if parts.netloc and parts.netloc not in site_hosts:
+        return None
+    if parts.scheme not in ('', 'http', 'https') or not parts.path.startswith('/img/'):
+        return None
+
+    return unquote(parts.path).lstrip('/')
+
+
+def find_post_asset_references(post_tokens: PostTokens) -> list[str]:
+    references = {}
+
+    for link in post_tokens.images + post_tokens.links:
+        path = find_asset_path(link.url)
+        if path is not None:
+            references[path] = None
+
+    return list(references)
+
+
+def iterate_site_text_files(site_directory: str) -> Iterator[str]:
+    for directory, directories, filenames in os.walk(site_directory):
+        directories[:] = [
+            name for name in directories if not name.startswith('.') and name not in skipped_site_directories
+        ]
+        for filename in filenames:
+            if filename.endswith(site_text_files_extensions):
+                yield os.path.join(directory, filename)
+
+
+def find_referenced_assets(filepaths: Iterable[str]) -> set[str]:
+    referenced_assets = set()
+
+    for filepath in filepaths:
+        with open(filepath, 'r', errors='replace') as file:
+            referenced_assets.update(find_asset_references(file))
+
+    return referenced_assets
+
+
+class AssetEntry(NamedTuple):
+    size: int
+    mtime_ns: int
+    content_hash: str | None
+
+
+class AssetIndex:
+    FORMAT_VERSION = 1
+
+    site_directory: str
+    assets_directory: str
+    cache_filepath: str | None
+    entries: dict[str, AssetEntry]
+    changed: bool
+    is_refreshed: bool
+
+    def __init__(self, site_directory: str = '.', assets_directory: str = 'img', cache_filepath: str | None = None):
+        self.site_directory = site_directory
+        self.assets_directory = assets_directory
+        self.cache_filepath = cache_filepath
+        self.entries = {}
+        self.changed = False
+        self.is_refreshed = False
+
+    def load(self) -> None:
+        cache = load_cache(self.cache_filepath, self.FORMAT_VERSION)
+        if cache is None:
+            return
+
+        try:
+            self.entries = {path: AssetEntry(*entry) for path, entry in cache['assets'].items()}
+        except (KeyError, TypeError, AttributeError):
+            self.entries = {}
+
+    def save(self) -> None:
+        if self.cache_filepath is None or not self.changed:
+            return
+
+        if save_cache(self.cache_filepath, self.FORMAT_VERSION, {
+            'assets': {path: list(entry) for path, entry in self.entries.items()}
+        }):
+            self.changed = False
+
+    def refresh(self) -> None:
+        # The tree is walked once, content hashes are computed only when duplicates are searched for
+        found_paths = set()
+
+        for path, file_stat in self.iterate_assets_stats(os.path.join(self.site_directory, self.assets_directory)):
+            found_paths.add(path)
+            entry = self.entries.get(path)
+            if entry is None or entry.size != file_stat.st_size or entry.mtime_ns != file_stat.st_mtime_ns:
+                self.entries[path] = AssetEntry(file_stat.st_size, file_stat.st_mtime_ns, None)
+                self.changed = True
+
+        for path in [path for path in self.entries if path not in found_paths]:
+            del self.entries[path]
+            self.changed = True
+
+        self.is_refreshed = True
+
+    def iterate_assets_stats(self, directory: str) -> Iterator[tuple[str, os.stat_result]]:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+
+        for entry in entries:
+            if entry.is_dir():
+                yield from self.iterate_assets_stats(entry.path)
+            elif entry.is_file():
+                yield os.path.relpath(entry.path, self.site_directory).replace(os.sep, '/'), entry.stat()
+
+    def find(self, path: str) -> AssetEntry | None:
+        if not self.is_refreshed:
+            self.refresh()
+
+        return self.entries.get(path)
+
+    def find_content_hash(self, path: str) -> str:
+        entry = self.find(path)
+        if entry.content_hash is None:
+            content_hash = sha1()
+            with open(os.path.join(self.site_directory, path), 'rb') as file:
+                for block in iter(lambda: file.read(1024 * 1024), b''):
+                    content_hash.update(block)
+            entry = entry._replace(content_hash=content_hash.hexdigest())
+            self.entries[path] = entry
+            self.changed = True
+
+        return entry.content_hash
+
+    def find_duplicates(self) -> list[list[str]]:
+        if not self.is_refreshed:
+            self.refresh()
+
+        # Only files of the same size can have the same content, so most files are never read
+        paths_by_size = {}
+        for path, entry in self.entries.items():
+            paths_by_size.setdefault(entry.size, []).append(path)
+
+        paths_by_hash = {}
+        for paths in paths_by_size.values():
+            if len(paths) > 1:
+                for path in paths:
+                    paths_by_hash.setdefault(self.find_content_hash(path), []).append(path)
+
+        return sorted(sorted(paths) for paths in paths_by_hash.values() if len(paths) > 1)
+
+    def find_unreferenced(self, referenced_paths: set[str]) -> list[str]:
+        if not self.is_refreshed:
+            self.refresh()
+
+        return sorted(path for path in self.entries if path not in referenced_paths)
+
+
+class GitAssetIndex(AssetIndex):
+    # Assets are listed from the same revision or index as the posts, blobs identify their content
+    posts_repository: GitPostsRepository
+
+    def __init__(self, posts_repository: GitPostsRepository, assets_directory: str = 'img'):
+        super().__init__('.', assets_directory)
+        self.posts_repository = posts_repository
+
+    def refresh(self) -> None:
+        self.entries = {
+            path: AssetEntry(size, 0, blob_sha)
+            for path, (size, blob_sha) in self.posts_repository.list_files(self.assets_directory).items()
+        }
+        self.is_refreshed = True
+
+
+class AssetChecker:
+    asset_index: AssetIndex
+    size_budget: int
+
+    def __init__(self, asset_index: AssetIndex, size_budget: int = 1024 * 1024):
+        self.asset_index = asset_index
+        self.size_budget = size_budget
+
+    @requires(CONTENT, CORPUS)
+    def check_assets(self, post_data: PostData) -> RuleCheckResults:
+        errors = []
+        warnings = []
+
+        for path in find_post_asset_references(post_data.find_tokens()):
+            entry = self.asset_index.find(path)
+            if entry is None:
+                errors.append('Referenced asset /{} does not exist'.format(path))
+            elif entry.size > self.size_budget:
+                warnings.append('Asset /{} takes {:.0f} kB, which is more than the budget of {:.0f} kB'.format(
+                    path, entry.size / 1024, self.size_budget / 1024
+                ))
+
+        results = {}
+        if errors:
+            results['errors'] = errors
+        if warnings:
+            results['warnings'] = warnings
+
+        return results
+
+
+def format_assets_report(unreferenced_assets: list[str], duplicate_assets: list[list[str]]) -> str:
+    lines = ['Assets not referenced anywhere in the site: {}'.format(len(unreferenced_assets))]
+    lines.extend('  /{}'.format(path) for path in unreferenced_assets)
+    lines.append('Assets with identical content: {}'.format(len(duplicate_assets)))
+    lines.extend('  {}'.format(', '.join('/' + path for path in paths)) for paths in duplicate_assets)
+
+    return '\n'.join(lines)
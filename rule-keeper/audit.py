@@ -0,0 +1,55 @@
+from rule_keeper import RulesResults
+from typing import Iterator
+import os
+
+result_types = ['errors', 'warnings', 'recommendations']
+
+
+def iterate_posts_filepaths(posts_directory: str) -> Iterator[str]:
+    with os.scandir(posts_directory) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith('.md'):
+                yield os.path.join(posts_directory, entry.name)
+
+
+class AuditSummary:
+    checked_posts: int
+    posts_with_errors: int
+    results_counts: dict[str, dict[str, int]]
+
+    def __init__(self):
+        self.checked_posts = 0
+        self.posts_with_errors = 0
+        self.results_counts = {}
+
+    def record(self, filepath: str, rules_results: RulesResults) -> None:
+        self.checked_posts += 1
+        error_found = False
+
+        for rule_name, checker_results in rules_results:
+            rule_counts = self.results_counts.setdefault(rule_name, dict.fromkeys(result_types, 0))
+            for result_type in result_types:
+                rule_counts[result_type] += len(checker_results.get(result_type, []))
+            if checker_results.get('errors'):
+                error_found = True
+
+        if error_found:
+            self.posts_with_errors += 1
+
+    def format(self) -> str:
+        rule_name_width = max([len('Rule')] + [len(rule_name) for rule_name in self.results_counts])
+        row_format = '{:<' + str(rule_name_width) + '}' + '  {:>15}' * len(result_types)
+
+        lines = [
+            'Audited {} posts, {} of them with errors'.format(self.checked_posts, self.posts_with_errors),
+            '',
+            row_format.format('Rule', *[result_type.title() for result_type in result_types]),
+        ]
+        for rule_name, rule_counts in self.results_counts.items():
+            lines.append(row_format.format(rule_name, *[rule_counts[result_type] for result_type in result_types]))
+        lines.append(row_format.format('Total', *[
+            sum(rule_counts[result_type] for rule_counts in self.results_counts.values())
+            for result_type in result_types
+        ]))
+
+        return '\n'.join(lines)
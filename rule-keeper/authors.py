@@ -0,0 +1,36 @@
+from corpus_context import CorpusContext
+from post import PostData
+from rule_keeper import METADATA, CORPUS, RuleCheckResults, requires
+
+
+def find_post_authors(post_data: PostData) -> list[str]:
+    # Posts written together list all authors separated by commas, the same way as authors.clj splits them
+    author = post_data.metadata.get('author')
+    if not author:
+        return []
+
+    authors = author if isinstance(author, list) else str(author).split(',')
+    return [str(name).strip() for name in authors if str(name).strip()]
+
+
+class AuthorChecker:
+    corpus_context: CorpusContext
+
+    def __init__(self, corpus_context: CorpusContext):
+        self.corpus_context = corpus_context
+
+    @requires(METADATA, CORPUS)
+    def check_authors(self, post_data: PostData) -> RuleCheckResults:
+        if self.corpus_context.authors is None:
+            return {}
+
+        post_authors = find_post_authors(post_data)
+        if not post_authors:
+            return {'errors': ['Metadata does not have an author']}
+
+        errors = [
+            'Author {} is not listed in authors of {}'.format(author, self.corpus_context.config_filepath)
+            for author in post_authors if author not in self.corpus_context.authors
+        ]
+
+        return {'errors': errors} if errors else {}
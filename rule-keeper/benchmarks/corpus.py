@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+from json import dump
+from random import Random
+import os
+import subprocess
+
+words = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et dolore '
+    'magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo '
+    'consequat duis aute irure in reprehenderit voluptate velit esse cillum fugiat nulla pariatur excepteur sint '
+    'occaecat cupidatat non proident sunt culpa qui officia deserunt mollit anim id est laborum'
+).split(' ')
+
+key_tags = ['AWS', 'Azure', 'Google Cloud', 'MuleSoft', 'Github', 'EPiServer']
+
+
+def generate_tag_vocabulary(random: Random, tags_count: int) -> list[str]:
+    vocabulary = set()
+
+    while len(vocabulary) < tags_count:
+        tag = ' '.join(random.choice(words).title() for _ in range(random.randint(1, 2)))
+        vocabulary.add('{} {}'.format(tag, len(vocabulary)) if tag in vocabulary else tag)
+
+    return sorted(vocabulary)
+
+
+def generate_post(random: Random, title: str, tags: list[str], paragraphs: int) -> str:
+    lines = ['---', 'layout: post', 'title: {}'.format(title), 'author: benchmark', 'excerpt: {}'.format(title)]
+    lines.append('tags:')
+    lines.extend('- {}'.format(tag) for tag in tags)
+    lines.append('---')
+
+    for _ in range(paragraphs):
+        for _ in range(random.randint(2, 6)):
+            line_words = [random.choice(words) for _ in range(random.randint(10, 18))]
+            if random.random() < 0.1:
+                line_words.insert(random.randrange(len(line_words)), random.choice(key_tags))
+            lines.append(' '.join(line_words))
+        lines.append('')
+
+    return '\n'.join(lines) + '\n'
+
+
+def generate_corpus(
+        directory: str,
+        posts_count: int,
+        tags_count: int = 500,
+        paragraphs: int = 10,
+        changed_posts_count: int = 5,
+        seed: int = 0,
+) -> None:
+    random = Random(seed)
+    vocabulary = generate_tag_vocabulary(random, tags_count)
+    posts_directory = os.path.join(directory, '_posts')
+    os.makedirs(posts_directory, exist_ok=True)
+    os.makedirs(os.path.join(directory, 'rule-keeper'), exist_ok=True)
+
+    with open(os.path.join(directory, 'rule-keeper', 'key_tags.json'), 'w') as file:
+        dump(key_tags, file)
+
+    first_post_date = date(2010, 1, 1)
+    for post_number in range(posts_count):
+        post_date = first_post_date + timedelta(days=post_number % 5000)
+        write_post(
+            os.path.join(posts_directory, '{}-post-{}.md'.format(post_date.isoformat(), post_number)),
+            generate_post(random, 'Post {}'.format(post_number), random.sample(vocabulary, 4), paragraphs),
+        )
+
+    git(directory, 'init', '-q', '-b', 'master')
+    git(directory, 'add', '.')
+    git(directory, 'commit', '-q', '-m', 'Generate {} posts'.format(posts_count))
+
+    # A contributor branch adds new posts and modifies some of the existing ones
+    git(directory, 'checkout', '-q', '-b', 'feature')
+    for post_number in range(changed_posts_count):
+        misspelled_tags = [tag.lower() for tag in random.sample(vocabulary, 2)]
+        write_post(
+            os.path.join(posts_directory, '2030-01-01-new-post-{}.md'.format(post_number)),
+            generate_post(random, 'New post {}'.format(post_number), misspelled_tags, paragraphs),
+        )
+    for post_number in random.sample(range(posts_count), min(changed_posts_count, posts_count)):
+        post_date = first_post_date + timedelta(days=post_number % 5000)
+        filepath = os.path.join(posts_directory, '{}-post-{}.md'.format(post_date.isoformat(), post_number))
+        with open(filepath, 'a') as file:
+            file.write('Updated with a paragraph about Google Cloud.\n')
+    git(directory, 'add', '.')
+    git(directory, 'commit', '-q', '-m', 'Add and modify posts')
+
+
+def write_post(filepath: str, content: str) -> None:
+    with open(filepath, 'w') as file:
+        file.write(content)
+
+
+def git(directory: str, *arguments: str) -> None:
+    subprocess.run(
+        ['git', '-c', 'user.name=Benchmark', '-c', 'user.email=benchmark@example.com', *arguments],
+        cwd=directory, check=True, capture_output=True
+    )
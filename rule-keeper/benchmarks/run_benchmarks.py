@@ -0,0 +1,146 @@
+from benchmarks.corpus import generate_corpus, key_tags
+from content_recommender import ContentTagsModel, ContentTagsRecommender
+from post import PostData, PostDataExtractor
+from tag_cleaner import TagCleaner
+from tag_index import TagIndex
+from tag_recommender import ExistingTagsRecommender, KeyTagsRecommender
+from tokens import tokenize
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from json import dump, load
+from time import perf_counter
+from typing import Callable
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+main_script_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+
+def measure(benchmark: Callable[[], object], repeats: int) -> dict[str, float | int]:
+    timings = []
+    for _ in range(repeats):
+        start = perf_counter()
+        benchmark()
+        timings.append(perf_counter() - start)
+
+    return {'best_seconds': min(timings), 'mean_seconds': sum(timings) / len(timings), 'repeats': repeats}
+
+
+def run_main(corpus_directory: str, *arguments: str) -> None:
+    subprocess.run(
+        [sys.executable, main_script_path, *arguments],
+        cwd=corpus_directory, check=False, stdout=subprocess.DEVNULL
+    )
+
+
+def run_benchmarks(corpus_directory: str, repeats: int) -> dict[str, dict[str, float | int]]:
+    posts_directory = os.path.join(corpus_directory, '_posts')
+    posts_filepaths = sorted(os.path.join(posts_directory, filename) for filename in os.listdir(posts_directory))
+    post_data_extractor = PostDataExtractor()
+    posts_data = [post_data_extractor.extract_data(filepath) for filepath in posts_filepaths[:1000]]
+    existing_tags = set(TagIndex(post_data_extractor).find_existing_tags(posts_filepaths))
+    existing_tags_recommender = ExistingTagsRecommender(existing_tags)
+    key_tags_recommender = KeyTagsRecommender(key_tags)
+    new_posts_data = [
+        PostData(filename=post_data.filename, content=post_data.content, metadata={
+            'tags': [tag.lower() for tag in post_data.metadata['tags']]
+        })
+        for post_data in posts_data[:100]
+    ]
+    tag_index_filepath = os.path.join(corpus_directory, '.rule-keeper-cache', 'tag_index.json')
+
+    def find_existing_tags_with_warm_tag_index() -> None:
+        tag_index = TagIndex(post_data_extractor, tag_index_filepath)
+        tag_index.load()
+        tag_index.find_existing_tags(posts_filepaths)
+        tag_index.save()
+
+    find_existing_tags_with_warm_tag_index()
+
+    def cluster_tag_variants() -> None:
+        tag_cleaner = TagCleaner()
+        tag_cleaner.add_tags(existing_tags)
+        tag_cleaner.add_tags(tag.lower() for tag in existing_tags)
+        tag_cleaner.find_clusters()
+
+    content_tags_model = ContentTagsModel(post_data_extractor)
+    content_tags_model.train(posts_filepaths)
+    content_tags_recommender = ContentTagsRecommender(content_tags_model)
+
+    benchmarks = {
+        'extract_data_per_1000_posts': lambda: [
+            post_data_extractor.extract_data(filepath) for filepath in posts_filepaths[:1000]
+        ],
+        'tokenize_per_1000_posts': lambda: [tokenize(post_data.content) for post_data in posts_data],
+        'extract_metadata_per_1000_posts': lambda: [
+            post_data_extractor.extract_metadata(filepath) for filepath in posts_filepaths[:1000]
+        ],
+        'find_existing_tags': lambda: TagIndex(post_data_extractor).find_existing_tags(posts_filepaths),
+        'find_existing_tags_with_warm_tag_index': find_existing_tags_with_warm_tag_index,
+        'build_existing_tags_recommender': lambda: ExistingTagsRecommender(existing_tags),
+        'cluster_tag_variants': cluster_tag_variants,
+        'existing_tags_recommender_per_100_posts': lambda: [
+            existing_tags_recommender.recommend_tags(post_data) for post_data in new_posts_data
+        ],
+        'content_tags_recommender_per_100_posts': lambda: [
+            content_tags_recommender.recommend_tags(post_data) for post_data in new_posts_data
+        ],
+        'key_tags_recommender_per_1000_posts': lambda: [
+            key_tags_recommender.recommend_tags(post_data) for post_data in posts_data
+        ],
+        'main_check_branch': lambda: run_main(corpus_directory),
+        'main_check_branch_without_changed_posts': lambda: run_main(corpus_directory, '--revision', 'master'),
+        'main_audit': lambda: run_main(corpus_directory, 'audit'),
+    }
+
+    results = {}
+    for name, benchmark in benchmarks.items():
+        results[name] = measure(benchmark, repeats)
+        print('{:<45} {:>10.4f} s'.format(name, results[name]['best_seconds']), file=sys.stderr)
+
+    return results
+
+
+def compare_results(previous_report: dict, current_report: dict) -> None:
+    for name, result in current_report['results'].items():
+        if name not in previous_report.get('results', {}):
+            continue
+        previous_seconds = previous_report['results'][name]['best_seconds']
+        ratio = result['best_seconds'] / previous_seconds if previous_seconds else float('inf')
+        print('{:<45} {:>10.4f} s -> {:>10.4f} s ({:.2f}x)'.format(
+            name, previous_seconds, result['best_seconds'], ratio
+        ))
+
+
+def main() -> None:
+    argument_parser = ArgumentParser(description='Measure performance of rule keeper on a synthetic corpus')
+    argument_parser.add_argument('--posts', type=int, default=1000, help='Number of generated posts')
+    argument_parser.add_argument('--tags', type=int, default=500, help='Size of generated tag vocabulary')
+    argument_parser.add_argument('--paragraphs', type=int, default=10, help='Number of paragraphs in each post')
+    argument_parser.add_argument('--repeats', type=int, default=3, help='Number of runs of each benchmark')
+    argument_parser.add_argument('--output', default='benchmark_results.json', help='File to store results in')
+    argument_parser.add_argument('--compare', help='Results file of a previous run to compare with')
+    arguments = argument_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as corpus_directory:
+        generate_corpus(corpus_directory, arguments.posts, arguments.tags, arguments.paragraphs)
+        report = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'corpus': {'posts': arguments.posts, 'tags': arguments.tags, 'paragraphs': arguments.paragraphs},
+            'results': run_benchmarks(corpus_directory, arguments.repeats),
+        }
+
+    with open(arguments.output, 'w') as file:
+        dump(report, file, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare, 'r') as file:
+            compare_results(load(file), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+from json import dump, load
+from typing import Any, Callable, TextIO
+import os
+
+
+def create_parent_directory(filepath: str) -> None:
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+def replace_file(filepath: str, write: Callable[[TextIO], None]) -> bool:
+    # File is written aside and moved over the previous one, so an interrupted run never leaves half of the cache
+    temporary_filepath = filepath + '.tmp'
+
+    try:
+        create_parent_directory(filepath)
+        with open(temporary_filepath, 'w') as file:
+            write(file)
+        os.replace(temporary_filepath, filepath)
+    except OSError:
+        # Caches only speed runs up, one which can not be written (e.g. on a full disk) is rebuilt by the next run
+        return False
+
+    return True
+
+
+def load_cache(cache_filepath: str | None, format_version: int) -> dict[str, Any] | None:
+    if cache_filepath is None:
+        return None
+
+    try:
+        with open(cache_filepath, 'r') as file:
+            cache = load(file)
+    except (OSError, ValueError):
+        return None
+
+    # Cache written by another version of its owner is rebuilt from scratch
+    if not isinstance(cache, dict) or cache.get('version') != format_version:
+        return None
+
+    return cache
+
+
+def save_cache(cache_filepath: str, format_version: int, cache: dict[str, Any]) -> bool:
+    return replace_file(cache_filepath, lambda file: dump({'version': format_version, **cache}, file))
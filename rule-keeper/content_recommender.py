@@ -0,0 +1,221 @@
+from cache_file import load_cache, save_cache
+from post import PostData, PostDataExtractor
+from rule_keeper import METADATA, CONTENT, CORPUS, RuleCheckResults, requires
+from tag_index import stat_fingerprint
+from tokens import tokenize
+from collections import Counter
+from hashlib import sha1
+from math import log, sqrt
+from sys import intern
+from typing import Callable, Iterable
+
+stop_words = frozenset((
+    'about above after again against all also and any are because been before being below between both but can '
+    'could did does doing down during each few for from further had has have having her here hers herself him '
+    'himself his how into its itself just let like make many may more most much must not now off once only other '
+    'our ours out over own same she should some such than that the their theirs them themselves then there these '
+    'they this those through too under until use used using very was way well were what when where which while '
+    'who whom why will with would you your yours yourself yourselves get got one two new also even need want'
+).split())
+
+
+def find_terms(words: Iterable[str]) -> Counter:
+    terms = Counter()
+
+    for word in words:
+        term = word.lower()
+        if len(term) > 2 and not term[0].isdigit() and term not in stop_words:
+            terms[term] += 1
+
+    return terms
+
+
+def find_post_terms(post_data: PostData) -> Counter:
+    terms = find_terms(post_data.find_tokens().words)
+    terms.update(find_terms(tokenize([str(post_data.metadata.get('title') or '')]).words))
+
+    return terms
+
+
+def normalize(vector: dict[str, float]) -> dict[str, float]:
+    norm = sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+
+class ContentTagsModel:
+    FORMAT_VERSION = 2
+
+    data_extractor: PostDataExtractor
+    cache_filepath: str | None
+    fingerprint: Callable[[str], str]
+    canonical_tags: dict[str, str]
+    posts: dict[str, tuple[str, list[str], dict[str, int]]]
+    training_key: str | None
+    inverse_document_frequencies: dict[str, float]
+    tags_by_term: dict[str, list[tuple[str, float]]]
+    changed: bool
+
+    terms_per_post = 200
+    terms_per_tag = 100
+    minimum_posts_per_tag = 2
+
+    def __init__(
+            self,
+            data_extractor: PostDataExtractor,
+            cache_filepath: str | None = None,
+            fingerprint: Callable[[str], str] = stat_fingerprint,
+            canonical_tags: dict[str, str] | None = None,
+    ):
+        self.data_extractor = data_extractor
+        self.cache_filepath = cache_filepath
+        self.fingerprint = fingerprint
+        self.canonical_tags = canonical_tags or {}
+        self.posts = {}
+        self.training_key = None
+        self.inverse_document_frequencies = {}
+        self.tags_by_term = {}
+        self.changed = False
+
+    def load(self) -> None:
+        cache = load_cache(self.cache_filepath, self.FORMAT_VERSION)
+        if cache is None:
+            return
+
+        try:
+            self.posts = {
+                filepath: (post['fingerprint'], list(post['tags']), dict(post['terms']))
+                for filepath, post in cache['posts'].items()
+            }
+            self.training_key = cache['model']['training_key']
+            self.inverse_document_frequencies = dict(cache['model']['inverse_document_frequencies'])
+            self.tags_by_term = {
+                term: [(tag, weight) for tag, weight in tags] for term, tags in cache['model']['tags_by_term'].items()
+            }
+        except (KeyError, TypeError, ValueError, AttributeError):
+            self.posts = {}
+            self.training_key = None
+
+    def save(self) -> None:
+        if self.cache_filepath is None or not self.changed:
+            return
+
+        if save_cache(self.cache_filepath, self.FORMAT_VERSION, {
+            'posts': {
+                filepath: {'fingerprint': fingerprint, 'tags': tags, 'terms': terms}
+                for filepath, (fingerprint, tags, terms) in self.posts.items()
+            },
+            'model': {
+                'training_key': self.training_key,
+                'inverse_document_frequencies': self.inverse_document_frequencies,
+                'tags_by_term': self.tags_by_term,
+            },
+        }):
+            self.changed = False
+
+    def retain(self, filepaths: list[str]) -> None:
+        filepaths_to_keep = set(filepaths)
+        for filepath in [filepath for filepath in self.posts if filepath not in filepaths_to_keep]:
+            del self.posts[filepath]
+            self.changed = True
+
+    def train(self, filepaths: list[str]) -> None:
+        # Only posts changed since the last run are read, the model is then aggregated from the stored term counts
+        for filepath in filepaths:
+            fingerprint = self.fingerprint(filepath)
+            post = self.posts.get(filepath)
+            if post is None or post[0] != fingerprint:
+                try:
+                    post_data = self.data_extractor.extract_data(filepath)
+                except RuntimeError:
+                    # Posts which can not be parsed are left out of the model, their checks report the error
+                    if post is not None:
+                        del self.posts[filepath]
+                        self.changed = True
+                    continue
+                tags = post_data.metadata.get('tags') or []
+                terms = find_post_terms(post_data)
+                # Terms repeat across posts, so every post refers to the same strings
+                self.posts[filepath] = (fingerprint, [tag for tag in tags if tag], {
+                    intern(term): count for term, count in terms.most_common(self.terms_per_post)
+                })
+                self.changed = True
+
+        trained_filepaths = [filepath for filepath in filepaths if filepath in self.posts]
+        training_key = sha1('\n'.join(
+            '{}:{}'.format(filepath, self.posts[filepath][0]) for filepath in sorted(trained_filepaths)
+        ).encode()).hexdigest()
+        if training_key != self.training_key:
+            self.build_model([self.posts[filepath] for filepath in trained_filepaths])
+            self.training_key = training_key
+            self.changed = True
+
+    def build_model(self, posts: list[tuple[str, list[str], dict[str, int]]]) -> None:
+        document_frequencies = Counter()
+        for fingerprint, tags, terms in posts:
+            document_frequencies.update(terms.keys())
+        self.inverse_document_frequencies = {
+            term: log((1 + len(posts)) / (1 + frequency)) + 1 for term, frequency in document_frequencies.items()
+        }
+
+        tags_vectors: dict[str, Counter] = {}
+        tags_posts_counts = Counter()
+        for fingerprint, tags, terms in posts:
+            vector = self.vectorize(terms)
+            for tag in set(self.canonical_tags.get(tag, tag) for tag in tags):
+                tags_vectors.setdefault(tag, Counter()).update(vector)
+                tags_posts_counts[tag] += 1
+
+        # Every tag keeps only its strongest terms, stored by term so that scoring visits only terms of the post
+        self.tags_by_term = {}
+        for tag, vector in tags_vectors.items():
+            if tags_posts_counts[tag] < self.minimum_posts_per_tag:
+                continue
+            for term, weight in normalize(dict(vector.most_common(self.terms_per_tag))).items():
+                self.tags_by_term.setdefault(term, []).append((tag, round(weight, 5)))
+
+    def vectorize(self, terms: dict[str, int]) -> dict[str, float]:
+        return normalize({
+            term: (1 + log(count)) * self.inverse_document_frequencies[term]
+            for term, count in terms.items() if term in self.inverse_document_frequencies
+        })
+
+    def score_tags(self, terms: dict[str, int]) -> Counter:
+        scores = Counter()
+        for term, weight in self.vectorize(terms).items():
+            for tag, tag_weight in self.tags_by_term.get(term, ()):
+                scores[tag] += weight * tag_weight
+
+        return scores
+
+
+class ContentTagsRecommender:
+    model: ContentTagsModel
+    recommended_tags_count: int
+    minimum_score: float
+
+    def __init__(self, model: ContentTagsModel, recommended_tags_count: int = 3, minimum_score: float = 0.25):
+        self.model = model
+        self.recommended_tags_count = recommended_tags_count
+        self.minimum_score = minimum_score
+
+    @requires(METADATA, CONTENT, CORPUS)
+    def recommend_tags(self, post_data: PostData) -> RuleCheckResults:
+        post_tags = post_data.metadata.get('tags') or []
+        post_tags = set(self.model.canonical_tags.get(post_tag, post_tag) for post_tag in post_tags)
+
+        terms = find_post_terms(post_data)
+        recommended_tags = [
+            tag for tag, score in self.model.score_tags(terms).most_common()
+            if score >= self.minimum_score and tag not in post_tags
+        ][:self.recommended_tags_count]
+
+        if recommended_tags:
+            return {
+                'recommendations': [
+                    'Following tags are used in posts with similar content: {}'.format(
+                        "\n  - ".join([''] + recommended_tags)
+                    )
+                ]
+            }
+
+        return {}
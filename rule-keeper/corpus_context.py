@@ -0,0 +1,127 @@
+from cache_file import load_cache, save_cache
+from permalinks import PermalinkIndex
+from post import PostDataExtractor
+from tag_index import TagIndex, stat_fingerprint
+from hashlib import sha1
+from typing import Callable
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+class CorpusContext:
+    FORMAT_VERSION = 1
+
+    data_extractor: PostDataExtractor
+    tag_index: TagIndex
+    config_filepath: str
+    cache_filepath: str | None
+    fingerprint: Callable[[str], str]
+    authors: set[str] | None
+    authors_key: str | None
+    existing_tags: set[str]
+    existing_tags_key: str | None
+    permalink_index: PermalinkIndex
+    posts_filepaths: list[str]
+    is_tag_index_loaded: bool
+    changed: bool
+
+    def __init__(
+            self,
+            data_extractor: PostDataExtractor,
+            tag_index: TagIndex,
+            config_filepath: str = '_config.yml',
+            cache_filepath: str | None = None,
+            fingerprint: Callable[[str], str] = stat_fingerprint,
+    ):
+        self.data_extractor = data_extractor
+        self.tag_index = tag_index
+        self.config_filepath = config_filepath
+        self.cache_filepath = cache_filepath
+        self.fingerprint = fingerprint
+        self.authors = None
+        self.authors_key = None
+        self.existing_tags = set()
+        self.existing_tags_key = None
+        self.permalink_index = PermalinkIndex()
+        self.posts_filepaths = []
+        self.is_tag_index_loaded = False
+        self.changed = False
+
+    def load(self) -> None:
+        cache = load_cache(self.cache_filepath, self.FORMAT_VERSION)
+        if cache is None:
+            return
+
+        try:
+            authors = cache['authors']['names']
+            self.authors = set(authors) if authors is not None else None
+            self.authors_key = cache['authors']['key']
+            self.existing_tags = set(cache['existing_tags']['tags'])
+            self.existing_tags_key = cache['existing_tags']['key']
+        except (KeyError, TypeError):
+            self.authors = None
+            self.authors_key = None
+            self.existing_tags = set()
+            self.existing_tags_key = None
+
+    def save(self) -> None:
+        if self.is_tag_index_loaded:
+            self.tag_index.save()
+
+        if self.cache_filepath is None or not self.changed:
+            return
+
+        if save_cache(self.cache_filepath, self.FORMAT_VERSION, {
+            'authors': {'key': self.authors_key, 'names': sorted(self.authors) if self.authors is not None else None},
+            'existing_tags': {'key': self.existing_tags_key, 'tags': list(self.existing_tags)},
+        }):
+            self.changed = False
+
+    def refresh_authors(self) -> None:
+        try:
+            authors_key = self.fingerprint(self.config_filepath)
+        except (OSError, RuntimeError):
+            # Without the configuration, e.g. outside of the site, authors are not known and not checked
+            authors_key = None
+        if authors_key == self.authors_key:
+            return
+
+        self.authors = self.read_authors() if authors_key is not None else None
+        self.authors_key = authors_key
+        self.changed = True
+
+    def read_authors(self) -> set[str] | None:
+        with self.data_extractor.open_file(self.config_filepath) as file:
+            try:
+                config = yaml.load(file, SafeLoader)
+            except yaml.YAMLError:
+                return None
+
+        authors = config.get('authors') if isinstance(config, dict) else None
+        return set(str(author) for author in authors) if isinstance(authors, dict) else None
+
+    def refresh_posts(self, posts_filepaths: list[str]) -> None:
+        self.posts_filepaths = posts_filepaths
+        self.permalink_index.reset(posts_filepaths)
+        if self.is_tag_index_loaded:
+            self.tag_index.retain(posts_filepaths)
+
+    def refresh_existing_tags(self, existing_posts_filepaths: list[str]) -> None:
+        # Tags of the posts are read from the tag index only when some of the posts changed since the snapshot
+        existing_tags_key = sha1('\n'.join(
+            '{}:{}'.format(filepath, self.fingerprint(filepath)) for filepath in sorted(existing_posts_filepaths)
+        ).encode()).hexdigest()
+        if existing_tags_key == self.existing_tags_key:
+            return
+
+        if not self.is_tag_index_loaded:
+            self.tag_index.load()
+            self.tag_index.retain(self.posts_filepaths)
+            self.is_tag_index_loaded = True
+        self.existing_tags = set(self.tag_index.find_existing_tags(existing_posts_filepaths))
+        self.existing_tags_key = existing_tags_key
+        self.changed = True
@@ -0,0 +1,220 @@
+from cache_file import load_cache, save_cache
+from post import PostData, PostDataExtractor
+from rule_keeper import CONTENT, CORPUS, RuleCheckResults, requires
+from tag_index import stat_fingerprint
+from array import array
+from os.path import basename
+from typing import Callable, Iterable, Sequence
+from zlib import crc32
+
+
+def find_shingles(lines: Iterable[str], shingle_size: int) -> set[str]:
+    words = ' '.join(lines).lower().split()
+    if len(words) < shingle_size:
+        return {' '.join(words)} if words else set()
+
+    return {' '.join(words[index:index + shingle_size]) for index in range(len(words) - shingle_size + 1)}
+
+
+def compute_signature(shingles: set[str], bins: int) -> list[int] | None:
+    if not shingles:
+        return None
+
+    # One permutation hashing: every shingle is hashed once, the hash chooses a bin and a value within it
+    signature: list[int | None] = [None] * bins
+    for shingle in shingles:
+        value, bin_index = divmod(crc32(shingle.encode()), bins)
+        if signature[bin_index] is None or value < signature[bin_index]:
+            signature[bin_index] = value
+
+    # Empty bins borrow the value of the next filled bin, offset by the distance, so that short posts still compare
+    filled_signature = list(signature)
+    for bin_index, value in enumerate(signature):
+        if value is None:
+            distance = 1
+            while signature[(bin_index + distance) % bins] is None:
+                distance += 1
+            filled_signature[bin_index] = signature[(bin_index + distance) % bins] + distance * (1 << 32)
+
+    return filled_signature
+
+
+def encode_signature(signature: array | None) -> str | None:
+    return signature.tobytes().hex() if signature is not None else None
+
+
+def decode_signature(encoded_signature: str | None) -> array | None:
+    if encoded_signature is None:
+        return None
+
+    signature = array('q')
+    signature.frombytes(bytes.fromhex(encoded_signature))
+    return signature
+
+
+def estimate_similarity(signature: Sequence[int], other_signature: Sequence[int]) -> float:
+    return sum(1 for value, other_value in zip(signature, other_signature) if value == other_value) / len(signature)
+
+
+class DuplicateIndex:
+    FORMAT_VERSION = 2
+
+    data_extractor: PostDataExtractor
+    cache_filepath: str | None
+    fingerprint: Callable[[str], str]
+    entries: dict[str, tuple[str, array | None]]
+    buckets: dict[int, tuple[str, ...]]
+    filepaths_by_filename: dict[str, str]
+    changed: bool
+
+    shingle_size = 5
+    # With 40 bands of 3 rows, posts with similarity of 0.5 become candidates with probability of 99.5 %
+    bins = 120
+    bands = 40
+
+    def __init__(
+            self,
+            data_extractor: PostDataExtractor,
+            cache_filepath: str | None = None,
+            fingerprint: Callable[[str], str] = stat_fingerprint,
+    ):
+        self.data_extractor = data_extractor
+        self.cache_filepath = cache_filepath
+        self.fingerprint = fingerprint
+        self.entries = {}
+        self.buckets = {}
+        self.filepaths_by_filename = {}
+        self.changed = False
+
+    def load(self) -> None:
+        cache = load_cache(self.cache_filepath, self.FORMAT_VERSION)
+        # Signatures computed with other parameters can not be compared, so the index is rebuilt from scratch
+        if cache is None or cache.get('parameters') != self.find_parameters():
+            return
+
+        try:
+            for filepath, entry in cache['posts'].items():
+                self.store_signature(filepath, entry['fingerprint'], decode_signature(entry['signature']))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            self.entries = {}
+            self.buckets = {}
+            self.filepaths_by_filename = {}
+        self.changed = False
+
+    def save(self) -> None:
+        if self.cache_filepath is None or not self.changed:
+            return
+
+        if save_cache(self.cache_filepath, self.FORMAT_VERSION, {
+            'parameters': self.find_parameters(),
+            'posts': {
+                filepath: {'fingerprint': fingerprint, 'signature': encode_signature(signature)}
+                for filepath, (fingerprint, signature) in self.entries.items()
+            },
+        }):
+            self.changed = False
+
+    def find_parameters(self) -> dict[str, int]:
+        return {'shingle_size': self.shingle_size, 'bins': self.bins, 'bands': self.bands}
+
+    def compute_signature(self, lines: Iterable[str]) -> list[int] | None:
+        return compute_signature(find_shingles(lines, self.shingle_size), self.bins)
+
+    def iterate_bands(self, signature: Sequence[int]) -> Iterable[int]:
+        # Bands are kept as plain hashes, colliding bands only add candidates which are compared anyway
+        rows = self.bins // self.bands
+        for band in range(self.bands):
+            yield hash((band, *signature[band * rows:(band + 1) * rows]))
+
+    def store_signature(self, filepath: str, fingerprint: str, signature: Sequence[int] | None) -> None:
+        self.remove(filepath)
+        # Signatures and buckets of every post are kept in memory, so they are stored compactly
+        if signature is not None and not isinstance(signature, array):
+            signature = array('q', signature)
+        self.entries[filepath] = (fingerprint, signature)
+        self.filepaths_by_filename[basename(filepath)] = filepath
+        if signature is not None:
+            for band_key in self.iterate_bands(signature):
+                self.buckets[band_key] = self.buckets.get(band_key, ()) + (filepath,)
+        self.changed = True
+
+    def remove(self, filepath: str) -> None:
+        entry = self.entries.pop(filepath, None)
+        if entry is None:
+            return
+
+        if self.filepaths_by_filename.get(basename(filepath)) == filepath:
+            del self.filepaths_by_filename[basename(filepath)]
+
+        if entry[1] is not None:
+            for band_key in self.iterate_bands(entry[1]):
+                bucket = tuple(
+                    bucket_filepath for bucket_filepath in self.buckets[band_key] if bucket_filepath != filepath
+                )
+                if bucket:
+                    self.buckets[band_key] = bucket
+                else:
+                    del self.buckets[band_key]
+        self.changed = True
+
+    def retain(self, filepaths: list[str]) -> None:
+        filepaths_to_keep = set(filepaths)
+        for filepath in [filepath for filepath in self.entries if filepath not in filepaths_to_keep]:
+            self.remove(filepath)
+
+    def refresh(self, filepaths: Iterable[str]) -> None:
+        for filepath in filepaths:
+            fingerprint = self.fingerprint(filepath)
+            entry = self.entries.get(filepath)
+            if entry is None or entry[0] != fingerprint:
+                try:
+                    content = self.data_extractor.extract_data(filepath).content
+                except RuntimeError:
+                    # Posts which can not be parsed are left out of the index, their checks report the error
+                    if entry is not None:
+                        self.remove(filepath)
+                    continue
+                self.store_signature(filepath, fingerprint, self.compute_signature(content))
+
+    def find_signature(self, filename: str) -> Sequence[int] | None:
+        filepath = self.filepaths_by_filename.get(filename)
+        return self.entries[filepath][1] if filepath is not None else None
+
+    def find_similar_posts(self, signature: Sequence[int], threshold: float) -> list[tuple[str, float]]:
+        # Only posts sharing at least one band with the signature are compared
+        candidates = set()
+        for band_key in self.iterate_bands(signature):
+            candidates.update(self.buckets.get(band_key, ()))
+
+        similar_posts = []
+        for filepath in candidates:
+            similarity = estimate_similarity(signature, self.entries[filepath][1])
+            if similarity >= threshold:
+                similar_posts.append((filepath, similarity))
+
+        return sorted(similar_posts, key=lambda similar_post: (-similar_post[1], similar_post[0]))
+
+
+class DuplicateChecker:
+    duplicate_index: DuplicateIndex
+    similarity_threshold: float
+
+    def __init__(self, duplicate_index: DuplicateIndex, similarity_threshold: float = 0.5):
+        self.duplicate_index = duplicate_index
+        self.similarity_threshold = similarity_threshold
+
+    @requires(CONTENT, CORPUS)
+    def check_duplicates(self, post_data: PostData) -> RuleCheckResults:
+        # Posts refreshed in the index are not read and hashed again
+        signature = self.duplicate_index.find_signature(post_data.filename) \
+            or self.duplicate_index.compute_signature(post_data.content)
+        if signature is None:
+            return {}
+
+        errors = [
+            'Content is {:.0%} similar to content of {}'.format(similarity, filepath)
+            for filepath, similarity in self.duplicate_index.find_similar_posts(signature, self.similarity_threshold)
+            if basename(filepath) != post_data.filename
+        ]
+
+        return {'errors': errors} if errors else {}
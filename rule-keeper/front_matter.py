@@ -0,0 +1,116 @@
+from yaml.nodes import ScalarNode
+from yaml.reader import Reader
+from yaml.resolver import Resolver
+import re
+
+key_pattern = re.compile(r'^([A-Za-z_][A-Za-z0-9_-]*):(?: (.*))?$')
+list_item_pattern = re.compile(r'^( *)-(?: (.*))?$')
+plain_scalar_indicators = '-?:,[]{}#&*!|>\'"%@`'
+string_tag = 'tag:yaml.org,2002:str'
+resolver = Resolver()
+
+
+def parse_scalar(value: str) -> tuple[bool, str | None]:
+    value = value.strip(' ')
+    if not value:
+        return True, None
+
+    if value[0] == '"':
+        if len(value) < 2 or value[-1] != '"' or '"' in value[1:-1] or '\\' in value:
+            return False, None
+        return True, value[1:-1]
+
+    if value[0] == "'":
+        inner_value = value[1:-1]
+        if len(value) < 2 or value[-1] != "'" or "'" in inner_value.replace("''", ''):
+            return False, None
+        return True, inner_value.replace("''", "'")
+
+    if value[0] in plain_scalar_indicators or ': ' in value or ' #' in value or value.endswith(':'):
+        return False, None
+
+    # Values which YAML would read as booleans, numbers, dates or nulls are left for the full parser
+    if resolver.resolve(ScalarNode, value, (True, False)) != string_tag:
+        return False, None
+
+    return True, value
+
+
+def parse_simple_front_matter(metadata_lines: list[str]) -> dict[str, list[str] | str] | None:
+    # Only flat "key: value" pairs, "- value" lists and folded ">" values are parsed, None leaves the rest for YAML
+    metadata = {}
+    list_key = None
+    list_indentation = None
+    folded_key = None
+    folded_indentation = None
+    trailing_blank_lines = False
+
+    for line in metadata_lines:
+        line = line.rstrip('\r\n')
+        if '\t' in line or Reader.NON_PRINTABLE.search(line):
+            return None
+        if not line.strip(' '):
+            # Spaces on otherwise empty lines and leading empty lines become part of a folded value
+            if folded_key is not None and (line or metadata[folded_key] is None):
+                return None
+            trailing_blank_lines = folded_key is not None
+            continue
+
+        if folded_key is not None:
+            indentation = len(line) - len(line.lstrip(' '))
+            if indentation > 0:
+                # Blank or more indented lines inside a folded value are preserved by YAML, not folded
+                if trailing_blank_lines or (folded_indentation is not None and indentation != folded_indentation):
+                    return None
+                folded_indentation = indentation
+                folded_line = line[indentation:]
+                metadata[folded_key] = folded_line if metadata[folded_key] is None \
+                    else metadata[folded_key] + ' ' + folded_line
+                continue
+            if metadata[folded_key] is None:
+                return None
+            metadata[folded_key] += '\n'
+            folded_key = None
+            folded_indentation = None
+            trailing_blank_lines = False
+
+        list_item_match = list_item_pattern.match(line)
+        if list_item_match and list_key is not None:
+            indentation = len(list_item_match.group(1))
+            if list_indentation is not None and indentation != list_indentation:
+                return None
+            list_indentation = indentation
+            is_simple, value = parse_scalar(list_item_match.group(2) or '')
+            if not is_simple:
+                return None
+            if metadata[list_key] is None:
+                metadata[list_key] = []
+            metadata[list_key].append(value)
+            continue
+
+        key_match = key_pattern.match(line)
+        if not key_match or resolver.resolve(ScalarNode, key_match.group(1), (True, False)) != string_tag:
+            return None
+
+        key = key_match.group(1)
+        list_key = None
+        list_indentation = None
+
+        if (key_match.group(2) or '').strip(' ') == '>':
+            folded_key = key
+            metadata[key] = None
+            continue
+
+        is_simple, value = parse_scalar(key_match.group(2) or '')
+        if not is_simple:
+            return None
+
+        metadata[key] = value
+        list_key = key if value is None else None
+
+    if folded_key is not None:
+        if metadata[folded_key] is None:
+            return None
+        metadata[folded_key] += '\n'
+
+    return metadata or None
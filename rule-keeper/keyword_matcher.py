@@ -0,0 +1,112 @@
+from collections import deque
+from typing import Iterable
+
+
+def is_word_character(character: str) -> bool:
+    return character.isalnum() or character == '_'
+
+
+class KeywordMatcher:
+    keywords: list[str]
+    case_sensitive: bool
+    transitions: list[dict[str, int]]
+    fail_states: list[int]
+    state_keywords: list[list[int]]
+    keyword_lengths: list[int]
+    longest_keyword_length: int
+
+    def __init__(self, keywords: Iterable[str], case_sensitive: bool = True):
+        self.keywords = list(keywords)
+        self.case_sensitive = case_sensitive
+        self.transitions = [{}]
+        self.fail_states = [0]
+        self.state_keywords = [[]]
+        self.keyword_lengths = []
+
+        for keyword_number, keyword in enumerate(self.keywords):
+            unified_keyword = self.unify_text(keyword)
+            self.keyword_lengths.append(len(unified_keyword))
+            if unified_keyword:
+                self.add_keyword(keyword_number, unified_keyword)
+
+        self.longest_keyword_length = max(self.keyword_lengths, default=0)
+        self.build_fail_states()
+
+    def unify_text(self, text: str) -> str:
+        text = ' '.join(text.split())
+        return text if self.case_sensitive else text.lower()
+
+    def add_keyword(self, keyword_number: int, unified_keyword: str) -> None:
+        state = 0
+        for character in unified_keyword:
+            next_state = self.transitions[state].get(character)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.fail_states.append(0)
+                self.state_keywords.append([])
+                self.transitions[state][character] = next_state
+            state = next_state
+
+        self.state_keywords[state].append(keyword_number)
+
+    def build_fail_states(self) -> None:
+        states_to_visit = deque(self.transitions[0].values())
+
+        while states_to_visit:
+            state = states_to_visit.popleft()
+            for character, next_state in self.transitions[state].items():
+                fail_state = self.fail_states[state]
+                while fail_state and character not in self.transitions[fail_state]:
+                    fail_state = self.fail_states[fail_state]
+                self.fail_states[next_state] = self.transitions[fail_state].get(character, 0)
+                # Keywords ending in the fallback state also end in this one
+                self.state_keywords[next_state] = \
+                    self.state_keywords[next_state] + self.state_keywords[self.fail_states[next_state]]
+                states_to_visit.append(next_state)
+
+    def find_keywords(self, lines: Iterable[str]) -> set[str]:
+        found_keyword_numbers = set()
+        # Matches waiting for the following character to confirm they end at a word boundary
+        pending_keyword_numbers = []
+        recent_characters = deque(maxlen=self.longest_keyword_length + 1)
+        state = 0
+
+        for line in lines:
+            # Empty lines, also code blocks left empty, end paragraphs, so keywords do not continue over them
+            if not line.strip():
+                state = 0
+                continue
+
+            if not self.case_sensitive:
+                line = line.lower()
+
+            for character in line + ' ':
+                if character.isspace():
+                    if recent_characters and recent_characters[-1] == ' ':
+                        continue
+                    character = ' '
+
+                if pending_keyword_numbers:
+                    if not is_word_character(character):
+                        found_keyword_numbers.update(pending_keyword_numbers)
+                    pending_keyword_numbers = []
+
+                recent_characters.append(character)
+
+                while state and character not in self.transitions[state]:
+                    state = self.fail_states[state]
+                state = self.transitions[state].get(character, 0)
+
+                for keyword_number in self.state_keywords[state]:
+                    if keyword_number not in found_keyword_numbers \
+                            and self.starts_at_word_boundary(recent_characters, self.keyword_lengths[keyword_number]):
+                        pending_keyword_numbers.append(keyword_number)
+
+        return {self.keywords[keyword_number] for keyword_number in found_keyword_numbers}
+
+    def starts_at_word_boundary(self, recent_characters: deque, keyword_length: int) -> bool:
+        if len(recent_characters) <= keyword_length:
+            return True
+
+        return not is_word_character(recent_characters[-keyword_length - 1])
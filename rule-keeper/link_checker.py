@@ -0,0 +1,255 @@
+from cache_file import create_parent_directory, replace_file
+from post import PostData, PostDataExtractor
+from rule_keeper import CONTENT, NETWORK, RuleCheckResults, requires
+from tokens import PostTokens
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from json import dumps, loads
+from time import monotonic, time
+from typing import Iterable, NamedTuple
+from urllib.parse import urlsplit
+import asyncio
+
+
+def find_external_links(post_tokens: PostTokens) -> list[str]:
+    links = sorted(post_tokens.links + post_tokens.images, key=lambda link: link.line_number)
+
+    return list(dict.fromkeys(link.url for link in links if link.url.startswith(('http://', 'https://'))))
+
+
+class LinkCheckResult(NamedTuple):
+    url: str
+    status: int | None
+    error: str | None
+    checked_at: float
+
+    def is_broken(self) -> bool:
+        return self.error is not None or self.status >= 400
+
+
+class LinkCheckCache:
+    cache_filepath: str | None
+    time_to_live: float
+    error_time_to_live: float
+    results: dict[str, LinkCheckResult]
+
+    def __init__(
+            self,
+            cache_filepath: str | None = None,
+            time_to_live: float = 7 * 24 * 60 * 60,
+            error_time_to_live: float = 60 * 60,
+    ):
+        self.cache_filepath = cache_filepath
+        self.time_to_live = time_to_live
+        self.error_time_to_live = error_time_to_live
+        self.results = {}
+
+    def load(self) -> None:
+        if self.cache_filepath is None:
+            return
+
+        try:
+            with open(self.cache_filepath, 'r') as file:
+                lines = file.readlines()
+        except OSError:
+            return
+
+        # Later lines win, so the file can be appended to by many processes without reading it first
+        for line in lines:
+            try:
+                result = LinkCheckResult(*loads(line))
+            except (ValueError, TypeError):
+                continue
+            self.results[result.url] = result
+
+    def find(self, url: str) -> LinkCheckResult | None:
+        result = self.results.get(url)
+        if result is None:
+            return None
+
+        # Failed connections are often temporary, so they are tried again sooner than responses
+        time_to_live = self.time_to_live if result.error is None else min(self.time_to_live, self.error_time_to_live)
+        if time() - result.checked_at > time_to_live:
+            return None
+
+        return result
+
+    def store(self, result: LinkCheckResult) -> None:
+        self.results[result.url] = result
+        if self.cache_filepath is None:
+            return
+
+        try:
+            create_parent_directory(self.cache_filepath)
+            with open(self.cache_filepath, 'a') as file:
+                file.write(dumps(list(result)) + '\n')
+        except OSError:
+            # Result which can not be appended is requested again by the next run, the same as with other caches
+            pass
+
+    def save(self) -> None:
+        if self.cache_filepath is None:
+            return
+
+        # Results appended by worker processes are merged before expired and replaced lines are dropped
+        self.load()
+        replace_file(self.cache_filepath, lambda file: file.writelines(
+            dumps(list(self.results[url])) + '\n' for url in self.results if self.find(url) is not None
+        ))
+
+
+class HostConnectionPool:
+    timeout: float
+    idle_connections: dict[tuple[str, str], list[HTTPConnection]]
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.idle_connections = {}
+
+    def acquire(self, scheme: str, host: str) -> tuple[HTTPConnection, bool]:
+        try:
+            return self.idle_connections.get((scheme, host), []).pop(), True
+        except IndexError:
+            connection_class = HTTPSConnection if scheme == 'https' else HTTPConnection
+            return connection_class(host, timeout=self.timeout), False
+
+    def release(self, scheme: str, host: str, connection: HTTPConnection) -> None:
+        self.idle_connections.setdefault((scheme, host), []).append(connection)
+
+    def close(self) -> None:
+        for connections in self.idle_connections.values():
+            for connection in connections:
+                connection.close()
+        self.idle_connections = {}
+
+
+class LinkChecker:
+    cache: LinkCheckCache
+    timeout: float
+    connections_per_host: int
+    minimum_request_interval: float
+    pool: HostConnectionPool
+    next_request_times: dict[str, float]
+
+    user_agent = 'rule-keeper link checker'
+
+    def __init__(
+            self,
+            cache: LinkCheckCache | None = None,
+            timeout: float = 10,
+            connections_per_host: int = 2,
+            requests_per_host_per_second: float = 5,
+    ):
+        self.cache = cache if cache is not None else LinkCheckCache()
+        self.timeout = timeout
+        self.connections_per_host = connections_per_host
+        self.minimum_request_interval = 1 / requests_per_host_per_second
+        self.pool = HostConnectionPool(timeout)
+        self.next_request_times = {}
+
+    def __getstate__(self) -> dict:
+        # Open connections stay in the process which opened them
+        state = self.__dict__.copy()
+        state['pool'] = HostConnectionPool(self.timeout)
+        return state
+
+    @requires(CONTENT, NETWORK)
+    def check_links(self, post_data: PostData) -> RuleCheckResults:
+        warnings = []
+
+        for result in self.find_results(find_external_links(post_data.find_tokens())):
+            if result.error is not None:
+                warnings.append('Link {} could not be checked: {}'.format(result.url, result.error))
+            elif result.is_broken():
+                warnings.append('Link {} seems to be broken, it responded with HTTP status {}'.format(
+                    result.url, result.status
+                ))
+
+        return {'warnings': warnings} if warnings else {}
+
+    def check_posts_links(self, data_extractor: PostDataExtractor, filepaths: Iterable[str]) -> None:
+        # Links of all posts are requested in a single event loop, so that the limits per host apply to the whole run
+        # and not only to the links of one post. Checks of the posts then find the results in the cache.
+        urls = {}
+
+        for filepath in filepaths:
+            if not filepath.endswith('.md'):
+                continue
+            try:
+                post_data = data_extractor.extract_data(filepath)
+            except RuntimeError:
+                # Posts which can not be parsed are reported by their checks
+                continue
+            urls.update(dict.fromkeys(find_external_links(post_data.find_tokens())))
+
+        self.find_results(list(urls))
+
+    def find_results(self, urls: list[str]) -> list[LinkCheckResult]:
+        results = {url: self.cache.find(url) for url in urls}
+        urls_to_check = [url for url, result in results.items() if result is None]
+
+        if urls_to_check:
+            for result in asyncio.run(self.check_urls(urls_to_check)):
+                self.cache.store(result)
+                results[result.url] = result
+
+        return list(results.values())
+
+    async def check_urls(self, urls: list[str]) -> list[LinkCheckResult]:
+        # Semaphores belong to the event loop, so they are created for every run
+        host_semaphores = {}
+
+        async def check_url(url: str) -> LinkCheckResult:
+            host = urlsplit(url).netloc
+            semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(self.connections_per_host))
+            async with semaphore:
+                await asyncio.sleep(self.reserve_request_time(host))
+                try:
+                    status = await asyncio.to_thread(self.request_status, url)
+                except (OSError, HTTPException, ValueError) as error:
+                    return LinkCheckResult(url, None, str(error) or type(error).__name__, time())
+
+            return LinkCheckResult(url, status, None, time())
+
+        return await asyncio.gather(*(check_url(url) for url in urls))
+
+    def reserve_request_time(self, host: str) -> float:
+        now = monotonic()
+        request_time = max(now, self.next_request_times.get(host, now))
+        self.next_request_times[host] = request_time + self.minimum_request_interval
+
+        return request_time - now
+
+    def request_status(self, url: str) -> int:
+        status = self.request(url, 'HEAD')
+        # Some servers do not implement HEAD requests
+        if status in [405, 501]:
+            status = self.request(url, 'GET')
+
+        return status
+
+    def request(self, url: str, method: str) -> int:
+        parts = urlsplit(url)
+        path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+        connection, is_reused = self.pool.acquire(parts.scheme, parts.netloc)
+
+        try:
+            connection.request(method, path, headers={'User-Agent': self.user_agent})
+            response = connection.getresponse()
+            response.read()
+        except (OSError, HTTPException):
+            connection.close()
+            # Server may have closed an idle connection in the meantime
+            if is_reused:
+                return self.request(url, method)
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self.pool.release(parts.scheme, parts.netloc, connection)
+
+        return response.status
+
+    def close(self) -> None:
+        self.pool.close()
+        self.cache.save()
@@ -1,48 +1,626 @@
-from post import PostDataExtractor
-from tag_recommender import ExistingTagsRecommender, KeyTagsRecommender, find_existing_tags
-from validators import filename_starts_with_a_date
-from rule_keeper import RuleKeeper
-from printer import Printer
-from post import GitPostsRepository
-from json import load
+from argparse import ArgumentParser, Namespace
+from contextlib import nullcontext, redirect_stdout
+from hashlib import sha1
+from json import dump, load
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, ContextManager, Iterable, NamedTuple
 import os
+import subprocess
+import sys
+import tempfile
+
+if TYPE_CHECKING:
+    from assets import AssetIndex
+    from audit import AuditSummary
+    from corpus_context import CorpusContext
+    from duplicates import DuplicateIndex
+    from link_checker import LinkChecker
+    from permalinks import PermalinkIndex
+    from post import GitPostsRepository, PostDataExtractor
+    from profiler import Profiler
+    from reporters import Reporter
+    from rule_keeper import RuleCheckResults, RuleKeeper
+    from tag_recommender import ExistingTagsRecommender
 
 posts_directory = '_posts'
+cache_directory = '.rule-keeper-cache'
+# Posts read from git objects are fingerprinted by their blobs, so they are cached apart from the working tree
+git_cache_subdirectory = 'git'
+key_tags_filepath = './rule-keeper/key_tags.json'
+canonical_tags_filepath = './rule-keeper/canonical_tags.json'
+config_filepath = '_config.yml'
+commands = ['check-branch', 'check-files', 'check-staged', 'check-refs', 'audit', 'clean-tags']
+default_base_revision = 'master'
+default_command = 'check-branch'
+report_formats = ['text', 'ndjson', 'sarif', 'summary']
 
 
 def load_key_tags():
-    with open('./rule-keeper/key_tags.json', 'r') as file:
+    with open(key_tags_filepath, 'r') as file:
         return load(file)
 
 
-post_data_extractor = PostDataExtractor()
-posts_provider = GitPostsRepository('.', posts_directory + '/')
-upserted_posts_identifiers = posts_provider.find_new_posts_identifiers() + posts_provider.find_modified_posts_identifiers()
+def create_argument_parser() -> ArgumentParser:
+    common_parser = ArgumentParser(add_help=False)
+    common_parser.add_argument(
+        '--workers', type=int, default=1,
+        help='Number of processes used to parse and check posts (default: 1, no process pool)',
+    )
+    common_parser.add_argument(
+        '--profile', action='store_true',
+        help='Print time spent in repository diff, tag scan, extraction, each rule checker and printing',
+    )
+    common_parser.add_argument(
+        '--check-links', action='store_true',
+        help='Check that external links of posts respond, results are cached for a week',
+    )
+    common_parser.add_argument(
+        '--asset-size-budget', type=int, default=1024,
+        help='Warn about referenced assets larger than given number of kilobytes (default: 1024)',
+    )
+    common_parser.add_argument('--profile-output', help='Store timings of all phases as JSON in given file')
+    common_parser.add_argument(
+        '--rule-time-budget', type=float,
+        help='Flag rule checkers taking more than given number of milliseconds for a single post',
+    )
+    common_parser.add_argument(
+        '--report', choices=report_formats, default='text',
+        help='Format of results: colored text per post (default), a JSON line per result (ndjson), a single SARIF '
+             'document (sarif) or only counts of results per rule (summary)',
+    )
+    common_parser.add_argument(
+        '--report-output',
+        help='File to write the report to instead of stdout. Other formats than text written to stdout move the rest '
+             'of the output to stderr',
+    )
+    common_parser.add_argument(
+        '--fail-fast', action='store_true',
+        help='Stop checking a post at the first error, cheap checks such as the filename are run first',
+    )
+
+    argument_parser = ArgumentParser(
+        description='Check posts of the blog. Without a command, posts added and modified in the current branch are '
+                    'checked'
+    )
+    subparsers = argument_parser.add_subparsers(dest='command')
+
+    check_branch_parser = subparsers.add_parser(
+        'check-branch', parents=[common_parser], help='Check posts added and modified in the current branch',
+    )
+    check_branch_parser.add_argument(
+        '--revision',
+        help='Read posts straight from git objects of given commit instead of the working tree',
+    )
+    check_branch_parser.add_argument(
+        '--base', default=default_base_revision,
+        help='Revision which the branch is compared with (default: {})'.format(default_base_revision),
+    )
+    check_branch_parser.add_argument(
+        '--watch', action='store_true',
+        help='Keep running and check posts again whenever they are saved in {}'.format(posts_directory),
+    )
+
+    check_files_parser = subparsers.add_parser(
+        'check-files', parents=[common_parser], help='Check given posts of the working tree',
+    )
+    check_files_parser.add_argument('files', nargs='+', help='Paths of posts to check')
+
+    subparsers.add_parser(
+        'check-staged', parents=[common_parser],
+        help='Check posts added and modified in the index compared to HEAD, e.g. from a pre-commit hook',
+    )
+
+    check_refs_parser = subparsers.add_parser(
+        'check-refs', parents=[common_parser],
+        help='Check posts added and modified in many branches or commit ranges within a single run',
+    )
+    check_refs_parser.add_argument(
+        'refs', nargs='+',
+        help='Branches, commits or ranges to check. Plain revisions are compared with the base, "a..b" with "a" and '
+             '"a...b" with the common ancestor of "a" and "b"',
+    )
+    check_refs_parser.add_argument(
+        '--base', default=default_base_revision,
+        help='Revision which plain revisions are compared with (default: {})'.format(default_base_revision),
+    )
+
+    audit_parser = subparsers.add_parser(
+        'audit', parents=[common_parser], help='Check all posts and print a summary per rule',
+    )
+    audit_parser.add_argument(
+        '--revision',
+        help='Read posts straight from git objects of given commit instead of the working tree',
+    )
+    audit_parser.add_argument(
+        '--assets-report', action='store_true',
+        help='List assets which are not referenced anywhere in the site and assets with identical content',
+    )
+
+    clean_tags_parser = subparsers.add_parser(
+        'clean-tags', parents=[common_parser],
+        help='Group variants of tags used in posts and store the canonical tag of each variant',
+    )
+    clean_tags_parser.add_argument(
+        '--output', default=canonical_tags_filepath,
+        help='File to store canonical tags in (default: {})'.format(canonical_tags_filepath),
+    )
+
+    return argument_parser
+
+
+def parse_arguments(argv: list[str]) -> Namespace:
+    if not argv or (argv[0] not in commands and argv[0] not in ['-h', '--help']):
+        argv = [default_command] + argv
+
+    argument_parser = create_argument_parser()
+    arguments = argument_parser.parse_args(argv)
+    if getattr(arguments, 'watch', False) and arguments.revision:
+        argument_parser.error('--watch checks the working tree and can not be used with --revision')
+    if getattr(arguments, 'watch', False) and arguments.report != 'text':
+        argument_parser.error('--watch prints results as text and can not be used with --report')
+
+    return arguments
+
+
+def find_cache_directory() -> str:
+    # Read-only checkouts (e.g. CI containers) keep the cache in the cache directory of the user, so that their runs
+    # are not always cold
+    site_key = sha1(os.path.abspath('.').encode()).hexdigest()[:16]
+    user_cache_directory = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+    for directory in [
+        cache_directory,
+        os.path.join(user_cache_directory, 'rule-keeper', site_key),
+        os.path.join(tempfile.gettempdir(), 'rule-keeper-{}'.format(site_key)),
+    ]:
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            continue
+        if os.access(directory, os.W_OK):
+            return directory
+
+    return cache_directory
+
+
+def find_changed_posts_quickly(*diff_arguments: str) -> list[str] | None:
+    # Plain "git diff" is much cheaper than importing GitPython. None means the full check has to find out.
+    try:
+        diff = subprocess.run(
+            ['git', 'diff', '--name-only', '--no-renames', '--diff-filter=AM', *diff_arguments, '--',
+             posts_directory + '/'],
+            capture_output=True, text=True,
+        )
+    except OSError:
+        return None
+
+    if diff.returncode != 0:
+        return None
+
+    return [filepath for filepath in diff.stdout.splitlines() if filepath.endswith('.md')]
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+
+    if arguments.command == 'clean-tags':
+        return clean_tags(arguments)
+
+    if arguments.report == 'text':
+        return check_posts(arguments)
+
+    from reporters import create_reporter
+
+    # Reporters get results per rule, text of the printer and the audit summary is left out
+    report_file = open(arguments.report_output, 'w') if arguments.report_output is not None else None
+    reporter = create_reporter(arguments.report, report_file or sys.stdout)
+    try:
+        # Only the report is written to stdout, so that it can be parsed or piped elsewhere
+        with redirect_stdout(sys.stderr) if report_file is None else nullcontext():
+            return check_posts(arguments, reporter)
+    finally:
+        # Runs which check no posts still write a complete, empty report
+        reporter.close()
+        if report_file is not None:
+            report_file.close()
+
+
+def check_posts(arguments: Namespace, reporter: 'Reporter | None' = None) -> int:
+    if arguments.command == 'check-branch' and not arguments.watch:
+        if find_changed_posts_quickly(arguments.base, arguments.revision or 'HEAD') == []:
+            print('There was no files to check')
+            return 0
+
+    if arguments.command == 'check-staged':
+        if find_changed_posts_quickly('--cached', 'HEAD') == []:
+            print('There was no files to check')
+            return 0
+
+    return run_checks(arguments, reporter)
+
+
+def clean_tags(arguments: Namespace) -> int:
+    from post import PostDataExtractor
+    from tag_index import TagIndex
+    from tag_cleaner import TagCleaner, save_canonical_tags
+
+    tag_index = TagIndex(
+        PostDataExtractor(simple_front_matter=True),
+        os.path.join(find_cache_directory(), 'tag_index.json'),
+        workers=arguments.workers,
+    )
+    posts_filepaths = [os.path.join(posts_directory, filename) for filename in os.listdir(posts_directory)]
+    tag_index.load()
+    tag_index.retain(posts_filepaths)
+
+    tag_cleaner = TagCleaner()
+    if arguments.workers > 1:
+        tag_index.refresh_in_parallel(posts_filepaths)
+    for filepath in posts_filepaths:
+        tag_cleaner.add_tags(tag_index.find_tags(filepath))
+    tag_index.save()
+
+    print(tag_cleaner.format_clusters())
+    save_canonical_tags(arguments.output, tag_cleaner.build_canonical_tags())
+    print('Canonical tags stored in {}'.format(arguments.output))
+
+    return 0
+
+
+class Checks(NamedTuple):
+    arguments: Namespace
+    profiler: 'Profiler | None'
+    posts_provider: 'GitPostsRepository | None'
+    post_data_extractor: 'PostDataExtractor'
+    posts_filepaths: list[str]
+    upserted_posts_identifiers: list[str]
+    corpus_context: 'CorpusContext'
+    existing_tags_recommender: 'ExistingTagsRecommender'
+    duplicate_index: 'DuplicateIndex'
+    asset_index: 'AssetIndex'
+    link_checker: 'LinkChecker | None'
+    audit_summary: 'AuditSummary'
+    results_printer: Callable[[str, 'RuleCheckResults'], None]
+    rule_keeper: 'RuleKeeper'
+
+    def measure(self, phase_name: str) -> ContextManager:
+        return self.profiler.measure(phase_name) if self.profiler is not None else nullcontext()
+
+    def check_links_of_posts(self, filepaths: Iterable[str]) -> None:
+        if self.link_checker is not None:
+            with self.measure('link_scan'):
+                self.link_checker.check_posts_links(self.post_data_extractor, filepaths)
+
+    def close(self) -> None:
+        if self.link_checker is not None:
+            self.link_checker.close()
+
+        if self.profiler is not None:
+            if self.arguments.profile or self.arguments.rule_time_budget is not None:
+                print(self.profiler.format_summary(), file=sys.stderr)
+            if self.arguments.profile_output:
+                with open(self.arguments.profile_output, 'w') as file:
+                    dump(self.profiler.report(), file, indent=2)
+
+
+def find_changed_posts(posts_provider: 'GitPostsRepository', permalink_index: 'PermalinkIndex') -> list[str]:
+    for old_post_identifier, new_post_identifier in posts_provider.find_renamed_posts_identifiers():
+        permalink_index.rename(old_post_identifier, new_post_identifier)
+
+    return posts_provider.find_new_posts_identifiers() + posts_provider.find_modified_posts_identifiers()
 
-existing_tags_recommender = ExistingTagsRecommender(
-    set(
-        find_existing_tags(
+
+def run_checks(arguments: Namespace, reporter: 'Reporter | None' = None) -> int:
+    try:
+        checks = prepare_checks(arguments, reporter)
+    except RuntimeError as error:
+        # Missing revisions and posts are reported on a single line, the same way as refs of check-refs
+        print(error)
+        return 1
+
+    if arguments.command == 'audit':
+        error_found = audit(checks, reporter)
+    elif arguments.command == 'check-refs':
+        error_found = check_refs(checks)
+    else:
+        error_found = check_upserted_posts(checks)
+    checks.close()
+
+    if getattr(arguments, 'watch', False):
+        watch_posts(checks)
+
+    return 1 if error_found else 0
+
+
+def prepare_checks(arguments: Namespace, reporter: 'Reporter | None') -> Checks:
+    # Heavy dependencies (GitPython, PyYAML, jellyfish) are imported only when some posts have to be checked
+    from post import PostDataExtractor, GitPostDataExtractor, GitPostsRepository, StagedPostsRepository
+    from tag_index import TagIndex, stat_fingerprint
+    from tag_recommender import ExistingTagsRecommender, KeyTagsRecommender
+    from validators import filename_starts_with_a_date
+    from rule_keeper import RuleKeeper
+    from printer import Printer
+    from audit import AuditSummary
+    from profiler import Profiler
+    from link_checker import LinkCheckCache, LinkChecker
+    from permalinks import PermalinkChecker
+    from corpus_context import CorpusContext
+    from authors import AuthorChecker
+    from duplicates import DuplicateChecker, DuplicateIndex
+    from tag_cleaner import load_canonical_tags
+    from content_recommender import ContentTagsModel, ContentTagsRecommender
+    from assets import AssetChecker, AssetIndex, GitAssetIndex
+
+    revision = getattr(arguments, 'revision', None)
+    base_revision = getattr(arguments, 'base', default_base_revision)
+    is_audit = arguments.command == 'audit'
+    is_batch = arguments.command == 'check-refs'
+    is_staged = arguments.command == 'check-staged'
+    if is_batch:
+        # Indexes of all posts are built from the base, the refs are then selected one by one in the same repository
+        revision = base_revision
+
+    site_cache_directory = find_cache_directory()
+    profiler = Profiler(
+        arguments.rule_time_budget / 1000 if arguments.rule_time_budget is not None else None
+    ) if arguments.profile or arguments.profile_output or arguments.rule_time_budget is not None else None
+
+    with profiler.measure('repository_diff') if profiler else nullcontext():
+        posts_provider = None
+        if revision or is_staged:
+            posts_provider = StagedPostsRepository('.', posts_directory + '/') if is_staged \
+                else GitPostsRepository('.', posts_directory + '/', revision, base_revision)
+            post_data_extractor = GitPostDataExtractor(posts_provider, simple_front_matter=True)
+            posts_filepaths = posts_provider.find_all_posts_identifiers()
+            posts_fingerprint = post_data_extractor.fingerprint
+            posts_cache_directory = os.path.join(site_cache_directory, git_cache_subdirectory)
+        else:
+            post_data_extractor = PostDataExtractor(lazy_content=True, simple_front_matter=True)
+            posts_filepaths = [os.path.join(posts_directory, filename) for filename in os.listdir(posts_directory)]
+            posts_fingerprint = stat_fingerprint
+            posts_cache_directory = site_cache_directory
+
+        tag_index = TagIndex(
             post_data_extractor,
-            [
-                filepath for filepath in
-                [os.path.join(posts_directory, filename) for filename in os.listdir(posts_directory)]
-                if filepath not in upserted_posts_identifiers
-            ],
-        ))
-)
+            os.path.join(posts_cache_directory, 'tag_index.json'),
+            fingerprint=posts_fingerprint,
+            workers=arguments.workers,
+        )
+        corpus_context = CorpusContext(
+            post_data_extractor,
+            tag_index,
+            config_filepath,
+            os.path.join(posts_cache_directory, 'corpus_context.json'),
+            fingerprint=posts_fingerprint,
+        )
+        corpus_context.refresh_posts(posts_filepaths)
+        if is_audit:
+            upserted_posts_identifiers = []
+        elif arguments.command == 'check-files':
+            # Files other than posts are not checked, so only missing posts are errors
+            missing_filepaths = [
+                filepath for filepath in arguments.files if filepath.endswith('.md') and not os.path.isfile(filepath)
+            ]
+            if missing_filepaths:
+                raise RuntimeError('No such file: {}'.format(', '.join(missing_filepaths)))
+            upserted_posts_identifiers = [os.path.normpath(filepath) for filepath in arguments.files]
+        else:
+            posts_provider = posts_provider if posts_provider is not None else GitPostsRepository(
+                '.', posts_directory + '/', base_revision=base_revision
+            )
+            upserted_posts_identifiers = find_changed_posts(posts_provider, corpus_context.permalink_index)
 
-key_tags_recommender = KeyTagsRecommender(load_key_tags())
+    canonical_tags = load_canonical_tags(canonical_tags_filepath)
+    with profiler.measure('corpus_scan') if profiler else nullcontext():
+        corpus_context.load()
+        corpus_context.refresh_authors()
+        corpus_context.refresh_existing_tags(
+            [filepath for filepath in posts_filepaths if filepath not in upserted_posts_identifiers]
+        )
+        corpus_context.save()
+        existing_tags_recommender = ExistingTagsRecommender(corpus_context.existing_tags, canonical_tags)
 
-rule_keeper = RuleKeeper(
-    post_data_extractor=post_data_extractor,
-    rule_checkers=[
+    content_tags_model = ContentTagsModel(
+        post_data_extractor,
+        os.path.join(posts_cache_directory, 'content_tags_model.json'),
+        fingerprint=posts_fingerprint,
+        canonical_tags=canonical_tags,
+    )
+    duplicate_index = DuplicateIndex(
+        post_data_extractor, os.path.join(posts_cache_directory, 'duplicate_index.json'), fingerprint=posts_fingerprint
+    )
+
+    # Models of the whole corpus are the most expensive part of a run, so they are built only when posts are checked
+    if is_audit or is_batch or upserted_posts_identifiers or getattr(arguments, 'watch', False):
+        with profiler.measure('content_scan') if profiler else nullcontext():
+            content_tags_model.load()
+            content_tags_model.retain(posts_filepaths)
+            content_tags_model.train(
+                [filepath for filepath in posts_filepaths if filepath not in upserted_posts_identifiers]
+            )
+            content_tags_model.save()
+
+        with profiler.measure('duplicate_scan') if profiler else nullcontext():
+            duplicate_index.load()
+            duplicate_index.retain(posts_filepaths)
+            duplicate_index.refresh(posts_filepaths)
+            duplicate_index.save()
+
+    asset_index = GitAssetIndex(posts_provider) if revision or is_staged \
+        else AssetIndex('.', 'img', os.path.join(site_cache_directory, 'asset_index.json'))
+    with profiler.measure('asset_scan') if profiler else nullcontext():
+        asset_index.load()
+        asset_index.refresh()
+        asset_index.save()
+
+    key_tags_recommender = KeyTagsRecommender(load_key_tags(), canonical_tags=canonical_tags)
+    audit_summary = AuditSummary()
+    rule_checkers = [
         filename_starts_with_a_date,
+        AuthorChecker(corpus_context).check_authors,
         existing_tags_recommender.recommend_tags,
         key_tags_recommender.recommend_tags,
-    ],
-    results_printer=Printer().print,
-)
-error_found = rule_keeper.check_rules_for_files(upserted_posts_identifiers)
+        ContentTagsRecommender(content_tags_model).recommend_tags,
+        AssetChecker(asset_index, arguments.asset_size_budget * 1024).check_assets,
+        PermalinkChecker(corpus_context.permalink_index).check_links,
+        DuplicateChecker(duplicate_index).check_duplicates,
+    ]
+
+    link_checker = None
+    if arguments.check_links:
+        link_check_cache = LinkCheckCache(os.path.join(site_cache_directory, 'links.ndjson'))
+        link_check_cache.load()
+        link_checker = LinkChecker(link_check_cache)
+        rule_checkers.append(link_checker.check_links)
+
+    results_printer = Printer().print
+    rules_results_listener = audit_summary.record if is_audit else None
+    if reporter is not None:
+        results_printer = lambda filepath, results: None
+        rules_results_listener = reporter.report
+
+    rule_keeper = RuleKeeper(
+        post_data_extractor=post_data_extractor,
+        rule_checkers=rule_checkers,
+        results_printer=results_printer,
+        workers=arguments.workers,
+        rules_results_listener=rules_results_listener,
+        report_extraction_errors=is_audit,
+        profiler=profiler,
+        fail_fast=arguments.fail_fast,
+    )
+
+    return Checks(
+        arguments=arguments,
+        profiler=profiler,
+        posts_provider=posts_provider,
+        post_data_extractor=post_data_extractor,
+        posts_filepaths=posts_filepaths,
+        upserted_posts_identifiers=upserted_posts_identifiers,
+        corpus_context=corpus_context,
+        existing_tags_recommender=existing_tags_recommender,
+        duplicate_index=duplicate_index,
+        asset_index=asset_index,
+        link_checker=link_checker,
+        audit_summary=audit_summary,
+        results_printer=results_printer,
+        rule_keeper=rule_keeper,
+    )
+
+
+def audit(checks: Checks, reporter: 'Reporter | None') -> bool:
+    from audit import iterate_posts_filepaths
+    from assets import find_referenced_assets, format_assets_report, iterate_site_text_files
+
+    def iterate_audited_posts_filepaths() -> Iterable[str]:
+        # Posts are streamed from the directory, so memory use does not grow with the number of posts
+        return checks.posts_filepaths if checks.posts_provider is not None else iterate_posts_filepaths(posts_directory)
+
+    checks.check_links_of_posts(iterate_audited_posts_filepaths())
+    error_found = checks.rule_keeper.check_rules_for_files(iterate_audited_posts_filepaths())
+    if reporter is None:
+        print(checks.audit_summary.format())
+    if checks.arguments.assets_report:
+        print(format_assets_report(
+            checks.asset_index.find_unreferenced(find_referenced_assets(iterate_site_text_files('.'))),
+            checks.asset_index.find_duplicates(),
+        ))
+        checks.asset_index.save()
+
+    return error_found
+
+
+def check_refs(checks: Checks) -> bool:
+    posts_provider = checks.posts_provider
+    corpus_context = checks.corpus_context
+    error_found = False
+    refs_summary = []
+
+    for revision_range in checks.arguments.refs:
+        with checks.measure('repository_diff'):
+            try:
+                posts_provider.select_revision(
+                    *posts_provider.resolve_revision_range(revision_range, checks.arguments.base)
+                )
+                revision_posts_filepaths = posts_provider.find_all_posts_identifiers()
+            except RuntimeError as error:
+                print(error)
+                refs_summary.append('{}: {}'.format(revision_range, error))
+                error_found = True
+                continue
+            corpus_context.refresh_posts(revision_posts_filepaths)
+            revision_upserted_posts_identifiers = find_changed_posts(posts_provider, corpus_context.permalink_index)
+
+        # Only posts which differ from the previously checked ref are parsed again
+        with checks.measure('corpus_scan'):
+            corpus_context.refresh_authors()
+            corpus_context.refresh_existing_tags([
+                filepath for filepath in revision_posts_filepaths
+                if filepath not in revision_upserted_posts_identifiers
+            ])
+            checks.existing_tags_recommender.update_existing_tags(corpus_context.existing_tags)
+        with checks.measure('duplicate_scan'):
+            checks.duplicate_index.retain(revision_posts_filepaths)
+            checks.duplicate_index.refresh(revision_posts_filepaths)
+        with checks.measure('asset_scan'):
+            checks.asset_index.refresh()
+
+        checks.check_links_of_posts(revision_upserted_posts_identifiers)
+
+        print('Checking {} compared to {}'.format(posts_provider.revision, posts_provider.base_revision))
+        revision_error_found = checks.rule_keeper.check_rules_for_files(revision_upserted_posts_identifiers)
+        refs_summary.append('{}: {} posts checked, {}'.format(
+            revision_range, len(revision_upserted_posts_identifiers),
+            'errors found' if revision_error_found else 'no errors'
+        ))
+        error_found = error_found or revision_error_found
+
+    corpus_context.save()
+    checks.duplicate_index.save()
+    print('\n'.join(refs_summary))
+
+    return error_found
+
+
+def check_upserted_posts(checks: Checks) -> bool:
+    checks.check_links_of_posts(checks.upserted_posts_identifiers)
+
+    return checks.rule_keeper.check_rules_for_files(checks.upserted_posts_identifiers)
+
+
+def watch_posts(checks: Checks) -> None:
+    from watcher import PostsWatcher, create_change_source
+    import yaml
+
+    corpus_context = checks.corpus_context
+    edited_posts_identifiers = set(checks.upserted_posts_identifiers)
+
+    def check_changed_posts(changed_posts_identifiers: list[str]) -> None:
+        check_start = perf_counter()
+
+        try:
+            # Posts being edited are left out of existing tags, the same way as posts changed in the branch
+            corpus_context.permalink_index.update(changed_posts_identifiers)
+            checks.duplicate_index.refresh(changed_posts_identifiers)
+            newly_edited_posts = set(changed_posts_identifiers) - edited_posts_identifiers
+            if newly_edited_posts:
+                edited_posts_identifiers.update(newly_edited_posts)
+                corpus_context.refresh_existing_tags(
+                    [filepath for filepath in checks.posts_filepaths if filepath not in edited_posts_identifiers]
+                )
+                checks.existing_tags_recommender.update_existing_tags(corpus_context.existing_tags)
+
+            checks.check_links_of_posts(changed_posts_identifiers)
+            checks.rule_keeper.check_rules_for_files(changed_posts_identifiers)
+        except (RuntimeError, yaml.YAMLError) as error:
+            # Posts are often saved half-written, watching goes on until they are saved again
+            checks.results_printer(', '.join(changed_posts_identifiers), {'errors': [str(error)]})
+        print('Checked {} in {:.0f} ms'.format(
+            ', '.join(changed_posts_identifiers), (perf_counter() - check_start) * 1000
+        ))
+
+    print('Watching {} for changes, press Ctrl+C to stop'.format(posts_directory))
+    PostsWatcher(create_change_source(posts_directory), check_changed_posts).run()
 
-if error_found:
-    exit(1)
+if __name__ == '__main__':
+    sys.exit(main())
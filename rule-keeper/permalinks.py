@@ -0,0 +1,105 @@
+from assets import site_hosts
+from post import PostData
+from rule_keeper import CONTENT, CORPUS, RuleCheckResults, requires
+from os.path import basename
+from typing import Iterable
+import os
+import re
+
+post_filename_pattern = re.compile(r'^(\d{4})-(\d{2})-(\d{2})-(.+)\.(?:md|markdown|html)$')
+post_link_pattern = re.compile(
+    r'(?:\]\(\s*<?|^ {0,3}\[[^\]]+\]:\s*<?|href=["\'])'
+    r'(?:https?://([^/\s)"\'<>]+))?(?:\{\{\s*site\.(?:base)?url\s*\}\})?'
+    r'(/(?:[\w-]+/)*(\d{4})/(\d{2})/(\d{2})/([^/\s)"\'<>#?]+?)(?:\.html)?)(?=[\s)"\'<>#?]|$)'
+)
+post_url_tag_pattern = re.compile(r'\{%\s*post_url\s+(?:[\w-]+/)?(\d{4})-(\d{2})-(\d{2})-(\S+?)\s*%\}')
+
+
+def create_permalink_key(year: str, month: str, day: str, slug: str) -> str:
+    # Categories are left out, as they come from the front matter and only prefix the permalink
+    return '/{}/{}/{}/{}'.format(year, month, day, slug)
+
+
+def find_permalink_key(filepath: str) -> str | None:
+    filename_match = post_filename_pattern.match(basename(filepath))
+    return create_permalink_key(*filename_match.groups()) if filename_match else None
+
+
+def find_post_links(lines: Iterable[str]) -> list[tuple[str, str]]:
+    links = {}
+
+    for line in lines:
+        for host, link, year, month, day, slug in post_link_pattern.findall(line):
+            if host and host not in site_hosts:
+                continue
+            links[link] = create_permalink_key(year, month, day, slug)
+        for year, month, day, slug in post_url_tag_pattern.findall(line):
+            links['{}-{}-{}-{}'.format(year, month, day, slug)] = create_permalink_key(year, month, day, slug)
+
+    return list(links.items())
+
+
+class PermalinkIndex:
+    posts_by_permalink: dict[str, str]
+    renamed_permalinks: dict[str, str]
+
+    def __init__(self, posts_identifiers: Iterable[str] = ()):
+        self.reset(posts_identifiers)
+
+    def reset(self, posts_identifiers: Iterable[str]) -> None:
+        self.posts_by_permalink = {}
+        self.renamed_permalinks = {}
+        for post_identifier in posts_identifiers:
+            self.add(post_identifier)
+
+    def add(self, post_identifier: str) -> None:
+        permalink_key = find_permalink_key(post_identifier)
+        if permalink_key is not None:
+            self.posts_by_permalink[permalink_key] = post_identifier
+            self.renamed_permalinks.pop(permalink_key, None)
+
+    def remove(self, post_identifier: str) -> None:
+        permalink_key = find_permalink_key(post_identifier)
+        if permalink_key is not None and self.posts_by_permalink.get(permalink_key) == post_identifier:
+            del self.posts_by_permalink[permalink_key]
+
+    def rename(self, old_post_identifier: str, new_post_identifier: str) -> None:
+        self.remove(old_post_identifier)
+        self.add(new_post_identifier)
+        old_permalink_key = find_permalink_key(old_post_identifier)
+        new_permalink_key = find_permalink_key(new_post_identifier)
+        if old_permalink_key is not None and new_permalink_key is not None and old_permalink_key != new_permalink_key:
+            self.renamed_permalinks[old_permalink_key] = new_permalink_key
+
+    def update(self, posts_filepaths: Iterable[str]) -> None:
+        for filepath in posts_filepaths:
+            if os.path.exists(filepath):
+                self.add(filepath)
+            else:
+                self.remove(filepath)
+
+    def find_post(self, permalink_key: str) -> str | None:
+        return self.posts_by_permalink.get(permalink_key)
+
+
+class PermalinkChecker:
+    permalink_index: PermalinkIndex
+
+    def __init__(self, permalink_index: PermalinkIndex):
+        self.permalink_index = permalink_index
+
+    @requires(CONTENT, CORPUS)
+    def check_links(self, post_data: PostData) -> RuleCheckResults:
+        errors = []
+
+        for link, permalink_key in find_post_links(post_data.find_tokens().text_lines):
+            if self.permalink_index.find_post(permalink_key) is not None:
+                continue
+            if permalink_key in self.permalink_index.renamed_permalinks:
+                errors.append('Link {} points to a post which was renamed, link to {}.html instead'.format(
+                    link, self.permalink_index.renamed_permalinks[permalink_key]
+                ))
+            else:
+                errors.append('Link {} points to a post which does not exist'.format(link))
+
+        return {'errors': errors} if errors else {}
@@ -1,7 +1,23 @@
-from git import Repo, DiffIndex
-from typing import NamedTuple
+from git import Repo, DiffIndex, Tree
+from gitdb.exc import BadName
+from collections import OrderedDict
+from typing import Iterator, NamedTuple, Sequence, TextIO
+from io import StringIO
+from array import array
 from os.path import basename
-from yaml import load, Loader, scanner
+from front_matter import parse_simple_front_matter
+from tokens import PostTokens, tokenize
+from yaml import YAMLError, load
+import os
+import re
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+staged_revision = 'index'
+line_end_pattern = re.compile('\n')
 
 
 class PostsRepository:
@@ -15,13 +31,70 @@ class PostsRepository:
 class GitPostsRepository(PostsRepository):
     posts_path_prefix: str
     branches_diff: DiffIndex
+    repository_location: str
+    revision: str
+    base_revision: str
+    repository: Repo | None
+    repository_process_id: int | None
+    posts_blobs_shas: dict[str, str] | None
+    posts_trees_blobs_shas: dict[str, dict[str, str]]
 
-    def __init__(self, repository_location: str, posts_path_prefix: str):
+    def __init__(
+            self,
+            repository_location: str,
+            posts_path_prefix: str,
+            revision: str = 'HEAD',
+            base_revision: str = 'master',
+    ):
         self.posts_path_prefix = posts_path_prefix
-        repository = Repo(repository_location)
-        current_branch_commits = repository.head.commit.tree
-        master_branch_commits = repository.commit('master')
-        self.branches_diff = master_branch_commits.diff(current_branch_commits)
+        self.repository_location = repository_location
+        self.repository = None
+        self.posts_trees_blobs_shas = {}
+        self.select_revision(revision, base_revision)
+
+    def select_revision(self, revision: str, base_revision: str = 'master') -> None:
+        # Revisions are switched within the same repository session, so git processes and read posts are reused
+        try:
+            branches_diff = self.diff_revisions(revision, base_revision)
+        except (BadName, ValueError):
+            raise RuntimeError('Revision {} or {} does not exist'.format(base_revision, revision))
+
+        self.revision = revision
+        self.base_revision = base_revision
+        self.posts_blobs_shas = None
+        self.branches_diff = branches_diff
+
+    def diff_revisions(self, revision: str, base_revision: str) -> DiffIndex:
+        repository = self.open_repository()
+        return repository.commit(base_revision).diff(repository.commit(revision).tree)
+
+    def resolve_revision_range(self, revision_range: str, base_revision: str = 'master') -> tuple[str, str]:
+        # "base...revision" compares with the common ancestor, "base..revision" and a plain revision with the base
+        if '...' in revision_range:
+            base_revision, revision = revision_range.split('...', 1)
+            merge_bases = self.open_repository().merge_base(base_revision or 'HEAD', revision or 'HEAD')
+            if not merge_bases:
+                raise RuntimeError('Revisions {} have no common ancestor'.format(revision_range))
+            return revision or 'HEAD', merge_bases[0].hexsha
+        if '..' in revision_range:
+            base_revision, revision = revision_range.split('..', 1)
+            return revision or 'HEAD', base_revision or 'HEAD'
+
+        return revision_range, base_revision
+
+    def open_repository(self) -> Repo:
+        # Git processes used for reading objects can not be shared with forked worker processes
+        if self.repository is None or self.repository_process_id != os.getpid():
+            self.repository = Repo(self.repository_location)
+            self.repository_process_id = os.getpid()
+
+        return self.repository
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['repository'] = None
+        state['branches_diff'] = None
+        return state
 
     def find_modified_posts_identifiers(self) -> list[str]:
         file_paths = []
@@ -47,14 +120,235 @@ class GitPostsRepository(PostsRepository):
 
         return file_paths
 
+    def find_renamed_posts_identifiers(self) -> list[tuple[str, str]]:
+        return [
+            (file.a_path, file.b_path)
+            for file in self.branches_diff.iter_change_type('R')
+            if self.is_file_a_post_file(file.a_path) and self.is_file_a_post_file(file.b_path)
+        ]
+
     def is_file_a_post_file(self, file_path: str):
         return file_path.startswith(self.posts_path_prefix) and file_path.endswith('.md')
 
+    def find_posts_blobs_shas(self) -> dict[str, str]:
+        if self.posts_blobs_shas is None:
+            posts_tree_sha = self.find_posts_tree_sha(self.revision)
+            # Revisions which did not change any post share the tree, so it is listed only once
+            if posts_tree_sha not in self.posts_trees_blobs_shas:
+                base_posts_blobs_shas = self.posts_trees_blobs_shas.get(self.find_posts_tree_sha(self.base_revision))
+                self.posts_trees_blobs_shas[posts_tree_sha] = self.list_posts_blobs_shas(self.revision) \
+                    if base_posts_blobs_shas is None else self.apply_posts_changes(base_posts_blobs_shas)
+            self.posts_blobs_shas = self.posts_trees_blobs_shas[posts_tree_sha]
+
+        return self.posts_blobs_shas
+
+    def find_posts_tree(self, revision: str) -> Tree:
+        posts_directory = self.posts_path_prefix.rstrip('/')
+
+        try:
+            return self.open_repository().commit(revision).tree / posts_directory
+        except KeyError:
+            raise RuntimeError('Directory {} does not exist in revision {}'.format(posts_directory, revision))
+
+    def find_posts_tree_sha(self, revision: str) -> str:
+        return self.find_posts_tree(revision).hexsha
+
+    def list_posts_blobs_shas(self, revision: str) -> dict[str, str]:
+        return {item.path: item.hexsha for item in self.find_posts_tree(revision).traverse() if item.type == 'blob'}
+
+    def apply_posts_changes(self, base_posts_blobs_shas: dict[str, str]) -> dict[str, str]:
+        # Posts of the base are already known, so only the changes from the diff are applied to them
+        posts_blobs_shas = dict(base_posts_blobs_shas)
+
+        for change in self.branches_diff:
+            if change.a_path and change.a_path.startswith(self.posts_path_prefix) \
+                    and (change.deleted_file or change.renamed_file):
+                posts_blobs_shas.pop(change.a_path, None)
+            if change.b_blob is not None and change.b_path.startswith(self.posts_path_prefix):
+                posts_blobs_shas[change.b_path] = change.b_blob.hexsha
+
+        return posts_blobs_shas
+
+    def find_all_posts_identifiers(self) -> list[str]:
+        return list(self.find_posts_blobs_shas().keys())
+
+    def find_post_blob_sha(self, identifier: str) -> str:
+        try:
+            return self.find_posts_blobs_shas()[identifier]
+        except KeyError:
+            raise RuntimeError('File {} does not exist in revision {}'.format(identifier, self.revision))
+
+    def find_file_blob_sha(self, path: str) -> str:
+        # Other files of the site, such as the configuration, are looked up from the tree only when needed
+        if path.startswith(self.posts_path_prefix):
+            return self.find_post_blob_sha(path)
+
+        try:
+            return (self.open_repository().commit(self.revision).tree / path).hexsha
+        except KeyError:
+            raise RuntimeError('File {} does not exist in revision {}'.format(path, self.revision))
+
+    def list_files(self, path: str) -> dict[str, tuple[int, str]]:
+        # Sizes and blobs of all files under the path, e.g. assets of the site, are listed by a single "git ls-tree"
+        listing = self.open_repository().git.ls_tree('-r', '-l', '-z', self.revision, '--', path)
+        files = {}
+
+        for line in listing.split('\0'):
+            if line:
+                details, file_path = line.split('\t', 1)
+                mode, object_type, blob_sha, size = details.split()
+                files[file_path] = (int(size), blob_sha)
+
+        return files
+
+    def read_blob(self, blob_sha: str) -> bytes:
+        # Uses the long-lived "git cat-file --batch" process of the repository
+        hexsha, type_name, size, data = self.open_repository().git.get_object_data(blob_sha)
+        return data
+
+
+class StagedPostsRepository(GitPostsRepository):
+    # Posts are read from the index, i.e. as they are going to be committed, and compared with the base commit
+    def __init__(self, repository_location: str, posts_path_prefix: str, base_revision: str = 'HEAD'):
+        super().__init__(repository_location, posts_path_prefix, staged_revision, base_revision)
+
+    def diff_revisions(self, revision: str, base_revision: str) -> DiffIndex:
+        return self.open_repository().commit(base_revision).diff()
+
+    def find_posts_blobs_shas(self) -> dict[str, str]:
+        if self.posts_blobs_shas is None:
+            # Posts of the base commit are listed from its tree and the staged changes are applied on top of them
+            base_posts_tree_sha = self.find_posts_tree_sha(self.base_revision)
+            if base_posts_tree_sha not in self.posts_trees_blobs_shas:
+                self.posts_trees_blobs_shas[base_posts_tree_sha] = self.list_posts_blobs_shas(self.base_revision)
+            self.posts_blobs_shas = self.apply_posts_changes(self.posts_trees_blobs_shas[base_posts_tree_sha])
+
+        return self.posts_blobs_shas
+
+    def find_file_blob_sha(self, path: str) -> str:
+        if path.startswith(self.posts_path_prefix):
+            return self.find_post_blob_sha(path)
+
+        for change in self.branches_diff:
+            if change.b_path == path and change.b_blob is not None:
+                return change.b_blob.hexsha
+            if change.a_path == path and change.deleted_file:
+                raise RuntimeError('File {} does not exist in revision {}'.format(path, self.revision))
+
+        try:
+            return (self.open_repository().commit(self.base_revision).tree / path).hexsha
+        except KeyError:
+            raise RuntimeError('File {} does not exist in revision {}'.format(path, self.revision))
+
+    def list_files(self, path: str) -> dict[str, tuple[int, str]]:
+        directory_prefix = path.rstrip('/') + '/'
+
+        return {
+            entry.path: (entry.size, entry.hexsha)
+            for (entry_path, stage), entry in self.open_repository().index.entries.items()
+            if stage == 0 and entry_path.startswith(directory_prefix)
+        }
+
+
+class PostContent(Sequence[str]):
+    # Content is kept as the single string it was read as, lines are stripped only when accessed
+    text: str
+    line_offsets: array | None
+
+    def __init__(self, text: str):
+        self.text = text
+        self.line_offsets = None
+
+    def find_line_offsets(self) -> array:
+        # Offsets are needed only for indexing, iterating splits the text at once
+        if self.line_offsets is None:
+            self.line_offsets = array('q', [0])
+            self.line_offsets.extend(line_end.end() for line_end in line_end_pattern.finditer(self.text))
+            if self.line_offsets[-1] == len(self.text):
+                self.line_offsets.pop()
+
+        return self.line_offsets
+
+    def find_line(self, line_number: int) -> str:
+        line_offsets = self.find_line_offsets()
+        line_end = line_offsets[line_number + 1] if line_number + 1 < len(line_offsets) else len(self.text)
+
+        return self.text[line_offsets[line_number]:line_end].strip()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.find_line(line_number) for line_number in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Line {} is out of content'.format(index))
+
+        return self.find_line(index)
+
+    def __len__(self) -> int:
+        return len(self.find_line_offsets())
+
+    def __iter__(self) -> Iterator[str]:
+        lines = self.text.split('\n')
+        if not lines[-1]:
+            lines.pop()
+
+        return (line.strip() for line in lines)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class LazyPostContent(Sequence[str]):
+    filepath: str
+    content_offset: int
+    lines: PostContent | None
+
+    def __init__(self, filepath: str, content_offset: int):
+        self.filepath = filepath
+        self.content_offset = content_offset
+        self.lines = None
+
+    def load(self) -> PostContent:
+        if self.lines is None:
+            with open(self.filepath, 'r') as file_object:
+                file_object.seek(self.content_offset)
+                self.lines = PostContent(file_object.read())
+
+        return self.lines
+
+    def __getitem__(self, index):
+        return self.load()[index]
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.load())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return self.load() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.load())
+
 
 class PostData(NamedTuple):
     filename: str
-    content: list[str]
+    content: Sequence[str]
     metadata: dict[str, list[str] | str]
+    tokens: PostTokens | None = None
+
+    def find_tokens(self) -> PostTokens:
+        # RuleKeeper tokenizes every post once for all checkers, checkers called on their own tokenize the content
+        return self.tokens if self.tokens is not None else tokenize(self.content)
 
 
 class PostDataExtractor:
@@ -66,34 +360,67 @@ class PostDataExtractor:
     metadata_section_separator = '---'
     tags_metadata_header = 'tags:'
     current_section = None
+    lazy_content: bool
+    simple_front_matter: bool
+
+    def __init__(self, lazy_content: bool = False, simple_front_matter: bool = False):
+        self.lazy_content = lazy_content
+        self.simple_front_matter = simple_front_matter
 
     def extract_data(self, filepath: str) -> PostData:
-        metadata = []
-        filename = basename(filepath)
-        content = []
-        self.current_section = None
+        with open(filepath, 'r') as file_object:
+            return self.read_post_data(filepath, file_object)
 
+    def extract_metadata(self, filepath: str) -> dict[str, list[str] | str]:
         with open(filepath, 'r') as file_object:
-            for line_number, line_content in enumerate(file_object):
-                if line_number == 0 and not line_content.startswith('---'):
-                    raise RuntimeError(
-                        'File {} does not have starting metadata section in first line'.format(filepath)
-                    )
+            return self.read_metadata(filepath, file_object)
+
+    def open_file(self, filepath: str) -> TextIO:
+        return open(filepath, 'r')
+
+    def read_post_data(self, filepath: str, file_object: TextIO) -> PostData:
+        metadata = self.read_metadata_lines(filepath, file_object)
 
-                if line_number == 0:
-                    continue
+        if self.lazy_content:
+            content = LazyPostContent(filepath, file_object.tell())
+        else:
+            content = PostContent(file_object.read())
 
-                section = self.identify_section(line_content)
+        return PostData(
+            metadata=self.parse_metadata_section(filepath, metadata),
+            filename=basename(filepath),
+            content=content
+        )
 
-                match section:
-                    case self.metadata_section_name:
-                        metadata.append(line_content)
-                    case self.content_section_name:
-                        content.append(line_content.strip())
+    def read_metadata(self, filepath: str, file_object: TextIO) -> dict[str, list[str] | str]:
+        metadata = self.read_metadata_lines(filepath, file_object)
 
+        return self.parse_metadata_section(filepath, metadata)
+
+    def read_metadata_lines(self, filepath: str, file_object: TextIO) -> list[str]:
+        metadata = []
+        self.current_section = None
+
+        line_content = file_object.readline()
+        if not line_content:
+            return metadata
+        if not line_content.startswith('---'):
+            raise RuntimeError(
+                'File {} does not have starting metadata section in first line'.format(filepath)
+            )
+
+        # Reading stops at the closing separator, so the rest of the file is left for the content
+        for line_content in iter(file_object.readline, ''):
+            if self.identify_section(line_content) != self.metadata_section_name:
+                break
+            metadata.append(line_content)
+
+        return metadata
+
+    def parse_metadata_section(self, filepath: str, metadata: list[str]) -> dict[str, list[str] | str]:
         try:
-            return PostData(metadata=self.parse_metadata(metadata), filename=filename, content=content)
-        except scanner.ScannerError:
+            return self.parse_metadata(metadata)
+        except YAMLError:
             if self.current_section == self.metadata_section_name:
                 raise RuntimeError(
                     'File {} metadata could not be parsed. File does not seem to close metadata.'.format(filepath)
@@ -104,7 +431,12 @@ class PostDataExtractor:
                 )
 
     def parse_metadata(self, metadata: list[str]) -> dict[str, list[str] | str]:
-        return load(''.join(metadata), Loader)
+        if self.simple_front_matter:
+            parsed_metadata = parse_simple_front_matter(metadata)
+            if parsed_metadata is not None:
+                return parsed_metadata
+
+        return load(''.join(metadata), SafeLoader)
 
     def identify_section(self, line_content: str) -> str:
         if self.current_section is None:
@@ -115,3 +447,66 @@ class PostDataExtractor:
             self.current_section = self.metadata_end_section_name
 
         return self.current_section
+
+
+class GitPostDataExtractor(PostDataExtractor):
+    posts_repository: GitPostsRepository
+    posts_data: OrderedDict[str, PostData]
+    posts_metadata: OrderedDict[str, dict[str, list[str] | str]]
+    cached_posts_count: int
+
+    def __init__(
+            self,
+            posts_repository: GitPostsRepository,
+            simple_front_matter: bool = False,
+            cached_posts_count: int = 256,
+    ):
+        super().__init__(lazy_content=False, simple_front_matter=simple_front_matter)
+        self.posts_repository = posts_repository
+        self.posts_data = OrderedDict()
+        self.posts_metadata = OrderedDict()
+        self.cached_posts_count = cached_posts_count
+
+    def extract_data(self, filepath: str) -> PostData:
+        blob_sha = self.posts_repository.find_post_blob_sha(filepath)
+
+        # Posts with identical content share one blob, so they are parsed only once
+        post_data = self.find_cached(self.posts_data, blob_sha)
+        if post_data is None:
+            post_data = self.read_post_data(filepath, self.open_blob(blob_sha))
+            self.store_cached(self.posts_data, blob_sha, post_data)
+            self.store_cached(self.posts_metadata, blob_sha, post_data.metadata)
+
+        return post_data._replace(filename=basename(filepath))
+
+    def extract_metadata(self, filepath: str) -> dict[str, list[str] | str]:
+        blob_sha = self.posts_repository.find_post_blob_sha(filepath)
+
+        metadata = self.find_cached(self.posts_metadata, blob_sha)
+        if metadata is None:
+            metadata = self.read_metadata(filepath, self.open_blob(blob_sha))
+            self.store_cached(self.posts_metadata, blob_sha, metadata)
+
+        return metadata
+
+    def find_cached(self, cache: OrderedDict[str, PostData | dict], blob_sha: str) -> PostData | dict | None:
+        value = cache.get(blob_sha)
+        if value is not None:
+            cache.move_to_end(blob_sha)
+
+        return value
+
+    def store_cached(self, cache: OrderedDict[str, PostData | dict], blob_sha: str, value: PostData | dict) -> None:
+        # Only recently read posts are kept, so memory use of audits does not grow with the number of posts
+        cache[blob_sha] = value
+        if len(cache) > self.cached_posts_count:
+            cache.popitem(last=False)
+
+    def fingerprint(self, filepath: str) -> str:
+        return 'blob:' + self.posts_repository.find_file_blob_sha(filepath)
+
+    def open_file(self, filepath: str) -> TextIO:
+        return self.open_blob(self.posts_repository.find_file_blob_sha(filepath))
+
+    def open_blob(self, blob_sha: str) -> StringIO:
+        return StringIO(self.posts_repository.read_blob(blob_sha).decode('utf-8'), newline=None)
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator
+
+rule_phase_prefix = 'rule:'
+
+
+class PhaseStatistics:
+    calls: int
+    total_seconds: float
+    max_seconds: float
+    calls_over_budget: int
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.calls_over_budget = 0
+
+    def to_dict(self) -> dict[str, float | int]:
+        return {
+            'calls': self.calls,
+            'total_seconds': self.total_seconds,
+            'max_seconds': self.max_seconds,
+            'calls_over_budget': self.calls_over_budget,
+        }
+
+
+class Profiler:
+    phases: dict[str, PhaseStatistics]
+    rule_time_budget: float | None
+
+    def __init__(self, rule_time_budget: float | None = None):
+        self.phases = {}
+        self.rule_time_budget = rule_time_budget
+
+    @contextmanager
+    def measure(self, phase_name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase_name, perf_counter() - start)
+
+    def record(self, phase_name: str, seconds: float) -> None:
+        phase = self.phases.setdefault(phase_name, PhaseStatistics())
+        phase.calls += 1
+        phase.total_seconds += seconds
+        phase.max_seconds = max(phase.max_seconds, seconds)
+
+        if self.is_over_budget(phase_name, seconds):
+            phase.calls_over_budget += 1
+
+    def is_over_budget(self, phase_name: str, seconds: float) -> bool:
+        return self.rule_time_budget is not None \
+            and phase_name.startswith(rule_phase_prefix) \
+            and seconds > self.rule_time_budget
+
+    def merge(self, report: dict[str, dict[str, float | int]]) -> None:
+        for phase_name, statistics in report.items():
+            phase = self.phases.setdefault(phase_name, PhaseStatistics())
+            phase.calls += statistics['calls']
+            phase.total_seconds += statistics['total_seconds']
+            phase.max_seconds = max(phase.max_seconds, statistics['max_seconds'])
+            phase.calls_over_budget += statistics['calls_over_budget']
+
+    def report(self) -> dict[str, dict[str, float | int]]:
+        return {phase_name: phase.to_dict() for phase_name, phase in self.phases.items()}
+
+    def reset(self) -> None:
+        self.phases = {}
+
+    def find_slow_rules(self) -> list[str]:
+        return [
+            phase_name[len(rule_phase_prefix):]
+            for phase_name, phase in self.phases.items()
+            if phase_name.startswith(rule_phase_prefix) and phase.calls_over_budget
+        ]
+
+    def format_summary(self) -> str:
+        phase_name_width = max([len('Phase')] + [len(phase_name) for phase_name in self.phases])
+        row_format = '{:<' + str(phase_name_width) + '}  {:>8}  {:>12}  {:>12}  {:>12}'
+
+        lines = [row_format.format('Phase', 'Calls', 'Total ms', 'Mean ms', 'Max ms')]
+        for phase_name, phase in sorted(self.phases.items(), key=lambda item: -item[1].total_seconds):
+            lines.append(row_format.format(
+                phase_name,
+                phase.calls,
+                '{:.1f}'.format(phase.total_seconds * 1000),
+                '{:.2f}'.format(phase.total_seconds * 1000 / phase.calls if phase.calls else 0),
+                '{:.2f}'.format(phase.max_seconds * 1000),
+            ))
+
+        for phase_name in self.find_slow_rules():
+            phase = self.phases[rule_phase_prefix + phase_name]
+            lines.append('Rule {} exceeded time budget of {:.1f} ms in {} of {} calls'.format(
+                phase_name, self.rule_time_budget * 1000, phase.calls_over_budget, phase.calls
+            ))
+
+        return '\n'.join(lines)
@@ -0,0 +1,105 @@
+from audit import AuditSummary
+from rule_keeper import RulesResults
+from json import dumps
+from typing import Iterator, NamedTuple, TextIO
+
+severities = {'errors': 'error', 'warnings': 'warning', 'recommendations': 'recommendation'}
+sarif_levels = {'error': 'error', 'warning': 'warning', 'recommendation': 'note'}
+
+
+class Finding(NamedTuple):
+    filepath: str
+    rule: str
+    severity: str
+    message: str
+
+
+def iterate_findings(filepath: str, rules_results: RulesResults) -> Iterator[Finding]:
+    for rule_name, checker_results in rules_results:
+        for result_type, severity in severities.items():
+            for message in checker_results.get(result_type, []):
+                yield Finding(filepath.replace('\\', '/'), rule_name, severity, message)
+
+
+class NdjsonReporter:
+    stream: TextIO
+    buffer: list[str]
+    buffer_size: int
+
+    def __init__(self, stream: TextIO, buffer_size: int = 256):
+        self.stream = stream
+        self.buffer = []
+        self.buffer_size = buffer_size
+
+    def report(self, filepath: str, rules_results: RulesResults) -> None:
+        # Findings are written in batches, so that large audits do not write to the stream once per finding
+        for finding in iterate_findings(filepath, rules_results):
+            self.buffer.append(dumps(finding._asdict()) + '\n')
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.stream.write(''.join(self.buffer))
+            self.buffer = []
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+
+class SarifReporter:
+    stream: TextIO
+    rules: dict[str, int]
+    results: list[dict]
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.rules = {}
+        self.results = []
+
+    def report(self, filepath: str, rules_results: RulesResults) -> None:
+        for finding in iterate_findings(filepath, rules_results):
+            self.results.append({
+                'ruleId': finding.rule,
+                'ruleIndex': self.rules.setdefault(finding.rule, len(self.rules)),
+                'level': sarif_levels[finding.severity],
+                'message': {'text': finding.message},
+                'locations': [{'physicalLocation': {'artifactLocation': {'uri': finding.filepath}}}],
+            })
+
+    def close(self) -> None:
+        # SARIF is a single document, so it can be written only when all posts are checked
+        self.stream.write(dumps({
+            '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+            'version': '2.1.0',
+            'runs': [{
+                'tool': {'driver': {'name': 'rule-keeper', 'rules': [{'id': rule_name} for rule_name in self.rules]}},
+                'results': self.results,
+            }],
+        }) + '\n')
+        self.stream.flush()
+
+
+class SummaryReporter:
+    stream: TextIO
+    summary: AuditSummary
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.summary = AuditSummary()
+
+    def report(self, filepath: str, rules_results: RulesResults) -> None:
+        self.summary.record(filepath, rules_results)
+
+    def close(self) -> None:
+        self.stream.write(self.summary.format() + '\n')
+        self.stream.flush()
+
+
+Reporter = NdjsonReporter | SarifReporter | SummaryReporter
+reporters_by_format = {'ndjson': NdjsonReporter, 'sarif': SarifReporter, 'summary': SummaryReporter}
+
+
+def create_reporter(report_format: str, stream: TextIO) -> Reporter:
+    return reporters_by_format[report_format](stream)
@@ -1,5 +1,12 @@
 from post import PostDataExtractor, PostData
-from typing import Callable, NotRequired, TypedDict
+from profiler import Profiler, rule_phase_prefix
+from tokens import tokenize
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from os.path import basename
+from typing import Callable, ContextManager, Iterable, Iterator, NotRequired, TypedDict
 
 
 class RuleCheckResults(TypedDict):
@@ -8,58 +15,270 @@ class RuleCheckResults(TypedDict):
     recommendations: NotRequired[list[str]]
 
 
+RulesResults = list[tuple[str, RuleCheckResults]]
+
+post_data_extractor_rule_name = 'post_data_extractor'
+
+FILENAME = 'filename'
+METADATA = 'metadata'
+CONTENT = 'content'
+CORPUS = 'corpus'
+NETWORK = 'network'
+# Checkers are run from the cheapest requirement to the most expensive one
+requirements_costs = {FILENAME: 0, METADATA: 1, CONTENT: 2, CORPUS: 3, NETWORK: 4}
+RuleChecker = Callable[[PostData], RuleCheckResults]
+
+
+def requires(*requirements: str) -> Callable[[RuleChecker], RuleChecker]:
+    unknown_requirements = set(requirements) - requirements_costs.keys()
+    if unknown_requirements:
+        raise ValueError('Unknown rule requirements: {}'.format(', '.join(sorted(unknown_requirements))))
+
+    def declare_requirements(rule_checker: RuleChecker) -> RuleChecker:
+        rule_checker.rule_requirements = frozenset(requirements)
+        return rule_checker
+
+    return declare_requirements
+
+
+def find_rule_requirements(rule_checker: RuleChecker) -> frozenset[str]:
+    # Checkers which do not declare their requirements get the whole post
+    return getattr(rule_checker, 'rule_requirements', frozenset((METADATA, CONTENT)))
+
+
+def schedule_rule_checkers(rule_checkers: list[RuleChecker]) -> list[tuple[RuleChecker, frozenset[str]]]:
+    scheduled_rule_checkers = [(rule_checker, find_rule_requirements(rule_checker)) for rule_checker in rule_checkers]
+
+    return sorted(scheduled_rule_checkers, key=lambda scheduled_rule_checker: max(
+        (requirements_costs[requirement] for requirement in scheduled_rule_checker[1]), default=0
+    ))
+
+
+def find_rule_name(rule_checker: Callable[[PostData], RuleCheckResults]) -> str:
+    return getattr(rule_checker, '__qualname__', None) or repr(rule_checker)
+
+
 class RuleKeeper:
     rule_checkers: list[Callable[[PostData], RuleCheckResults]] = []
     post_data_extractor: PostDataExtractor
     results_printer: Callable[[str, RuleCheckResults], None]
+    workers: int
+    rules_results_listener: Callable[[str, RulesResults], None] | None
+    report_extraction_errors: bool
+    profiler: Profiler | None
+    fail_fast: bool
+    scheduled_rule_checkers: list[tuple[RuleChecker, frozenset[str]]]
+
+    files_per_worker_task = 16
 
     def __init__(
             self,
             post_data_extractor: PostDataExtractor,
             rule_checkers: list[Callable[[PostData], RuleCheckResults]],
-            results_printer: Callable[[str, RuleCheckResults], None]
+            results_printer: Callable[[str, RuleCheckResults], None],
+            workers: int = 1,
+            rules_results_listener: Callable[[str, RulesResults], None] | None = None,
+            report_extraction_errors: bool = False,
+            profiler: Profiler | None = None,
+            fail_fast: bool = False,
     ):
         self.post_data_extractor = post_data_extractor
         self.rule_checkers = rule_checkers
         self.results_printer = results_printer
+        self.workers = workers
+        self.rules_results_listener = rules_results_listener
+        self.report_extraction_errors = report_extraction_errors
+        self.profiler = profiler
+        self.fail_fast = fail_fast
+        self.scheduled_rule_checkers = schedule_rule_checkers(rule_checkers)
 
-    def feed_tag_cleaner(self, post_data: PostData):
-        pass
-
-    def check_rules_for_files(self, files_to_check: list[str]) -> bool:
-        if not files_to_check:
-            print('There was no files to check')
+    def measure(self, phase_name: str) -> ContextManager:
+        return self.profiler.measure(phase_name) if self.profiler is not None else nullcontext()
 
+    def check_rules_for_files(self, files_to_check: Iterable[str]) -> bool:
         issue_found = False
-        for filepath in files_to_check:
-            if not filepath.endswith('.md'):
-                continue
-
-            post_data = self.post_data_extractor.extract_data(filepath)
+        checked_files_count = 0
+        posts_to_check = (filepath for filepath in files_to_check if filepath.endswith('.md'))
 
-            issue_found_in_file = self.execute_rule_checkers(filepath, post_data)
+        for filepath, rules_results in self.iterate_check_results(posts_to_check):
+            checked_files_count += 1
+            all_results, issue_found_in_file = self.merge_results(rules_results)
+            with self.measure('printing'):
+                if self.rules_results_listener is not None:
+                    self.rules_results_listener(filepath, rules_results)
+                self.results_printer(filepath, all_results)
 
             if issue_found_in_file:
                 issue_found = True
 
+        # Files may come from a generator, so they are counted while they are checked
+        if checked_files_count == 0:
+            print('There was no files to check')
+
         return issue_found
 
-    def execute_rule_checkers(self, filepath: str, post_data: PostData) -> bool:
-        any_error_found = False
-        all_results: RuleCheckResults = ({'errors': [], 'warnings': [], 'recommendations': []})
+    def iterate_check_results(self, filepaths: Iterable[str]) -> Iterator[tuple[str, RulesResults]]:
+        filepaths = iter(filepaths)
+
+        if self.workers <= 1:
+            for filepath in filepaths:
+                yield filepath, self.check_file(filepath)
+            return
+
+        # Checkers and extractor are sent to every worker once. Only a few tasks are kept in flight, so files are
+        # streamed through the pool and results come back in the order of files.
+        with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=initialize_worker,
+                initargs=(
+                    self.post_data_extractor,
+                    self.rule_checkers,
+                    self.report_extraction_errors,
+                    self.profiler.rule_time_budget if self.profiler is not None else None,
+                    self.profiler is not None,
+                    self.fail_fast,
+                ),
+        ) as executor:
+            pending_tasks: deque[tuple[list[str], Future]] = deque()
+
+            for filepaths_chunk in iter(lambda: list(islice(filepaths, self.files_per_worker_task)), []):
+                pending_tasks.append((filepaths_chunk, executor.submit(check_files_in_worker, filepaths_chunk)))
+                if len(pending_tasks) >= self.workers * 2:
+                    yield from self.resolve_task(*pending_tasks.popleft())
+
+            while pending_tasks:
+                yield from self.resolve_task(*pending_tasks.popleft())
 
-        for rule_checker in self.rule_checkers:
+    def resolve_task(self, filepaths: list[str], task: Future) -> Iterator[tuple[str, RulesResults]]:
+        files_results, profiler_report = task.result()
+        if self.profiler is not None:
+            self.profiler.merge(profiler_report)
+
+        for filepath, file_results in zip(filepaths, files_results):
+            if isinstance(file_results, Exception):
+                raise file_results
+            yield filepath, file_results
+
+    def check_file(self, filepath: str) -> RulesResults:
+        # Parts of the post are read only when the first checker requiring them is reached
+        post_data = PostData(filename=basename(filepath), content=(), metadata={})
+        loaded_requirements = {FILENAME, CORPUS, NETWORK}
+        rules_results = []
+
+        for position, (rule_checker, requirements) in enumerate(self.scheduled_rule_checkers):
+            if not requirements <= loaded_requirements:
+                try:
+                    post_data = self.extract_required_data(filepath, post_data, requirements, loaded_requirements, [
+                        remaining_requirements for _, remaining_requirements in self.scheduled_rule_checkers[position:]
+                    ])
+                except RuntimeError as error:
+                    return rules_results + self.report_extraction_error(error)
+
+            post_data = self.tokenize(post_data, requirements)
+            if self.run_rule_checker(rule_checker, post_data, rules_results):
+                return rules_results
+
+        # Invalid front matter is reported even when no checker reads it
+        if METADATA not in loaded_requirements:
+            try:
+                self.extract_required_data(filepath, post_data, {METADATA}, loaded_requirements, [])
+            except RuntimeError as error:
+                return rules_results + self.report_extraction_error(error)
+
+        return rules_results
+
+    def extract_required_data(
+            self,
+            filepath: str,
+            post_data: PostData,
+            requirements: frozenset[str] | set[str],
+            loaded_requirements: set[str],
+            remaining_requirements: list[frozenset[str]],
+    ) -> PostData:
+        # Unless the checks may stop early, content needed later is read together with the metadata
+        content_required = CONTENT in requirements or not self.fail_fast and any(
+            CONTENT in rule_requirements for rule_requirements in remaining_requirements
+        )
+
+        with self.measure('extraction'):
+            if content_required:
+                post_data = self.post_data_extractor.extract_data(filepath)
+                loaded_requirements.update((METADATA, CONTENT))
+            else:
+                post_data = post_data._replace(metadata=self.post_data_extractor.extract_metadata(filepath))
+                loaded_requirements.add(METADATA)
+
+        return post_data
+
+    def report_extraction_error(self, error: RuntimeError) -> RulesResults:
+        if not self.report_extraction_errors:
+            raise error
+
+        return [(post_data_extractor_rule_name, {'errors': [str(error)]})]
+
+    def tokenize(self, post_data: PostData, requirements: frozenset[str]) -> PostData:
+        # Content is tokenized once and shared by all checkers
+        if CONTENT in requirements and post_data.tokens is None:
+            with self.measure('tokenization'):
+                return post_data._replace(tokens=tokenize(post_data.content))
+
+        return post_data
+
+    def run_rule_checker(self, rule_checker: RuleChecker, post_data: PostData, rules_results: RulesResults) -> bool:
+        rule_name = find_rule_name(rule_checker)
+        with self.measure(rule_phase_prefix + rule_name):
             checker_results = rule_checker(post_data)
-            if checker_results.keys():
-                empty_array = []
-                all_results = dict(
-                    (key, all_results.get(key, empty_array) + checker_results.get(key, empty_array))
-                    for key in all_results.keys()
-                )
+        rules_results.append((rule_name, checker_results))
+
+        return self.fail_fast and bool(checker_results.get('errors'))
+
+    def merge_results(self, rules_results: RulesResults) -> tuple[RuleCheckResults, bool]:
+        all_results: RuleCheckResults = ({'errors': [], 'warnings': [], 'recommendations': []})
+
+        for rule_name, checker_results in rules_results:
+            for key, results in all_results.items():
+                if key in checker_results:
+                    results.extend(checker_results[key])
+
+        return all_results, bool(all_results['errors'])
+
+
+worker_rule_keeper: RuleKeeper | None = None
+
+
+def initialize_worker(
+        post_data_extractor: PostDataExtractor,
+        rule_checkers: list[Callable[[PostData], RuleCheckResults]],
+        report_extraction_errors: bool,
+        rule_time_budget: float | None,
+        profile: bool,
+        fail_fast: bool,
+) -> None:
+    global worker_rule_keeper
+    worker_rule_keeper = RuleKeeper(
+        post_data_extractor,
+        rule_checkers,
+        results_printer=lambda filepath, results: None,
+        report_extraction_errors=report_extraction_errors,
+        profiler=Profiler(rule_time_budget) if profile else None,
+        fail_fast=fail_fast,
+    )
+
+
+def check_files_in_worker(filepaths: list[str]) -> tuple[list[RulesResults | Exception], dict]:
+    files_results = []
 
-            if 'errors' in checker_results and checker_results['errors']:
-                any_error_found = True
+    # Failure of one file must not hide results of files checked before it
+    for filepath in filepaths:
+        try:
+            files_results.append(worker_rule_keeper.check_file(filepath))
+        except Exception as error:
+            files_results.append(error)
 
-        self.results_printer(filepath, all_results)
+    # Timings are sent to the main process with every batch, so they are not counted twice
+    profiler_report = {}
+    if worker_rule_keeper.profiler is not None:
+        profiler_report = worker_rule_keeper.profiler.report()
+        worker_rule_keeper.profiler.reset()
 
-        return any_error_found
+    return files_results, profiler_report
@@ -0,0 +1,97 @@
+from tag_recommender import TagSimilarityIndex
+from collections import Counter
+from json import dump, load
+from typing import Iterable
+import re
+
+separators_pattern = re.compile(r'[\s_-]+')
+
+
+def find_singular_form(unified_tag: str) -> str:
+    if len(unified_tag) > 4 and unified_tag.endswith('ies'):
+        return unified_tag[:-3] + 'y'
+    if unified_tag.endswith(('ches', 'shes', 'sses', 'xes')):
+        return unified_tag[:-2]
+    if len(unified_tag) > 3 and unified_tag.endswith('s') and not unified_tag.endswith(('ss', 'us', 'is')):
+        return unified_tag[:-1]
+
+    return unified_tag
+
+
+def load_canonical_tags(filepath: str) -> dict[str, str]:
+    try:
+        with open(filepath, 'r') as file:
+            return load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_canonical_tags(filepath: str, canonical_tags: dict[str, str]) -> None:
+    with open(filepath, 'w') as file:
+        dump(canonical_tags, file, indent=2, sort_keys=True, ensure_ascii=False)
+        file.write('\n')
+
+
+def find_variant_key(tag: str) -> str:
+    return separators_pattern.sub('', find_singular_form(tag.lower()))
+
+
+class TagCleaner:
+    tags_counts: Counter
+
+    # Stricter than recommendations, as variants are merged without looking at them one by one
+    similarity_threshold = 0.95
+
+    def __init__(self):
+        self.tags_counts = Counter()
+
+    def add_tags(self, tags: Iterable[str]) -> None:
+        self.tags_counts.update(tag for tag in tags if tag)
+
+    def find_clusters(self) -> list[list[str]]:
+        parents = {tag: tag for tag in self.tags_counts}
+
+        def find_root(tag: str) -> str:
+            while parents[tag] != tag:
+                parents[tag] = parents[parents[tag]]
+                tag = parents[tag]
+            return tag
+
+        def join(tag: str, other_tag: str) -> None:
+            parents[find_root(tag)] = find_root(other_tag)
+
+        # Case, separator and plural variants share a key, similar spellings are compared in one pass over all tags
+        tags_by_key = {}
+        for tag in self.tags_counts:
+            key = find_variant_key(tag)
+            if key in tags_by_key:
+                join(tag, tags_by_key[key])
+            else:
+                tags_by_key[key] = tag
+
+        similarity_index = TagSimilarityIndex(tags_by_key.values(), self.similarity_threshold)
+        for tag, other_tag in similarity_index.find_similar_pairs():
+            join(tag, other_tag)
+
+        clusters = {}
+        for tag in self.tags_counts:
+            clusters.setdefault(find_root(tag), []).append(tag)
+
+        return sorted(
+            sorted(cluster, key=lambda tag: (-self.tags_counts[tag], tag))
+            for cluster in clusters.values() if len(cluster) > 1
+        )
+
+    def build_canonical_tags(self) -> dict[str, str]:
+        # The tag used in most posts becomes the canonical one
+        return {variant: cluster[0] for cluster in self.find_clusters() for variant in cluster[1:]}
+
+    def format_clusters(self) -> str:
+        clusters = self.find_clusters()
+        lines = ['Found {} groups of tag variants'.format(len(clusters))]
+        for cluster in clusters:
+            lines.append('{} ({}) <- {}'.format(cluster[0], self.tags_counts[cluster[0]], ', '.join(
+                '{} ({})'.format(variant, self.tags_counts[variant]) for variant in cluster[1:]
+            )))
+
+        return '\n'.join(lines)
@@ -0,0 +1,125 @@
+from cache_file import load_cache, save_cache
+from post import PostDataExtractor
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable
+import os
+
+
+def stat_fingerprint(filepath: str) -> str:
+    file_stat = os.stat(filepath)
+    return '{}:{}'.format(file_stat.st_mtime_ns, file_stat.st_size)
+
+
+def extract_metadata_in_worker(
+        data_extractor: PostDataExtractor, filepath: str
+) -> dict[str, list[str] | str] | RuntimeError:
+    # Failure of one post must not hide metadata of posts extracted in the same worker
+    try:
+        return data_extractor.extract_metadata(filepath)
+    except RuntimeError as error:
+        return error
+
+
+class TagIndex:
+    FORMAT_VERSION = 1
+
+    data_extractor: PostDataExtractor
+    cache_filepath: str | None
+    fingerprint: Callable[[str], str]
+    entries: dict[str, tuple[str, list[str]]]
+    changed: bool
+    workers: int
+
+    def __init__(
+            self,
+            data_extractor: PostDataExtractor,
+            cache_filepath: str | None = None,
+            fingerprint: Callable[[str], str] = stat_fingerprint,
+            workers: int = 1,
+    ):
+        self.data_extractor = data_extractor
+        self.cache_filepath = cache_filepath
+        self.fingerprint = fingerprint
+        self.entries = {}
+        self.changed = False
+        self.workers = workers
+
+    def load(self) -> None:
+        cache = load_cache(self.cache_filepath, self.FORMAT_VERSION)
+        if cache is None:
+            return
+
+        try:
+            self.entries = {
+                filepath: (entry['fingerprint'], list(entry['tags']))
+                for filepath, entry in cache['posts'].items()
+            }
+        except (KeyError, TypeError, AttributeError):
+            self.entries = {}
+
+    def save(self) -> None:
+        if self.cache_filepath is None or not self.changed:
+            return
+
+        if save_cache(self.cache_filepath, self.FORMAT_VERSION, {'posts': {
+            filepath: {'fingerprint': fingerprint, 'tags': tags}
+            for filepath, (fingerprint, tags) in self.entries.items()
+        }}):
+            self.changed = False
+
+    def retain(self, filepaths: list[str]) -> None:
+        filepaths_to_keep = set(filepaths)
+        for filepath in [filepath for filepath in self.entries if filepath not in filepaths_to_keep]:
+            del self.entries[filepath]
+            self.changed = True
+
+    def find_tags(self, filepath: str) -> list[str]:
+        fingerprint = self.fingerprint(filepath)
+        entry = self.entries.get(filepath)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+
+        return self.store_tags(filepath, fingerprint, self.data_extractor.extract_metadata(filepath))
+
+    def store_tags(self, filepath: str, fingerprint: str, metadata: dict[str, list[str] | str]) -> list[str]:
+        tags = list(metadata['tags']) if 'tags' in metadata and metadata['tags'] else []
+        self.entries[filepath] = (fingerprint, tags)
+        self.changed = True
+
+        return tags
+
+    def find_existing_tags(self, post_filepaths_to_extract_tags_from: list[str]) -> list[str]:
+        if self.workers > 1:
+            self.refresh_in_parallel(post_filepaths_to_extract_tags_from)
+
+        existing_tags = []
+
+        for filepath in post_filepaths_to_extract_tags_from:
+            try:
+                existing_tags.extend(self.find_tags(filepath))
+            except RuntimeError:
+                # Posts which can not be parsed are left out of the existing tags, their checks report the error
+                continue
+
+        return existing_tags
+
+    def refresh_in_parallel(self, filepaths: list[str]) -> None:
+        stale_posts = {}
+        for filepath in filepaths:
+            fingerprint = self.fingerprint(filepath)
+            entry = self.entries.get(filepath)
+            if entry is None or entry[0] != fingerprint:
+                stale_posts[filepath] = fingerprint
+
+        if len(stale_posts) <= 1:
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            chunksize = max(1, len(stale_posts) // (self.workers * 4))
+            posts_metadata = executor.map(
+                extract_metadata_in_worker, repeat(self.data_extractor), stale_posts.keys(), chunksize=chunksize
+            )
+            for (filepath, fingerprint), metadata in zip(stale_posts.items(), posts_metadata):
+                if not isinstance(metadata, RuntimeError):
+                    self.store_tags(filepath, fingerprint, metadata)
@@ -1,72 +1,271 @@
-from post import PostData, PostDataExtractor
-from rule_keeper import RuleCheckResults
+from post import PostData
+from rule_keeper import METADATA, CONTENT, CORPUS, RuleCheckResults, requires
 import jellyfish
-from functools import reduce
-from operator import iconcat
+from keyword_matcher import KeywordMatcher
+from tokens import PostTokens, word_pattern
+from bisect import bisect_right
+from collections import Counter
+from typing import Iterable, Iterator
 
 
-def find_existing_tags(
-        data_extractor: PostDataExtractor,
-        post_filepaths_to_extract_tags_from: list[str],
-) -> list[str]:
-    existing_tags = []
+class TagsOfLength:
+    positions: list[int]
+    tags: list[str]
+    unified_tags: list[str]
+    all_tags_mask: int
+    character_masks: dict[str, int]
 
-    for filepath in post_filepaths_to_extract_tags_from:
-        post_data = data_extractor.extract_data(filepath)
-        if 'tags' in post_data.metadata:
-            existing_tags = existing_tags + post_data.metadata['tags']
+    def __init__(self, tags_with_positions: list[tuple[int, str, str]]):
+        self.positions = [position for position, tag, unified_tag in tags_with_positions]
+        self.tags = [tag for position, tag, unified_tag in tags_with_positions]
+        self.unified_tags = [unified_tag for position, tag, unified_tag in tags_with_positions]
+        self.all_tags_mask = (1 << len(self.tags)) - 1
 
-    return existing_tags
+        tags_by_character: dict[str, list[int]] = {}
+        for tag_number, unified_tag in enumerate(self.unified_tags):
+            for character in set(unified_tag):
+                tags_by_character.setdefault(character, []).append(tag_number)
+
+        self.character_masks = {
+            character: build_mask(tag_numbers, len(self.tags)) for character, tag_numbers in tags_by_character.items()
+        }
+
+    def find_tags_after_mask(self, position: int) -> int:
+        return self.all_tags_mask & ~((1 << bisect_right(self.positions, position)) - 1)
+
+    def find_candidates(
+            self,
+            new_tag_characters: Counter,
+            allowed_missing_characters: int,
+            tags_mask: int | None = None,
+    ) -> Iterator[int]:
+        tags_mask = self.all_tags_mask if tags_mask is None else tags_mask
+        # Candidates which lack more characters of the new tag than allowed can not reach the similarity threshold
+        candidates_by_missing_characters = [tags_mask] + [0] * allowed_missing_characters
+
+        for character, count in new_tag_characters.items():
+            tags_without_character = tags_mask & ~self.character_masks.get(character, 0)
+            if not tags_without_character:
+                continue
+            for missing_characters in range(allowed_missing_characters, -1, -1):
+                moved_candidates = candidates_by_missing_characters[missing_characters] & tags_without_character
+                if not moved_candidates:
+                    continue
+                candidates_by_missing_characters[missing_characters] &= ~moved_candidates
+                if missing_characters + count <= allowed_missing_characters:
+                    candidates_by_missing_characters[missing_characters + count] |= moved_candidates
+
+        candidates = 0
+        for candidates_mask in candidates_by_missing_characters:
+            candidates |= candidates_mask
+
+        while candidates:
+            lowest_candidate = candidates & -candidates
+            yield lowest_candidate.bit_length() - 1
+            candidates ^= lowest_candidate
+
+
+class TagSimilarityIndex:
+    similarity_threshold = 0.90
+
+    tags_by_length: dict[int, TagsOfLength]
+    similarity_scores: dict[tuple[str, str], float]
+    allowed_missing_characters: dict[tuple[int, int], int | None]
+
+    def __init__(self, tags: Iterable[str], similarity_threshold: float | None = None):
+        self.similarity_scores = {}
+        self.allowed_missing_characters = {}
+        if similarity_threshold is not None:
+            self.similarity_threshold = similarity_threshold
+
+        tags_with_positions_by_length: dict[int, list[tuple[int, str, str]]] = {}
+        for position, tag in enumerate(tags):
+            if not tag:
+                continue
+            unified_tag = tag.lower()
+            tags_with_positions_by_length.setdefault(len(unified_tag), []).append((position, tag, unified_tag))
+
+        self.tags_by_length = {
+            length: TagsOfLength(tags_with_positions)
+            for length, tags_with_positions in tags_with_positions_by_length.items()
+        }
+
+    def find_similar_tags(self, new_tag: str) -> list[str]:
+        unified_new_tag = new_tag.lower()
+        new_tag_characters = Counter(unified_new_tag)
+        similar_tags = []
+
+        for length, tags_of_length in self.tags_by_length.items():
+            allowed_missing_characters = self.find_allowed_missing_characters(len(unified_new_tag), length)
+            if allowed_missing_characters is None:
+                continue
+
+            for tag_number in tags_of_length.find_candidates(new_tag_characters, allowed_missing_characters):
+                existing_tag = tags_of_length.tags[tag_number]
+                similarity = self.similarity(unified_new_tag, tags_of_length.unified_tags[tag_number])
+                if similarity >= self.similarity_threshold and (similarity != 1 or existing_tag != new_tag):
+                    similar_tags.append((tags_of_length.positions[tag_number], existing_tag))
+
+        return [existing_tag for position, existing_tag in sorted(similar_tags)]
+
+    def find_similar_pairs(self) -> Iterator[tuple[str, str]]:
+        # Similarity is symmetric, so every tag is compared only with tags after it and each pair is found once
+        for tags_of_length in self.tags_by_length.values():
+            for position, tag, unified_tag in zip(
+                    tags_of_length.positions, tags_of_length.tags, tags_of_length.unified_tags
+            ):
+                tag_characters = Counter(unified_tag)
+                for length, other_tags_of_length in self.tags_by_length.items():
+                    allowed_missing_characters = self.find_allowed_missing_characters(len(unified_tag), length)
+                    if allowed_missing_characters is None:
+                        continue
+
+                    for tag_number in other_tags_of_length.find_candidates(
+                            tag_characters,
+                            allowed_missing_characters,
+                            other_tags_of_length.find_tags_after_mask(position),
+                    ):
+                        other_unified_tag = other_tags_of_length.unified_tags[tag_number]
+                        if jellyfish.jaro_similarity(unified_tag, other_unified_tag) >= self.similarity_threshold:
+                            yield tag, other_tags_of_length.tags[tag_number]
+
+    def find_allowed_missing_characters(self, new_tag_length: int, existing_tag_length: int) -> int | None:
+        key = (new_tag_length, existing_tag_length)
+        if key not in self.allowed_missing_characters:
+            self.allowed_missing_characters[key] = self.compute_allowed_missing_characters(*key)
+
+        return self.allowed_missing_characters[key]
+
+    def compute_allowed_missing_characters(self, new_tag_length: int, existing_tag_length: int) -> int | None:
+        allowed_missing_characters = None
+        for missing_characters in range(new_tag_length):
+            common_characters = min(existing_tag_length, new_tag_length - missing_characters)
+            if not self.may_reach_threshold(common_characters, new_tag_length, existing_tag_length):
+                break
+            allowed_missing_characters = missing_characters
+
+        return allowed_missing_characters
+
+    def may_reach_threshold(self, common_characters: int, first_length: int, second_length: int) -> bool:
+        # Jaro similarity is at most (m/|a| + m/|b| + 1) / 3 for m characters that could be matched
+        if common_characters == 0:
+            return False
+        upper_bound = (common_characters / first_length + common_characters / second_length + 1) / 3
+        return upper_bound >= self.similarity_threshold - 1e-9
+
+    def similarity(self, unified_new_tag: str, unified_existing_tag: str) -> float:
+        key = (unified_new_tag, unified_existing_tag)
+        if key not in self.similarity_scores:
+            self.similarity_scores[key] = jellyfish.jaro_similarity(unified_new_tag, unified_existing_tag)
+
+        return self.similarity_scores[key]
+
+
+def build_mask(bit_numbers: list[int], size: int) -> int:
+    mask_bytes = bytearray((size + 7) // 8)
+    for bit_number in bit_numbers:
+        mask_bytes[bit_number >> 3] |= 1 << (bit_number & 7)
+
+    return int.from_bytes(mask_bytes, 'little')
 
 
 class ExistingTagsRecommender:
     existing_tags: set[str]
+    similarity_index: TagSimilarityIndex
+    canonical_tags: dict[str, str]
 
-    def __init__(self, existing_tags: set[str]):
+    def __init__(self, existing_tags: set[str], canonical_tags: dict[str, str] | None = None):
+        self.canonical_tags = canonical_tags or {}
+        self.update_existing_tags(existing_tags)
+
+    def update_existing_tags(self, existing_tags: set[str]) -> None:
         self.existing_tags = existing_tags
+        self.similarity_index = TagSimilarityIndex(existing_tags)
 
+    @requires(METADATA, CORPUS)
     def recommend_tags(self, post_data: PostData) -> RuleCheckResults:
         if 'tags' not in post_data.metadata:
             return {}
 
         tags_recommendations = []
         for new_post_tag in post_data.metadata['tags']:
-            for existing_tag in self.existing_tags:
-                if new_post_tag and existing_tag and self.are_tags_similar(existing_tag, new_post_tag):
-                    tags_recommendations.append(
-                        'Tag "{}" looks similar to existing tag "{}". Consider changing it to the existing one'.format(
-                            new_post_tag,
-                            existing_tag
-                        )
+            if not new_post_tag:
+                continue
+            if new_post_tag in self.canonical_tags:
+                tags_recommendations.append(
+                    'Tag "{}" is a variant of tag "{}". Consider changing it to the canonical one'.format(
+                        new_post_tag,
+                        self.canonical_tags[new_post_tag]
+                    )
+                )
+                continue
+
+            similar_tags = dict.fromkeys(
+                self.canonical_tags.get(existing_tag, existing_tag)
+                for existing_tag in self.similarity_index.find_similar_tags(new_post_tag)
+            )
+            for existing_tag in similar_tags:
+                if existing_tag == new_post_tag:
+                    continue
+                tags_recommendations.append(
+                    'Tag "{}" looks similar to existing tag "{}". Consider changing it to the existing one'.format(
+                        new_post_tag,
+                        existing_tag
                     )
+                )
 
         if tags_recommendations:
             return {'recommendations': tags_recommendations}
 
         return {}
 
-    def are_tags_similar(self, existing_tag: str, new_tag: str) -> bool:
-        unified_existing_tag = existing_tag.lower()
-        unified_new_tag = new_tag.lower()
-        return jellyfish.jaro_similarity(unified_new_tag, unified_existing_tag) >= 0.90 \
-            and (jellyfish.jaro_similarity(unified_new_tag, unified_existing_tag) != 1 or existing_tag != new_tag)
-
 
 class KeyTagsRecommender:
     key_tags: list[str]
+    case_sensitive: bool
+    single_word_key_tags: list[str]
+    multi_word_key_tags_words: list[set[str]]
+    keyword_matcher: KeywordMatcher
+    canonical_tags: dict[str, str]
 
-    def __init__(self, key_tags):
+    def __init__(self, key_tags, case_sensitive: bool = True, canonical_tags: dict[str, str] | None = None):
         self.key_tags = key_tags
+        self.case_sensitive = case_sensitive
+        self.canonical_tags = canonical_tags or {}
+        # Tags of a single word are looked up from words of the post, only longer tags are searched from the text
+        self.single_word_key_tags = [key_tag for key_tag in key_tags if word_pattern.fullmatch(key_tag)]
+        multi_word_key_tags = [key_tag for key_tag in key_tags if key_tag not in self.single_word_key_tags]
+        self.multi_word_key_tags_words = [
+            set(word_pattern.findall(self.unify_text(key_tag))) for key_tag in multi_word_key_tags
+        ]
+        self.keyword_matcher = KeywordMatcher(multi_word_key_tags, case_sensitive)
+
+    def unify_text(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def find_key_tags(self, post_tokens: PostTokens) -> set[str]:
+        words = post_tokens.word_set if self.case_sensitive else {word.lower() for word in post_tokens.word_set}
+        found_key_tags = {key_tag for key_tag in self.single_word_key_tags if self.unify_text(key_tag) in words}
+
+        if any(key_tag_words <= words for key_tag_words in self.multi_word_key_tags_words):
+            found_key_tags.update(self.keyword_matcher.find_keywords(post_tokens.plain_lines))
+
+        return found_key_tags
 
+    @requires(METADATA, CONTENT)
     def recommend_tags(self, post_data: PostData) -> RuleCheckResults:
-        post_tags: list[str] = post_data.metadata['tags'] if 'tags' in post_data.metadata else []
+        post_tags: list[str] = post_data.metadata['tags'] if post_data.metadata.get('tags') else []
+        post_tags = [self.canonical_tags.get(post_tag, post_tag) for post_tag in post_tags]
+        if not self.case_sensitive:
+            post_tags = [post_tag.lower() for post_tag in post_tags if post_tag]
 
-        unique_content_words = set(reduce(iconcat, [content_line.split(' ') for content_line in post_data.content], []))
+        found_key_tags = self.find_key_tags(post_data.find_tokens())
 
         tags_recommendations = ['']
 
         for key_tag in self.key_tags:
-            if key_tag in unique_content_words and key_tag not in post_tags:
+            unified_key_tag = self.unify_text(key_tag)
+            if key_tag in found_key_tags and unified_key_tag not in post_tags:
                 tags_recommendations.append(key_tag)
 
         if len(tags_recommendations) > 1:
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from assets import (
+    AssetChecker, AssetIndex, find_asset_references, find_post_asset_references, find_referenced_assets,
+    iterate_site_text_files,
+)
+from post import PostData
+from tokens import tokenize
+
+
+class TestFindAssetReferences(unittest.TestCase):
+    def test_expect_references_of_site_assets_to_be_found(self):
+        self.assertEqual(find_asset_references([
+            '[![small](/img/post/small/image.jpg)](/img/post/image.jpg)\n',
+            '<img src="/img/post/My%20image.png?version=2" alt="">\n',
+            '![absolute](https://dev.solita.fi/img/post/absolute.png)\n',
+            '![foreign](https://example.com/img/foreign.png)\n',
+            '![nested](https://github.com/a/b/img/c.png)\n',
+            '![again](/img/post/image.jpg)\n',
+            'background: url(/img/post/summary(adult).png);\n',
+        ]), [
+            'img/post/small/image.jpg', 'img/post/image.jpg', 'img/post/My image.png', 'img/post/absolute.png',
+            'img/post/summary(adult).png',
+        ])
+
+    def test_expect_only_local_references_of_post_to_be_found(self):
+        self.assertEqual(find_post_asset_references(tokenize([
+            '[![small](/img/post/small/image.jpg)](/img/post/image.jpg)\n',
+            '![summary](/img/post/summary(adult).png)\n',
+            '![absolute](https://dev.solita.fi/img/post/absolute.png)\n',
+            '![nested](https://github.com/a/b/img/c.png)\n',
+            '[relative](img/post/relative.png)\n',
+            '<source src="/img/post/video.webm" type="video/webm">\n',
+            '```\n',
+            '![code](/img/post/code.png)\n',
+            '```\n',
+        ])), [
+            'img/post/small/image.jpg', 'img/post/summary(adult).png', 'img/post/absolute.png',
+            'img/post/video.webm', 'img/post/image.jpg',
+        ])
+
+
+class TestAssetIndex(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.site_directory = self.temporary_directory.name
+        self.cache_filepath = os.path.join(self.site_directory, '.cache', 'asset_index.json')
+        self.write_file('img/post/small.png', b'small')
+        self.write_file('img/post/large.png', b'large' * 1000)
+        self.write_file('img/other/copy.png', b'small')
+        self.write_file('_layouts/base.html', b'<img src="/img/other/copy.png">')
+        self.write_file('_posts/2023-01-01-post.md', b'![small](/img/post/small.png)')
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def write_file(self, path: str, content: bytes):
+        filepath = os.path.join(self.site_directory, path)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, 'wb') as file:
+            file.write(content)
+
+    def test_expect_missing_and_oversized_assets_to_be_reported(self):
+        asset_checker = AssetChecker(AssetIndex(self.site_directory), size_budget=1024)
+
+        self.assertEqual(asset_checker.check_assets(PostData(
+            filename='2023-01-01-post.md',
+            content=['![small](/img/post/small.png) ![large](/img/post/large.png) ![gone](/img/post/gone.png)\n'],
+            metadata={},
+        )), {
+            'errors': ['Referenced asset /img/post/gone.png does not exist'],
+            'warnings': ['Asset /img/post/large.png takes 5 kB, which is more than the budget of 1 kB'],
+        })
+
+    def test_expect_unchanged_assets_not_to_be_hashed_again(self):
+        asset_index = AssetIndex(self.site_directory, cache_filepath=self.cache_filepath)
+        self.assertEqual(asset_index.find_duplicates(), [['img/other/copy.png', 'img/post/small.png']])
+        asset_index.save()
+
+        self.write_file('img/post/new.png', b'new')
+        cached_asset_index = AssetIndex(self.site_directory, cache_filepath=self.cache_filepath)
+        cached_asset_index.load()
+        with mock.patch('assets.sha1') as sha1:
+            self.assertEqual(cached_asset_index.find_duplicates(), [['img/other/copy.png', 'img/post/small.png']])
+            sha1.assert_not_called()
+        self.assertIsNone(cached_asset_index.entries['img/post/new.png'].content_hash)
+
+    def test_expect_unreferenced_assets_to_be_found_from_all_site_files(self):
+        asset_index = AssetIndex(self.site_directory)
+
+        referenced_assets = find_referenced_assets(iterate_site_text_files(self.site_directory))
+
+        self.assertEqual(asset_index.find_unreferenced(referenced_assets), ['img/post/large.png'])
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+from audit import AuditSummary, iterate_posts_filepaths
+
+
+class TestAuditSummary(unittest.TestCase):
+    def test_expect_results_to_be_counted_per_rule_and_type(self):
+        audit_summary = AuditSummary()
+        audit_summary.record('_posts/2020-01-01-first.md', [
+            ('filename_starts_with_a_date', {}),
+            ('KeyTagsRecommender.recommend_tags', {'recommendations': ['Recommendation1']}),
+        ])
+        audit_summary.record('_posts/second.md', [
+            ('filename_starts_with_a_date', {'errors': ['Error1']}),
+            ('KeyTagsRecommender.recommend_tags', {'recommendations': ['Recommendation2'], 'warnings': ['Warning1']}),
+        ])
+
+        self.assertEqual(audit_summary.checked_posts, 2)
+        self.assertEqual(audit_summary.posts_with_errors, 1)
+        self.assertEqual(audit_summary.results_counts, {
+            'filename_starts_with_a_date': {'errors': 1, 'warnings': 0, 'recommendations': 0},
+            'KeyTagsRecommender.recommend_tags': {'errors': 0, 'warnings': 1, 'recommendations': 2},
+        })
+        self.assertIn('Audited 2 posts, 1 of them with errors', audit_summary.format())
+
+
+class TestIteratePostsFilepaths(unittest.TestCase):
+    def test_expect_only_markdown_files_to_be_listed(self):
+        with tempfile.TemporaryDirectory() as posts_directory:
+            for filename in ['2020-01-01-first.md', '2020-01-02-second.md', 'notes.txt']:
+                with open(os.path.join(posts_directory, filename), 'w') as file:
+                    file.write('---\n---\n')
+
+            self.assertEqual(sorted(iterate_posts_filepaths(posts_directory)), [
+                os.path.join(posts_directory, '2020-01-01-first.md'),
+                os.path.join(posts_directory, '2020-01-02-second.md'),
+            ])
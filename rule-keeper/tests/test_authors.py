@@ -0,0 +1,30 @@
+import unittest
+from unittest import mock
+from authors import AuthorChecker
+from post import PostData
+
+
+class TestAuthorChecker(unittest.TestCase):
+    def setUp(self):
+        self.corpus_context = mock.Mock(authors={'arto', 'lokori'}, config_filepath='_config.yml')
+        self.author_checker = AuthorChecker(self.corpus_context)
+
+    def check_authors(self, metadata: dict):
+        return self.author_checker.check_authors(PostData(filename='2023-01-01-post.md', content=[], metadata=metadata))
+
+    def test_expect_known_authors_to_pass(self):
+        self.assertEqual(self.check_authors({'author': 'arto'}), {})
+        self.assertEqual(self.check_authors({'author': 'arto, lokori'}), {})
+
+    def test_expect_unknown_authors_to_be_reported(self):
+        self.assertEqual(self.check_authors({'author': 'lokori, pekkama'}), {'errors': [
+            'Author pekkama is not listed in authors of _config.yml'
+        ]})
+
+    def test_expect_missing_author_to_be_reported(self):
+        self.assertEqual(self.check_authors({'title': 'Post'}), {'errors': ['Metadata does not have an author']})
+
+    def test_expect_authors_not_to_be_checked_when_they_are_not_known(self):
+        self.corpus_context.authors = None
+
+        self.assertEqual(self.check_authors({'author': 'pekkama'}), {})
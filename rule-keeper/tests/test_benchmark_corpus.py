@@ -0,0 +1,23 @@
+import os
+import tempfile
+import unittest
+from benchmarks.corpus import generate_corpus
+from post import GitPostsRepository, PostDataExtractor
+
+
+class TestGenerateCorpus(unittest.TestCase):
+    def test_expect_generated_posts_to_be_valid_and_changed_in_feature_branch(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=10, tags_count=20, paragraphs=2, changed_posts_count=2)
+
+            posts_directory = os.path.join(corpus_directory, '_posts')
+            post_data_extractor = PostDataExtractor()
+            for filename in os.listdir(posts_directory):
+                post_data = post_data_extractor.extract_data(os.path.join(posts_directory, filename))
+                self.assertTrue(post_data.metadata['tags'])
+                self.assertTrue(post_data.content)
+
+            posts_repository = GitPostsRepository(corpus_directory, '_posts/')
+            self.assertEqual(len(os.listdir(posts_directory)), 12)
+            self.assertEqual(len(posts_repository.find_new_posts_identifiers()), 2)
+            self.assertEqual(len(posts_repository.find_modified_posts_identifiers()), 2)
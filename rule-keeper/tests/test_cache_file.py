@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from json import dump
+from cache_file import load_cache, save_cache
+
+
+class TestCacheFile(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache_directory = tempfile.TemporaryDirectory()
+        self.cache_filepath = os.path.join(self.cache_directory.name, 'cache', 'index.json')
+
+    def tearDown(self) -> None:
+        self.cache_directory.cleanup()
+
+    def test_expect_saved_cache_to_be_loaded(self):
+        self.assertTrue(save_cache(self.cache_filepath, 2, {'posts': {'a.md': 'b'}}))
+
+        self.assertEqual(load_cache(self.cache_filepath, 2), {'version': 2, 'posts': {'a.md': 'b'}})
+        self.assertEqual(os.listdir(os.path.dirname(self.cache_filepath)), ['index.json'])
+
+    def test_expect_cache_of_other_version_or_broken_cache_to_be_ignored(self):
+        save_cache(self.cache_filepath, 1, {'posts': {}})
+        self.assertIsNone(load_cache(self.cache_filepath, 2))
+
+        with open(self.cache_filepath, 'w') as file:
+            file.write('{"version": 2, "posts"')
+        self.assertIsNone(load_cache(self.cache_filepath, 2))
+
+        with open(self.cache_filepath, 'w') as file:
+            dump([2], file)
+        self.assertIsNone(load_cache(self.cache_filepath, 2))
+
+        self.assertIsNone(load_cache(os.path.join(self.cache_directory.name, 'missing.json'), 2))
+        self.assertIsNone(load_cache(None, 2))
+
+    def test_expect_cache_which_can_not_be_written_to_be_skipped(self):
+        blocking_filepath = os.path.join(self.cache_directory.name, 'cache')
+        with open(blocking_filepath, 'w') as file:
+            file.write('not a directory')
+
+        self.assertFalse(save_cache(self.cache_filepath, 2, {'posts': {}}))
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from content_recommender import ContentTagsModel, ContentTagsRecommender, find_terms
+from post import PostData, PostDataExtractor
+from tokens import tokenize
+
+
+class TestFindTerms(unittest.TestCase):
+    def test_expect_terms_outside_of_code_blocks_to_be_counted(self):
+        self.assertEqual(find_terms(tokenize([
+            'Deploying Lambda functions to [AWS](https://aws.amazon.com) with the CDK, and C# or F# in 2023.',
+            '```',
+            'aws lambda invoke',
+            '```',
+            'Lambda again',
+        ]).words), {'deploying': 1, 'lambda': 2, 'functions': 1, 'aws': 1, 'cdk': 1})
+
+
+class TestContentTagsRecommender(unittest.TestCase):
+    posts = {
+        '2020-01-01-lambda.md': (['AWS', 'Serverless'], 'Lambda functions on AWS scale with serverless workloads.'),
+        '2020-01-02-s3.md': (['AWS'], 'Storing files in S3 buckets on AWS with lambda triggers.'),
+        '2020-01-03-clojure.md': (['Clojure'], 'Clojure macros and immutable data structures in the REPL.'),
+        '2020-01-04-repl.md': (['Clojure', 'Programming'], 'Interactive REPL driven development with Clojure.'),
+        '2020-01-05-culture.md': (['Culture'], 'Team culture and retrospectives.'),
+    }
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.filepaths = []
+        for filename, (tags, content) in self.posts.items():
+            self.write_post(filename, tags, content)
+        self.model = ContentTagsModel(
+            PostDataExtractor(), os.path.join(self.temporary_directory.name, 'model.json'),
+            canonical_tags={'Serverless': 'AWS'},
+        )
+        self.model.train(self.filepaths)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def write_post(self, filename: str, tags: list[str], content: str):
+        filepath = os.path.join(self.temporary_directory.name, filename)
+        with open(filepath, 'w') as file:
+            file.write('---\ntitle: Post\ntags:\n{}---\n{}\n'.format(
+                ''.join('- {}\n'.format(tag) for tag in tags), content
+            ))
+        if filepath not in self.filepaths:
+            self.filepaths.append(filepath)
+
+    def test_expect_tags_of_posts_with_similar_content_to_be_recommended(self):
+        post_data = PostData(
+            filename='2023-01-01-new.md',
+            content=['Writing Clojure in the REPL on AWS lambda'],
+            metadata={'tags': ['AWS']},
+        )
+
+        results = ContentTagsRecommender(self.model, minimum_score=0.1).recommend_tags(post_data)
+
+        self.assertEqual(results, {'recommendations': [
+            'Following tags are used in posts with similar content: \n  - Clojure'
+        ]})
+
+    def test_expect_tags_of_single_post_and_unrelated_content_not_to_be_recommended(self):
+        post_data = PostData(filename='2023-01-01-new.md', content=['Team culture and retrospectives'], metadata={})
+
+        self.assertEqual(ContentTagsRecommender(self.model, minimum_score=0.01).recommend_tags(post_data), {})
+
+    def test_expect_only_changed_posts_to_be_read_again_from_saved_model(self):
+        self.model.save()
+        self.write_post('2020-01-05-culture.md', ['Culture', 'Clojure'], 'Clojure meetups build team culture.')
+
+        cached_model = ContentTagsModel(
+            PostDataExtractor(), self.model.cache_filepath, canonical_tags={'Serverless': 'AWS'}
+        )
+        cached_model.load()
+        self.assertEqual(cached_model.tags_by_term, self.model.tags_by_term)
+        with mock.patch.object(PostDataExtractor, 'extract_data', wraps=PostDataExtractor().extract_data) as extract:
+            cached_model.train(self.filepaths)
+
+        extract.assert_called_once()
+        self.assertNotIn('culture', self.model.tags_by_term)
+        self.assertEqual([tag for tag, weight in cached_model.tags_by_term['culture']], ['Clojure'])
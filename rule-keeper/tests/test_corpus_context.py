@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from json import dump
+from unittest import mock
+from corpus_context import CorpusContext
+from tag_index import TagIndex
+
+
+class TestCorpusContext(unittest.TestCase):
+    filename1 = '_posts/2020-01-01-file1.md'
+    filename2 = '_posts/2021-01-01-file2.md'
+    config = 'title: Blog\nauthors:\n  author1:\n    name: Author One\n  author2:\n    name: Author Two\n'
+
+    existing_tags: dict[str, list[str]] = {}
+    fingerprints: dict[str, str] = {}
+
+    def setUp(self) -> None:
+        self.existing_tags = {self.filename1: ['tag1', 'tag2'], self.filename2: ['tag2', 'tag3']}
+        self.fingerprints = {self.filename1: '1:10', self.filename2: '2:20', '_config.yml': '3:30'}
+        self.post_data_extractor_mock = mock.Mock()
+        self.post_data_extractor_mock.extract_metadata = mock.MagicMock(
+            side_effect=lambda filepath: {'tags': self.existing_tags[filepath]}
+        )
+        self.post_data_extractor_mock.open_file = mock.MagicMock(side_effect=lambda filepath: StringIO(self.config))
+        self.cache_directory = tempfile.TemporaryDirectory()
+        self.cache_filepath = os.path.join(self.cache_directory.name, 'corpus_context.json')
+
+    def tearDown(self) -> None:
+        self.cache_directory.cleanup()
+
+    def fingerprint(self, filepath: str) -> str:
+        if filepath not in self.fingerprints:
+            raise OSError('File {} does not exist'.format(filepath))
+        return self.fingerprints[filepath]
+
+    def create_corpus_context(self) -> CorpusContext:
+        corpus_context = CorpusContext(
+            self.post_data_extractor_mock,
+            TagIndex(self.post_data_extractor_mock, fingerprint=self.fingerprint),
+            cache_filepath=self.cache_filepath,
+            fingerprint=self.fingerprint,
+        )
+        corpus_context.load()
+        corpus_context.refresh_posts([self.filename1, self.filename2])
+        corpus_context.refresh_authors()
+        corpus_context.refresh_existing_tags([self.filename1, self.filename2])
+        return corpus_context
+
+    def test_expect_authors_tags_and_posts_of_corpus_to_be_found(self):
+        corpus_context = self.create_corpus_context()
+
+        self.assertEqual(corpus_context.authors, {'author1', 'author2'})
+        self.assertEqual(corpus_context.existing_tags, {'tag1', 'tag2', 'tag3'})
+        self.assertEqual(corpus_context.permalink_index.find_post('/2021/01/01/file2'), self.filename2)
+
+    def test_expect_unchanged_corpus_to_be_read_from_snapshot(self):
+        self.create_corpus_context().save()
+        self.post_data_extractor_mock.reset_mock()
+
+        corpus_context = self.create_corpus_context()
+
+        self.assertEqual(corpus_context.authors, {'author1', 'author2'})
+        self.assertEqual(corpus_context.existing_tags, {'tag1', 'tag2', 'tag3'})
+        self.post_data_extractor_mock.open_file.assert_not_called()
+        self.post_data_extractor_mock.extract_metadata.assert_not_called()
+
+    def test_expect_changed_parts_of_corpus_to_be_read_again(self):
+        self.create_corpus_context().save()
+        self.post_data_extractor_mock.reset_mock()
+        self.fingerprints[self.filename2] = '4:40'
+        self.existing_tags[self.filename2] = ['tag4']
+        self.fingerprints['_config.yml'] = '5:50'
+        self.config = 'authors:\n  author3:\n    name: Author Three\n'
+
+        corpus_context = self.create_corpus_context()
+
+        self.assertEqual(corpus_context.authors, {'author3'})
+        self.assertEqual(corpus_context.existing_tags, {'tag1', 'tag2', 'tag4'})
+
+    def test_expect_authors_to_be_unknown_without_configuration(self):
+        del self.fingerprints['_config.yml']
+
+        self.assertIsNone(self.create_corpus_context().authors)
+
+    def test_expect_snapshot_in_different_format_version_to_be_ignored(self):
+        with open(self.cache_filepath, 'w') as file:
+            dump({
+                'version': CorpusContext.FORMAT_VERSION + 1,
+                'authors': {'key': '3:30', 'names': ['outdated']},
+                'existing_tags': {'key': None, 'tags': []},
+            }, file)
+
+        self.assertEqual(self.create_corpus_context().authors, {'author1', 'author2'})
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from random import Random
+from duplicates import DuplicateChecker, DuplicateIndex, compute_signature, estimate_similarity, find_shingles
+from post import PostData, PostDataExtractor
+
+random = Random(0)
+words = ['word{}'.format(number) for number in range(2000)]
+
+
+def generate_content(words_count: int) -> list[str]:
+    return [' '.join(random.choice(words) for _ in range(10)) for _ in range(words_count // 10)]
+
+
+def change_words(content: list[str], ratio: float) -> list[str]:
+    changed_words = ' '.join(content).split()
+    for index in random.sample(range(len(changed_words)), int(len(changed_words) * ratio)):
+        changed_words[index] = 'changed'
+
+    return [' '.join(changed_words[index:index + 10]) for index in range(0, len(changed_words), 10)]
+
+
+class TestSignature(unittest.TestCase):
+    def test_expect_similarity_estimate_to_be_close_to_jaccard_similarity(self):
+        content = generate_content(2000)
+        changed_content = change_words(content, 0.03)
+        shingles = find_shingles(content, 5)
+        changed_shingles = find_shingles(changed_content, 5)
+
+        jaccard_similarity = len(shingles & changed_shingles) / len(shingles | changed_shingles)
+        estimated_similarity = estimate_similarity(
+            compute_signature(shingles, 120), compute_signature(changed_shingles, 120)
+        )
+
+        self.assertAlmostEqual(estimated_similarity, jaccard_similarity, delta=0.1)
+
+    def test_expect_short_content_to_have_a_full_signature(self):
+        self.assertEqual(find_shingles(['Just Three', 'words'], 5), {'just three words'})
+        self.assertEqual(len(compute_signature(find_shingles(['Just three words'], 5), 120)), 120)
+        self.assertIsNone(compute_signature(find_shingles([''], 5), 120))
+
+
+class TestDuplicateChecker(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.posts_contents = {}
+        for number in range(20):
+            self.write_post('2020-01-{:02}-post.md'.format(number + 1), generate_content(500))
+        self.duplicate_index = DuplicateIndex(
+            PostDataExtractor(), os.path.join(self.temporary_directory.name, 'duplicate_index.json')
+        )
+        self.duplicate_index.refresh(self.posts_contents)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def write_post(self, filename: str, content: list[str]):
+        filepath = os.path.join(self.temporary_directory.name, filename)
+        with open(filepath, 'w') as file:
+            file.write('---\ntitle: Post\n---\n' + '\n'.join(content) + '\n')
+        self.posts_contents[filepath] = content
+
+    def test_expect_copied_posts_to_be_reported(self):
+        original_filepath = os.path.join(self.temporary_directory.name, '2020-01-05-post.md')
+        copied_content = change_words(self.posts_contents[original_filepath], 0.01)
+        copied_post_data = PostData(filename='2023-01-01-copy.md', content=copied_content, metadata={})
+
+        results = DuplicateChecker(self.duplicate_index).check_duplicates(copied_post_data)
+
+        self.assertEqual(len(results['errors']), 1)
+        self.assertRegex(results['errors'][0], r'^Content is \d+% similar to content of .*2020-01-05-post.md$')
+
+    def test_expect_unique_posts_and_post_itself_not_to_be_reported(self):
+        duplicate_checker = DuplicateChecker(self.duplicate_index)
+
+        for filepath, content in self.posts_contents.items():
+            post_data = PostData(filename=os.path.basename(filepath), content=content, metadata={})
+            self.assertEqual(duplicate_checker.check_duplicates(post_data), {})
+
+    def test_expect_only_changed_posts_to_be_read_again_from_saved_index(self):
+        self.duplicate_index.save()
+        self.write_post('2020-01-01-post.md', generate_content(500))
+
+        cached_duplicate_index = DuplicateIndex(PostDataExtractor(), self.duplicate_index.cache_filepath)
+        cached_duplicate_index.load()
+        with mock.patch.object(PostDataExtractor, 'extract_data', wraps=PostDataExtractor().extract_data) as extract:
+            cached_duplicate_index.refresh(self.posts_contents)
+
+        extract.assert_called_once()
+        self.assertEqual(cached_duplicate_index.buckets.keys(), {
+            band_key
+            for fingerprint, signature in cached_duplicate_index.entries.values()
+            for band_key in cached_duplicate_index.iterate_bands(signature)
+        })
@@ -0,0 +1,54 @@
+import unittest
+from yaml import load, SafeLoader
+from front_matter import parse_simple_front_matter
+
+
+class TestParseSimpleFrontMatter(unittest.TestCase):
+    def assert_parsed_same_as_yaml(self, front_matter: str):
+        metadata_lines = front_matter.splitlines(keepends=True)
+        parsed_metadata = parse_simple_front_matter(metadata_lines)
+
+        self.assertIsNotNone(parsed_metadata, 'Front matter was not parsed:\n{}'.format(front_matter))
+        self.assertEqual(parsed_metadata, load(front_matter, SafeLoader))
+
+    def test_expect_flat_keys_and_lists_to_be_parsed(self):
+        self.assert_parsed_same_as_yaml(
+            'layout: post\n'
+            'title: "Quoted: title"\n'
+            "author: 'it''s me'\n"
+            'excerpt: Plain excerpt with C# and http://example.com\n'
+            'tags:\n'
+            '- Test\n'
+            '-\n'
+            '- Nothing special\n'
+        )
+
+    def test_expect_indented_lists_to_be_parsed(self):
+        self.assert_parsed_same_as_yaml('tags:\n  - First\n  - Second\nlayout: post\n')
+
+    def test_expect_folded_values_to_be_parsed(self):
+        self.assert_parsed_same_as_yaml(
+            'title: Folded\n'
+            'excerpt: >\n'
+            '  First line: with colon\n'
+            '  second line.  \n'
+            '\n'
+            'tags:\n'
+            '- Test\n'
+        )
+
+    def test_expect_none_for_values_which_are_not_plain_strings(self):
+        for front_matter in [
+            'date: 2016-10-31 14:50:00 +02:00\n',
+            'published: yes\n',
+            'tags:\n- NULL\n',
+            'order: 10\n',
+            'title: Title # comment\n',
+            'title: >\n  First\n\n  Second\n',
+            'title: |\n  Literal\n',
+            'tags: [First, Second]\n',
+            'tags:\n- First\n  - Second\n',
+            'author:\n  name: Someone\n',
+            'title: "Escaped \\" quote"\n',
+        ]:
+            self.assertIsNone(parse_simple_front_matter(front_matter.splitlines(keepends=True)), front_matter)
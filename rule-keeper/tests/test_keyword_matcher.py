@@ -0,0 +1,46 @@
+import unittest
+from keyword_matcher import KeywordMatcher
+from tokens import tokenize
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    content = [
+        'We moved our services from AWS to Google',
+        'Cloud last year. Azure, on the other hand, stayed.',
+        'Nothing AWSome about MuleSoftware though.',
+    ]
+
+    def test_expect_single_word_keywords_to_be_found_next_to_punctuation(self):
+        keyword_matcher = KeywordMatcher(['AWS', 'Azure'])
+        self.assertEqual(keyword_matcher.find_keywords(self.content), {'AWS', 'Azure'})
+
+    def test_expect_multi_word_keyword_to_be_found_across_lines(self):
+        keyword_matcher = KeywordMatcher(['Google Cloud'])
+        self.assertEqual(keyword_matcher.find_keywords(self.content), {'Google Cloud'})
+
+    def test_expect_multi_word_keyword_not_to_be_found_across_paragraphs_or_code_blocks(self):
+        keyword_matcher = KeywordMatcher(['Google Cloud', 'Cloud'])
+
+        for lines in [
+            ['We moved to Google', '', 'Cloud is what we use now'],
+            ['We moved to Google', ' \n', 'Cloud is what we use now'],
+            tokenize([
+                'We moved to Google\n', '```\n', 'deploy()\n', '```\n', 'Cloud is what we use now\n'
+            ]).plain_lines,
+        ]:
+            self.assertEqual(keyword_matcher.find_keywords(lines), {'Cloud'})
+
+    def test_expect_keywords_inside_other_words_to_not_be_found(self):
+        keyword_matcher = KeywordMatcher(['MuleSoft', 'Cloud last year', 'Soft'])
+        self.assertEqual(keyword_matcher.find_keywords(self.content), {'Cloud last year'})
+
+    def test_expect_overlapping_keywords_to_be_found(self):
+        keyword_matcher = KeywordMatcher(['Google', 'Google Cloud', 'Cloud'])
+        self.assertEqual(keyword_matcher.find_keywords(self.content), {'Google', 'Google Cloud', 'Cloud'})
+
+    def test_expect_case_to_be_ignored_only_when_matching_is_case_insensitive(self):
+        self.assertEqual(KeywordMatcher(['aws', 'google cloud']).find_keywords(self.content), set())
+        self.assertEqual(
+            KeywordMatcher(['aws', 'google cloud'], case_sensitive=False).find_keywords(self.content),
+            {'aws', 'google cloud'}
+        )
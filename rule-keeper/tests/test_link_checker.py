@@ -0,0 +1,158 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from link_checker import LinkCheckCache, LinkChecker, find_external_links
+from post import PostData
+from tokens import tokenize
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self.server.requests.append((self.command, self.path, self.client_address[1], time.monotonic()))
+        if self.path == '/head-not-allowed':
+            self.respond(405)
+        elif self.path == '/missing':
+            self.respond(404)
+        elif self.path == '/slow':
+            time.sleep(0.5)
+            self.respond(200)
+        else:
+            self.respond(200)
+
+    def do_GET(self):
+        self.server.requests.append((self.command, self.path, self.client_address[1], time.monotonic()))
+        self.respond(200)
+
+    def respond(self, status: int):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFindLinks(unittest.TestCase):
+    def test_expect_external_links_outside_of_code_blocks_to_be_found(self):
+        self.assertEqual(find_external_links(tokenize([
+            'See [the docs](https://example.com/docs "Docs") and [wiki](https://en.wikipedia.org/wiki/Foo_(bar)).\n',
+            'Local [post]({% post_url 2020-01-01-post %}) and <https://example.com/auto>\n',
+            '[reference]: https://example.com/reference\n',
+            '```\n',
+            '[in code](https://example.com/code)\n',
+            '```\n',
+            'Again [the docs](https://example.com/docs)\n',
+        ])), [
+            'https://example.com/docs',
+            'https://en.wikipedia.org/wiki/Foo_(bar)',
+            'https://example.com/auto',
+            'https://example.com/reference',
+        ])
+
+
+class TestLinkChecker(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInRequestHandler)
+        self.server.requests = []
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.cache_filepath = os.path.join(self.temporary_directory.name, 'cache', 'links.ndjson')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temporary_directory.cleanup()
+
+    def create_post_data(self, *paths: str) -> PostData:
+        return PostData(
+            filename='2023-01-01-post.md',
+            content=['[link]({}{})\n'.format(self.base_url, path) for path in paths],
+            metadata={},
+        )
+
+    def test_expect_broken_links_to_be_reported(self):
+        link_checker = LinkChecker(requests_per_host_per_second=1000)
+
+        results = link_checker.check_links(self.create_post_data('/ok', '/missing', '/head-not-allowed'))
+        link_checker.close()
+
+        self.assertEqual(results, {'warnings': [
+            'Link {}/missing seems to be broken, it responded with HTTP status 404'.format(self.base_url)
+        ]})
+        self.assertIn(('GET', '/head-not-allowed'), [request[:2] for request in self.server.requests])
+
+    def test_expect_timed_out_links_to_be_reported(self):
+        link_checker = LinkChecker(timeout=0.1)
+
+        results = link_checker.check_links(self.create_post_data('/slow'))
+        link_checker.close()
+
+        self.assertEqual(results, {'warnings': [
+            'Link {}/slow could not be checked: timed out'.format(self.base_url)
+        ]})
+
+    def test_expect_connections_to_be_reused_and_limited_per_host(self):
+        link_checker = LinkChecker(connections_per_host=2, requests_per_host_per_second=1000)
+
+        link_checker.check_links(self.create_post_data(*['/ok{}'.format(number) for number in range(10)]))
+        link_checker.check_links(self.create_post_data(*['/again{}'.format(number) for number in range(10)]))
+        link_checker.close()
+
+        self.assertEqual(len(self.server.requests), 20)
+        self.assertLessEqual(len(set(request[2] for request in self.server.requests)), 2)
+
+    def test_expect_requests_to_be_rate_limited_per_host(self):
+        link_checker = LinkChecker(connections_per_host=4, requests_per_host_per_second=20)
+
+        link_checker.check_links(self.create_post_data('/first', '/second', '/third'))
+        link_checker.close()
+
+        request_times = sorted(request[3] for request in self.server.requests)
+        self.assertGreaterEqual(request_times[-1] - request_times[0], 0.09)
+
+    def test_expect_links_of_all_posts_to_be_requested_in_a_single_batch(self):
+        posts = {
+            '_posts/2023-01-01-first.md': self.create_post_data('/ok', '/first', '/second'),
+            '_posts/2023-01-02-second.md': self.create_post_data('/ok', '/third'),
+        }
+        data_extractor = mock.Mock()
+        data_extractor.extract_data.side_effect = posts.get
+        link_checker = LinkChecker(connections_per_host=2, requests_per_host_per_second=20)
+
+        link_checker.check_posts_links(data_extractor, list(posts) + ['_posts/image.png'])
+        request_times = sorted(request[3] for request in self.server.requests)
+        results = [link_checker.check_links(post_data) for post_data in posts.values()]
+        link_checker.close()
+
+        self.assertEqual(sorted(request[1] for request in self.server.requests), ['/first', '/ok', '/second', '/third'])
+        self.assertGreaterEqual(request_times[-1] - request_times[0], 0.14)
+        self.assertEqual(results, [{}, {}])
+
+    def test_expect_cached_results_to_be_used_until_they_expire(self):
+        link_checker = LinkChecker(LinkCheckCache(self.cache_filepath), requests_per_host_per_second=1000)
+        link_checker.check_links(self.create_post_data('/ok', '/missing'))
+        link_checker.close()
+        self.assertEqual(len(self.server.requests), 2)
+
+        cache = LinkCheckCache(self.cache_filepath)
+        cache.load()
+        link_checker = LinkChecker(cache)
+        results = link_checker.check_links(self.create_post_data('/ok', '/missing'))
+        link_checker.close()
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(len(results['warnings']), 1)
+
+        expired_cache = LinkCheckCache(self.cache_filepath, time_to_live=0)
+        expired_cache.load()
+        link_checker = LinkChecker(expired_cache)
+        link_checker.check_links(self.create_post_data('/ok', '/missing'))
+        link_checker.close()
+        self.assertEqual(len(self.server.requests), 4)
@@ -0,0 +1,261 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from json import loads
+from unittest import mock
+from benchmarks.corpus import generate_corpus
+from main import cache_directory, find_cache_directory, parse_arguments
+
+rule_keeper_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+run_main_script = '''
+import sys
+sys.path.insert(0, {!r})
+from main import main
+exit_code = main(sys.argv[1:])
+print(sorted(module for module in ['git', 'yaml', 'jellyfish'] if module in sys.modules))
+sys.exit(exit_code)
+'''.format(rule_keeper_directory)
+# Watcher saves given posts one by one and reports each of them as changed, instead of waiting for changes
+run_watch_script = '''
+import sys
+sys.path.insert(0, {!r})
+import watcher
+from main import main
+
+def save_posts(posts_watcher):
+    for filepath, content in zip(sys.argv[1::2], sys.argv[2::2]):
+        with open(filepath, 'w') as file:
+            file.write(content)
+        posts_watcher.on_posts_changed([filepath])
+
+watcher.PostsWatcher.run = save_posts
+sys.exit(main(['check-branch', '--watch']))
+'''.format(rule_keeper_directory)
+
+
+class TestParseArguments(unittest.TestCase):
+    def test_expect_branch_to_be_checked_without_command(self):
+        self.assertEqual(parse_arguments([]).command, 'check-branch')
+        self.assertEqual(parse_arguments(['--workers', '2']).workers, 2)
+
+    def test_expect_commands_to_be_parsed(self):
+        self.assertEqual(parse_arguments(['check-files', '_posts/a.md', '_posts/b.md']).files, [
+            '_posts/a.md', '_posts/b.md'
+        ])
+        self.assertEqual(parse_arguments(['audit', '--revision', 'HEAD']).revision, 'HEAD')
+        self.assertEqual(parse_arguments(['check-branch']).base, 'master')
+
+    def test_expect_report_format_to_be_parsed(self):
+        self.assertEqual(parse_arguments([]).report, 'text')
+        arguments = parse_arguments(['audit', '--report', 'sarif', '--report-output', 'results.sarif'])
+        self.assertEqual(arguments.report, 'sarif')
+        self.assertEqual(arguments.report_output, 'results.sarif')
+        with self.assertRaises(SystemExit), redirect_stderr(StringIO()):
+            parse_arguments(['check-branch', '--watch', '--report', 'ndjson'])
+
+    def test_expect_refs_to_be_parsed_with_base(self):
+        arguments = parse_arguments(['check-refs', 'feature', 'master..other', '--base', 'main'])
+
+        self.assertEqual(arguments.refs, ['feature', 'master..other'])
+        self.assertEqual(arguments.base, 'main')
+
+
+class TestFindCacheDirectory(unittest.TestCase):
+    def test_expect_cache_of_read_only_checkout_to_be_kept_in_cache_directory_of_user(self):
+        make_directories = os.makedirs
+
+        def make_writable_directories(directory: str, exist_ok: bool = False) -> None:
+            if directory == cache_directory:
+                raise OSError(30, 'Read-only file system')
+            make_directories(directory, exist_ok=exist_ok)
+
+        with tempfile.TemporaryDirectory() as user_cache_directory, \
+                mock.patch.dict(os.environ, {'XDG_CACHE_HOME': user_cache_directory}), \
+                mock.patch('os.makedirs', side_effect=make_writable_directories):
+            site_cache_directory = find_cache_directory()
+
+            self.assertTrue(site_cache_directory.startswith(os.path.join(user_cache_directory, 'rule-keeper')))
+            self.assertTrue(os.path.isdir(site_cache_directory))
+            self.assertEqual(find_cache_directory(), site_cache_directory)
+
+
+class TestMain(unittest.TestCase):
+    def run_main(self, corpus_directory: str, *arguments: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, '-c', run_main_script, *arguments], cwd=corpus_directory, capture_output=True, text=True
+        )
+
+    def test_expect_quick_exit_without_heavy_imports_when_no_posts_changed(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+
+            completed_process = self.run_main(corpus_directory, 'check-branch', '--revision', 'master')
+
+            self.assertEqual(completed_process.returncode, 0, completed_process.stderr)
+            self.assertEqual(completed_process.stdout, 'There was no files to check\n[]\n')
+
+    def test_expect_empty_report_when_no_posts_changed(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+
+            sarif_process = self.run_main(corpus_directory, 'check-branch', '--revision', 'master', '--report', 'sarif')
+            ndjson_process = self.run_main(corpus_directory, 'check-staged', '--report', 'ndjson')
+
+            self.assertEqual(sarif_process.returncode, 0, sarif_process.stderr)
+            self.assertEqual(loads(sarif_process.stdout.splitlines()[0])['runs'][0]['results'], [])
+            self.assertIn('There was no files to check', sarif_process.stderr)
+            self.assertEqual(ndjson_process.returncode, 0, ndjson_process.stderr)
+            self.assertEqual(ndjson_process.stdout.splitlines()[:-1], [])
+            self.assertIn('There was no files to check', ndjson_process.stderr)
+
+    def test_expect_changed_posts_to_be_checked(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+
+            completed_process = self.run_main(corpus_directory)
+
+            self.assertEqual(completed_process.returncode, 0, completed_process.stderr)
+            self.assertIn('2030-01-01-new-post-0.md', completed_process.stdout)
+            self.assertIn("'git'", completed_process.stdout)
+
+    def test_expect_given_files_to_be_checked(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+            with open(os.path.join(corpus_directory, '_posts', 'no-date.md'), 'w') as file:
+                file.write('---\ntitle: No date\ntags:\n- Test\n---\nContent\n')
+
+            completed_process = self.run_main(corpus_directory, 'check-files', './_posts/no-date.md')
+
+            self.assertEqual(completed_process.returncode, 1, completed_process.stderr)
+            self.assertIn('Filename must start with a date', completed_process.stdout)
+
+    def test_expect_single_error_line_when_given_post_does_not_exist(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+
+            completed_process = self.run_main(corpus_directory, 'check-files', '_posts/nonexist.md')
+
+            self.assertEqual(completed_process.returncode, 1, completed_process.stderr)
+            self.assertEqual(completed_process.stdout.splitlines()[0], 'No such file: _posts/nonexist.md')
+            self.assertNotIn('Traceback', completed_process.stderr)
+
+    def test_expect_only_staged_posts_to_be_checked(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+
+            completed_process = self.run_main(corpus_directory, 'check-staged')
+
+            self.assertEqual(completed_process.returncode, 0, completed_process.stderr)
+            self.assertEqual(completed_process.stdout, 'There was no files to check\n[]\n')
+
+            with open(os.path.join(corpus_directory, '_posts', 'staged.md'), 'w') as file:
+                file.write('---\ntitle: Staged\ntags:\n- Test\n---\nContent\n')
+            with open(os.path.join(corpus_directory, '_posts', 'not-staged.md'), 'w') as file:
+                file.write('---\ntitle: Not staged\ntags:\n- Test\n---\nContent\n')
+            subprocess.run(['git', 'add', '_posts/staged.md'], cwd=corpus_directory, check=True)
+
+            completed_process = self.run_main(corpus_directory, 'check-staged')
+
+            self.assertEqual(completed_process.returncode, 1, completed_process.stderr)
+            self.assertIn('staged.md', completed_process.stdout)
+            self.assertIn('Filename must start with a date', completed_process.stdout)
+            self.assertNotIn('not-staged.md', completed_process.stdout)
+
+    def test_expect_every_ref_to_be_checked_in_single_run(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+
+            completed_process = self.run_main(corpus_directory, 'check-refs', 'feature', 'master', 'missing')
+
+            self.assertEqual(completed_process.returncode, 1, completed_process.stderr)
+            self.assertIn('Checking feature compared to master', completed_process.stdout)
+            self.assertIn('2030-01-01-new-post-0.md', completed_process.stdout)
+            self.assertIn('feature: 2 posts checked', completed_process.stdout)
+            self.assertIn('master: 0 posts checked, no errors', completed_process.stdout)
+            self.assertIn('missing: Revision master or missing does not exist', completed_process.stdout)
+
+    def test_expect_single_error_line_when_base_does_not_exist(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+
+            for arguments, error in [
+                (('check-branch', '--base', 'missing'), 'Revision missing or HEAD does not exist'),
+                (('check-refs', 'feature', '--base', 'missing'), 'Revision missing or missing does not exist'),
+            ]:
+                completed_process = self.run_main(corpus_directory, *arguments)
+
+                self.assertEqual(completed_process.returncode, 1, completed_process.stderr)
+                self.assertEqual(completed_process.stdout.splitlines()[0], error)
+                self.assertNotIn('Traceback', completed_process.stderr)
+
+    def test_expect_assets_to_be_found_from_checked_revision(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+            git_command = ['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com']
+            subprocess.run(
+                [*git_command, 'checkout', '-q', '-b', 'withimg', 'master'], cwd=corpus_directory, check=True
+            )
+            os.makedirs(os.path.join(corpus_directory, 'img', 'newpost'))
+            with open(os.path.join(corpus_directory, 'img', 'newpost', 'a.png'), 'wb') as file:
+                file.write(b'image')
+            with open(os.path.join(corpus_directory, '_posts', '2030-02-01-with-image.md'), 'w') as file:
+                file.write('---\ntitle: With image\ntags:\n- Test\n---\n![image](/img/newpost/a.png)\n')
+            subprocess.run([*git_command, 'add', '.'], cwd=corpus_directory, check=True)
+            subprocess.run([*git_command, 'commit', '-q', '-m', 'Add image'], cwd=corpus_directory, check=True)
+            subprocess.run([*git_command, 'checkout', '-q', 'feature'], cwd=corpus_directory, check=True)
+
+            for arguments in [('check-refs', 'withimg'), ('check-branch', '--revision', 'withimg')]:
+                completed_process = self.run_main(corpus_directory, *arguments)
+
+                self.assertEqual(completed_process.returncode, 0, completed_process.stdout)
+                self.assertNotIn('does not exist', completed_process.stdout)
+
+    def test_expect_watching_to_go_on_after_invalid_post_is_saved(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+
+            completed_process = subprocess.run([
+                sys.executable, '-c', run_watch_script,
+                '_posts/2030-02-01-invalid.md', '---\ntitle: Invalid\ntags: [a\n---\nContent\n',
+                '_posts/no-date.md', '---\ntitle: No date\ntags:\n- Test\n---\nContent\n',
+            ], cwd=corpus_directory, capture_output=True, text=True)
+
+            self.assertEqual(completed_process.returncode, 0, completed_process.stderr)
+            self.assertIn('Checks results for file: _posts/2030-02-01-invalid.md', completed_process.stdout)
+            self.assertIn('Checked _posts/2030-02-01-invalid.md in', completed_process.stdout)
+            self.assertIn('Filename must start with a date', completed_process.stdout)
+            self.assertIn('Checked _posts/no-date.md in', completed_process.stdout)
+
+    def test_expect_posts_which_can_not_be_parsed_to_be_reported_by_audit(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+            with open(os.path.join(corpus_directory, '_posts', '2030-02-01-invalid.md'), 'w') as file:
+                file.write('---\ntitle: Invalid\ntags: [a\n---\nContent\n')
+
+            completed_process = self.run_main(corpus_directory, 'audit', '--report', 'ndjson')
+
+            self.assertEqual(completed_process.returncode, 1, completed_process.stderr)
+            self.assertIn({
+                'filepath': '_posts/2030-02-01-invalid.md', 'rule': 'post_data_extractor', 'severity': 'error',
+                'message': 'File _posts/2030-02-01-invalid.md metadata could not be parsed. Metadata might be invalid.',
+            }, [loads(line) for line in completed_process.stdout.splitlines()[:-1]])
+
+    def test_expect_only_report_to_be_written_to_stdout(self):
+        with tempfile.TemporaryDirectory() as corpus_directory:
+            generate_corpus(corpus_directory, posts_count=3, tags_count=10, paragraphs=1, changed_posts_count=1)
+            with open(os.path.join(corpus_directory, '_posts', 'no-date.md'), 'w') as file:
+                file.write('---\ntitle: No date\ntags:\n- Test\n---\nContent\n')
+
+            completed_process = self.run_main(
+                corpus_directory, 'check-files', '_posts/no-date.md', '_posts/missing.txt', '--report', 'ndjson'
+            )
+
+            self.assertEqual(completed_process.returncode, 1, completed_process.stderr)
+            self.assertIn({
+                'filepath': '_posts/no-date.md', 'rule': 'filename_starts_with_a_date', 'severity': 'error',
+                'message': 'Filename must start with a date',
+            }, [loads(line) for line in completed_process.stdout.splitlines()[:-1]])
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from permalinks import PermalinkChecker, PermalinkIndex, find_post_links
+from post import PostData
+
+
+class TestFindPostLinks(unittest.TestCase):
+    def test_expect_links_to_posts_of_the_site_to_be_found(self):
+        self.assertEqual(find_post_links([
+            'See [codetasting](/2012/12/13/codetasting.html)\n',
+            'and [spaces](https://dev.solita.fi/java/2016/05/13/spaces.html)\n',
+            'Also [extensionless](/2012/11/23/codecamp)\n',
+            'and [other site](https://example.com/2012/12/13/codetasting.html)\n',
+            '<a href="{{ site.baseurl }}/2013/01/02/html-link.html#heading">HTML</a> {% post_url 2014-02-03-tag %}\n',
+            '[reference]: /2015/03/04/reference.html\n',
+        ]), [
+            ('/2012/12/13/codetasting.html', '/2012/12/13/codetasting'),
+            ('/java/2016/05/13/spaces.html', '/2016/05/13/spaces'),
+            ('/2012/11/23/codecamp', '/2012/11/23/codecamp'),
+            ('/2013/01/02/html-link.html', '/2013/01/02/html-link'),
+            ('2014-02-03-tag', '/2014/02/03/tag'),
+            ('/2015/03/04/reference.html', '/2015/03/04/reference'),
+        ])
+
+
+class TestPermalinkChecker(unittest.TestCase):
+    def setUp(self):
+        self.permalink_index = PermalinkIndex(['_posts/2012-12-13-codetasting.md', '_posts/2020-01-01-new-name.md'])
+        self.permalink_checker = PermalinkChecker(self.permalink_index)
+
+    def check_links(self, *lines: str):
+        return self.permalink_checker.check_links(PostData(filename='2023-01-01-post.md', content=lines, metadata={}))
+
+    def test_expect_links_to_existing_posts_to_pass(self):
+        self.assertEqual(self.check_links('[codetasting](/2012/12/13/codetasting.html)\n'), {})
+
+    def test_expect_links_to_missing_posts_to_be_reported(self):
+        self.assertEqual(self.check_links('[codetasting](/2012/12/14/codetasting.html)\n'), {'errors': [
+            'Link /2012/12/14/codetasting.html points to a post which does not exist'
+        ]})
+
+    def test_expect_links_to_renamed_posts_to_be_reported_with_new_permalink(self):
+        self.permalink_index.rename('_posts/2020-01-01-old-name.md', '_posts/2020-01-01-new-name.md')
+
+        self.assertEqual(self.check_links('[old](/2020/01/01/old-name.html) [new](/2020/01/01/new-name.html)\n'), {
+            'errors': [
+                'Link /2020/01/01/old-name.html points to a post which was renamed, link to /2020/01/01/new-name.html '
+                'instead'
+            ]
+        })
+
+    def test_expect_index_to_be_updated_for_added_and_removed_posts(self):
+        with tempfile.TemporaryDirectory() as posts_directory:
+            added_filepath = os.path.join(posts_directory, '2021-02-03-added.md')
+            with open(added_filepath, 'w') as file:
+                file.write('---\n---\n')
+
+            self.permalink_index.update([added_filepath, os.path.join(posts_directory, '2012-12-13-codetasting.md')])
+
+        self.assertEqual(self.permalink_index.find_post('/2021/02/03/added'), added_filepath)
+        self.assertEqual(self.permalink_index.find_post('/2012/12/13/codetasting'), '_posts/2012-12-13-codetasting.md')
+
+    def test_expect_index_to_be_reset_for_other_posts(self):
+        self.permalink_index.rename('_posts/2020-01-01-first.md', '_posts/2020-01-01-renamed.md')
+
+        self.permalink_index.reset(['_posts/2021-02-02-other.md'])
+
+        self.assertEqual(self.permalink_index.find_post('/2021/02/02/other'), '_posts/2021-02-02-other.md')
+        self.assertIsNone(self.permalink_index.find_post('/2020/01/01/renamed'))
+        self.assertEqual(self.permalink_index.renamed_permalinks, {})
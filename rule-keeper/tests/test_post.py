@@ -1,6 +1,13 @@
 import os
+import subprocess
+import tempfile
 import unittest
-from post import PostDataExtractor, PostData
+from io import StringIO
+from unittest import mock
+from post import (
+    PostDataExtractor, PostData, PostContent, LazyPostContent, GitPostsRepository, GitPostDataExtractor,
+    StagedPostsRepository,
+)
 from yaml.scanner import ScannerError
 
 
@@ -41,6 +48,48 @@ class TestPostDataExtractor(unittest.TestCase):
 
         self.assertSequenceEqual(self.post_data_extractor.extract_data(file_to_process), expected_post_data)
 
+    def test_expect_to_extract_only_metadata_from_valid_post_file(self):
+        file_to_process = 'tests/fixtures/2023-03-13-valid-post.md'
+
+        self.assertEqual(
+            self.post_data_extractor.extract_metadata(file_to_process),
+            {
+                'layout': 'post',
+                'title': 'Test Valid Post',
+                'author': 'andrzejw',
+                'excerpt': 'Some valid post',
+                'tags': ['Test', 'Nothing special']
+            }
+        )
+
+    def test_expect_lazy_content_to_be_read_only_when_accessed(self):
+        file_to_process = 'tests/fixtures/2023-03-13-valid-post.md'
+        expected_post_data = self.post_data_extractor.extract_data(file_to_process)
+
+        post_data = PostDataExtractor(lazy_content=True).extract_data(file_to_process)
+
+        self.assertIsInstance(post_data.content, LazyPostContent)
+        self.assertIsNone(post_data.content.lines)
+        self.assertEqual(post_data.metadata, expected_post_data.metadata)
+        self.assertEqual(post_data.content, expected_post_data.content)
+        self.assertEqual(post_data.content[5], expected_post_data.content[5])
+
+    def test_expect_same_data_when_parsing_simple_front_matter(self):
+        file_to_process = 'tests/fixtures/2023-03-13-valid-post.md'
+
+        self.assertEqual(
+            PostDataExtractor(simple_front_matter=True).extract_data(file_to_process),
+            self.post_data_extractor.extract_data(file_to_process)
+        )
+
+    def test_expect_same_errors_when_parsing_simple_front_matter(self):
+        post_data_extractor = PostDataExtractor(simple_front_matter=True)
+
+        with self.assertRaisesRegex(RuntimeError, 'metadata could not be parsed. Metadata might be invalid.'):
+            post_data_extractor.extract_data('tests/fixtures/2023-03-13-invalid-metadata-post.md')
+        with self.assertRaisesRegex(RuntimeError, 'metadata could not be parsed. File does not seem to close metadata'):
+            post_data_extractor.extract_data('tests/fixtures/2023-03-13-not-closed-metadata-post.md')
+
     def test_expect_error_when_metadata_section_is_invalid_yaml(self):
         file_to_process = 'tests/fixtures/2023-03-13-invalid-metadata-post.md'
 
@@ -53,8 +102,220 @@ class TestPostDataExtractor(unittest.TestCase):
         with self.assertRaisesRegex(RuntimeError, 'metadata could not be parsed. File does not seem to close metadata'):
             self.post_data_extractor.extract_data(file_to_process)
 
+    def test_expect_error_when_only_metadata_is_extracted_and_metadata_is_not_closed(self):
+        file_to_process = 'tests/fixtures/2023-03-13-not-closed-metadata-post.md'
+
+        with self.assertRaisesRegex(RuntimeError, 'metadata could not be parsed. File does not seem to close metadata'):
+            self.post_data_extractor.extract_metadata(file_to_process)
+
     def test_expect_error_when_file_dont_start_with_metadata(self):
         file_to_process = 'tests/fixtures/2023-03-13-not-starting-with-metadata-post.md'
 
         with self.assertRaisesRegex(RuntimeError, 'does not have starting metadata section in first line'):
             self.post_data_extractor.extract_data(file_to_process)
+
+
+class TestPostContent(unittest.TestCase):
+    def test_expect_lines_to_be_stripped_when_accessed(self):
+        content = PostContent('  First line\n\nThird line  \r\n\tLast line')
+
+        self.assertEqual(len(content), 4)
+        self.assertEqual(content[0], 'First line')
+        self.assertEqual(content[-1], 'Last line')
+        self.assertEqual(content[1:3], ['', 'Third line'])
+        self.assertEqual(list(content), ['First line', '', 'Third line', 'Last line'])
+        with self.assertRaises(IndexError):
+            content[4]
+
+    def test_expect_same_lines_as_when_reading_file_line_by_line(self):
+        for text in ['', 'Line', 'Line\n', 'Line\n\n', '\n', 'Line\n  ']:
+            lines = [line.strip() for line in StringIO(text)]
+
+            self.assertEqual(PostContent(text), lines)
+            self.assertEqual(len(PostContent(text)), len(lines))
+            self.assertEqual([PostContent(text)[index] for index in range(len(lines))], lines)
+
+
+class TestGitPostDataExtractor(unittest.TestCase):
+    post_template = '---\nlayout: post\ntitle: {}\ntags:\n- {}\n---\nContent of {}\n'
+
+    def setUp(self) -> None:
+        self.repository_directory = tempfile.TemporaryDirectory()
+        self.git('init', '-q', '-b', 'master')
+        self.commit_post('2020-01-01-first.md', self.post_template.format('First', 'Tag1', 'first'))
+        self.git('checkout', '-q', '-b', 'feature')
+        self.commit_post('2020-01-01-first.md', self.post_template.format('First', 'Tag2', 'first'))
+        self.commit_post('2020-01-02-second.md', self.post_template.format('Second', 'Tag3', 'second'))
+        self.commit_post('2020-01-03-copy.md', self.post_template.format('Second', 'Tag3', 'second'))
+        self.git('checkout', '-q', 'master')
+        self.posts_repository = GitPostsRepository(self.repository_directory.name, '_posts/', 'feature')
+        self.post_data_extractor = GitPostDataExtractor(self.posts_repository)
+
+    def tearDown(self) -> None:
+        self.repository_directory.cleanup()
+
+    def git(self, *arguments: str) -> None:
+        subprocess.run(
+            ['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *arguments],
+            cwd=self.repository_directory.name, check=True, capture_output=True
+        )
+
+    def commit_post(self, filename: str, content: str) -> None:
+        os.makedirs(os.path.join(self.repository_directory.name, '_posts'), exist_ok=True)
+        with open(os.path.join(self.repository_directory.name, '_posts', filename), 'w') as file:
+            file.write(content)
+        self.git('add', '.')
+        self.git('commit', '-q', '-m', filename)
+
+    def test_expect_changed_posts_to_be_found_in_revision_which_is_not_checked_out(self):
+        self.assertEqual(self.posts_repository.find_new_posts_identifiers(), [
+            '_posts/2020-01-02-second.md', '_posts/2020-01-03-copy.md'
+        ])
+        self.assertEqual(self.posts_repository.find_modified_posts_identifiers(), ['_posts/2020-01-01-first.md'])
+
+    def test_expect_post_data_to_be_read_from_revision_which_is_not_checked_out(self):
+        post_data = self.post_data_extractor.extract_data('_posts/2020-01-01-first.md')
+
+        self.assertEqual(post_data, PostData(
+            filename='2020-01-01-first.md',
+            content=['Content of first'],
+            metadata={'layout': 'post', 'title': 'First', 'tags': ['Tag2']},
+        ))
+        self.assertEqual(
+            self.post_data_extractor.extract_metadata('_posts/2020-01-01-first.md'),
+            {'layout': 'post', 'title': 'First', 'tags': ['Tag2']}
+        )
+
+    def test_expect_posts_with_identical_content_to_be_read_once(self):
+        with mock.patch.object(self.posts_repository, 'read_blob', wraps=self.posts_repository.read_blob) as read_blob:
+            second_post_data = self.post_data_extractor.extract_data('_posts/2020-01-02-second.md')
+            copied_post_data = self.post_data_extractor.extract_data('_posts/2020-01-03-copy.md')
+
+        read_blob.assert_called_once()
+        self.assertEqual(copied_post_data.filename, '2020-01-03-copy.md')
+        self.assertEqual(copied_post_data.metadata, second_post_data.metadata)
+
+    def test_expect_only_recently_read_posts_to_be_kept(self):
+        post_data_extractor = GitPostDataExtractor(self.posts_repository, cached_posts_count=1)
+
+        post_data_extractor.extract_data('_posts/2020-01-01-first.md')
+        post_data_extractor.extract_data('_posts/2020-01-02-second.md')
+        with mock.patch.object(self.posts_repository, 'read_blob', wraps=self.posts_repository.read_blob) as read_blob:
+            post_data_extractor.extract_data('_posts/2020-01-03-copy.md')
+            post_data = post_data_extractor.extract_data('_posts/2020-01-01-first.md')
+
+        read_blob.assert_called_once()
+        self.assertEqual(post_data.metadata['tags'], ['Tag2'])
+        self.assertEqual(len(post_data_extractor.posts_data), 1)
+        self.assertEqual(len(post_data_extractor.posts_metadata), 1)
+
+    def test_expect_error_when_post_does_not_exist_in_revision(self):
+        with self.assertRaisesRegex(RuntimeError, 'does not exist in revision feature'):
+            self.post_data_extractor.extract_data('_posts/2020-01-04-missing.md')
+
+    def test_expect_renamed_posts_to_be_found(self):
+        self.git('checkout', '-q', '-b', 'renaming')
+        self.git('mv', '_posts/2020-01-01-first.md', '_posts/2020-01-01-renamed.md')
+        self.git('commit', '-q', '-m', 'Rename')
+
+        posts_repository = GitPostsRepository(self.repository_directory.name, '_posts/', 'renaming')
+
+        self.assertEqual(posts_repository.find_renamed_posts_identifiers(), [
+            ('_posts/2020-01-01-first.md', '_posts/2020-01-01-renamed.md')
+        ])
+
+    def test_expect_revisions_to_be_resolved_from_ranges(self):
+        self.assertEqual(self.posts_repository.resolve_revision_range('feature', 'main'), ('feature', 'main'))
+        self.assertEqual(self.posts_repository.resolve_revision_range('master..feature'), ('feature', 'master'))
+        merge_base = self.posts_repository.open_repository().commit('master').hexsha
+        self.assertEqual(self.posts_repository.resolve_revision_range('master...feature'), ('feature', merge_base))
+
+    def test_expect_posts_read_for_previous_revision_to_be_reused_after_selecting_another(self):
+        self.git('checkout', '-q', '-b', 'other', 'feature')
+        self.commit_post('2020-01-04-fourth.md', self.post_template.format('Fourth', 'Tag4', 'fourth'))
+        self.post_data_extractor.extract_data('_posts/2020-01-02-second.md')
+
+        self.posts_repository.select_revision('other')
+
+        self.assertEqual(self.posts_repository.find_new_posts_identifiers(), [
+            '_posts/2020-01-02-second.md', '_posts/2020-01-03-copy.md', '_posts/2020-01-04-fourth.md'
+        ])
+        with mock.patch.object(self.posts_repository, 'read_blob', wraps=self.posts_repository.read_blob) as read_blob:
+            self.post_data_extractor.extract_data('_posts/2020-01-02-second.md')
+            fourth_post_data = self.post_data_extractor.extract_data('_posts/2020-01-04-fourth.md')
+
+        read_blob.assert_called_once()
+        self.assertEqual(fourth_post_data.metadata['tags'], ['Tag4'])
+
+    def test_expect_error_when_selected_revision_does_not_exist(self):
+        with self.assertRaisesRegex(RuntimeError, 'Revision master or missing does not exist'):
+            self.posts_repository.select_revision('missing')
+
+        self.assertEqual(self.posts_repository.revision, 'feature')
+
+    def test_expect_error_when_selected_revision_has_no_posts(self):
+        self.git('checkout', '-q', '--orphan', 'empty')
+        self.git('rm', '-q', '-r', '--cached', '_posts')
+        self.git('commit', '-q', '--allow-empty', '-m', 'Empty')
+        self.posts_repository.select_revision('empty')
+
+        with self.assertRaisesRegex(RuntimeError, 'Directory _posts does not exist in revision empty'):
+            self.posts_repository.find_all_posts_identifiers()
+
+    def test_expect_staged_posts_to_be_read_from_index_instead_of_working_tree(self):
+        self.git('checkout', '-q', 'feature')
+        self.git('mv', '_posts/2020-01-01-first.md', '_posts/2020-01-01-renamed.md')
+        staged_filepath = os.path.join(self.repository_directory.name, '_posts', '2020-01-04-staged.md')
+        with open(staged_filepath, 'w') as file:
+            file.write(self.post_template.format('Staged', 'Tag4', 'staged'))
+        self.git('add', '_posts/2020-01-04-staged.md')
+        with open(staged_filepath, 'a') as file:
+            file.write('Not staged\n')
+
+        posts_repository = StagedPostsRepository(self.repository_directory.name, '_posts/')
+        post_data = GitPostDataExtractor(posts_repository).extract_data('_posts/2020-01-04-staged.md')
+
+        self.assertEqual(posts_repository.find_new_posts_identifiers(), ['_posts/2020-01-04-staged.md'])
+        self.assertEqual(posts_repository.find_renamed_posts_identifiers(), [
+            ('_posts/2020-01-01-first.md', '_posts/2020-01-01-renamed.md')
+        ])
+        self.assertEqual(post_data.content, ['Content of staged'])
+        self.assertEqual(
+            posts_repository.find_file_blob_sha('_posts/2020-01-04-staged.md'),
+            posts_repository.find_post_blob_sha('_posts/2020-01-04-staged.md'),
+        )
+        self.assertEqual(sorted(posts_repository.find_all_posts_identifiers()), [
+            '_posts/2020-01-01-renamed.md', '_posts/2020-01-02-second.md', '_posts/2020-01-03-copy.md',
+            '_posts/2020-01-04-staged.md',
+        ])
+
+    def test_expect_files_of_site_to_be_listed_from_revision_and_index(self):
+        self.git('checkout', '-q', 'feature')
+        os.makedirs(os.path.join(self.repository_directory.name, 'img', 'post'))
+        with open(os.path.join(self.repository_directory.name, 'img', 'post', 'image.png'), 'wb') as file:
+            file.write(b'image')
+        self.git('add', 'img')
+
+        staged_files = StagedPostsRepository(self.repository_directory.name, '_posts/').list_files('img')
+        self.git('commit', '-q', '-m', 'Add image')
+        self.git('checkout', '-q', 'master')
+        self.posts_repository.select_revision('feature')
+
+        self.assertEqual(self.posts_repository.list_files('img'), staged_files)
+        self.assertEqual(list(staged_files), ['img/post/image.png'])
+        self.assertEqual(staged_files['img/post/image.png'][0], 5)
+        self.assertEqual(GitPostsRepository(self.repository_directory.name, '_posts/').list_files('img'), {})
+
+    def test_expect_other_files_of_site_to_be_read_from_revision(self):
+        self.git('checkout', '-q', 'feature')
+        with open(os.path.join(self.repository_directory.name, '_config.yml'), 'w') as file:
+            file.write('authors:\n  author1:\n')
+        self.git('add', '_config.yml')
+        self.git('commit', '-q', '-m', 'Add configuration')
+        self.git('checkout', '-q', 'master')
+        self.posts_repository.select_revision('feature')
+
+        with self.post_data_extractor.open_file('_config.yml') as file:
+            self.assertEqual(file.read(), 'authors:\n  author1:\n')
+        with self.assertRaisesRegex(RuntimeError, 'File _missing.yml does not exist in revision feature'):
+            self.post_data_extractor.fingerprint('_missing.yml')
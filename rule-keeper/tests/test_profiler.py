@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+from profiler import Profiler
+from rule_keeper import RuleKeeper
+
+
+class TestProfiler(unittest.TestCase):
+    def test_expect_calls_and_time_to_be_recorded_per_phase(self):
+        profiler = Profiler()
+        profiler.record('extraction', 0.002)
+        profiler.record('extraction', 0.004)
+        with profiler.measure('printing'):
+            pass
+
+        report = profiler.report()
+
+        self.assertEqual(report['extraction']['calls'], 2)
+        self.assertAlmostEqual(report['extraction']['total_seconds'], 0.006)
+        self.assertAlmostEqual(report['extraction']['max_seconds'], 0.004)
+        self.assertEqual(report['printing']['calls'], 1)
+
+    def test_expect_rules_exceeding_time_budget_to_be_flagged(self):
+        profiler = Profiler(rule_time_budget=0.01)
+        profiler.record('rule:slow_rule', 0.02)
+        profiler.record('rule:slow_rule', 0.005)
+        profiler.record('rule:fast_rule', 0.005)
+        profiler.record('extraction', 0.02)
+
+        self.assertEqual(profiler.find_slow_rules(), ['slow_rule'])
+        self.assertIn('Rule slow_rule exceeded time budget of 10.0 ms in 1 of 2 calls', profiler.format_summary())
+
+    def test_expect_reports_to_be_merged(self):
+        worker_profiler = Profiler(rule_time_budget=0.01)
+        worker_profiler.record('rule:slow_rule', 0.02)
+        profiler = Profiler(rule_time_budget=0.01)
+        profiler.record('rule:slow_rule', 0.001)
+
+        profiler.merge(worker_profiler.report())
+
+        self.assertEqual(profiler.report()['rule:slow_rule'], {
+            'calls': 2, 'total_seconds': 0.021, 'max_seconds': 0.02, 'calls_over_budget': 1
+        })
+
+    def test_expect_reset_to_start_a_new_report(self):
+        profiler = Profiler()
+        profiler.record('extraction', 0.002)
+
+        profiler.reset()
+        profiler.record('printing', 0.001)
+
+        self.assertEqual(list(profiler.report()), ['printing'])
+
+
+def no_results(post_data) -> dict:
+    return {}
+
+
+class TestRuleKeeperProfiling(unittest.TestCase):
+    def test_expect_extraction_each_rule_and_printing_to_be_measured(self):
+        post_data_extractor_mock = mock.Mock()
+        profiler = Profiler()
+
+        RuleKeeper(post_data_extractor_mock, [no_results], mock.Mock(), profiler=profiler) \
+            .check_rules_for_files(['_posts/2020-01-01-first.md', '_posts/2020-01-02-second.md'])
+
+        self.assertEqual(
+            {phase_name: statistics['calls'] for phase_name, statistics in profiler.report().items()},
+            {'extraction': 2, 'rule:no_results': 2, 'printing': 2}
+        )
@@ -0,0 +1,76 @@
+import unittest
+from io import StringIO
+from json import loads
+from unittest import mock
+from reporters import NdjsonReporter, SarifReporter, SummaryReporter, create_reporter
+
+rules_results = [
+    ('filename_starts_with_a_date', {'errors': ['Filename must start with a date']}),
+    ('KeyTagsRecommender.recommend_tags', {'recommendations': ['Following tags would be recommended: Clojure']}),
+    ('AssetChecker.check_assets', {}),
+]
+
+
+class TestNdjsonReporter(unittest.TestCase):
+    def test_expect_json_line_per_result_with_rule_severity_and_file(self):
+        stream = StringIO()
+        reporter = NdjsonReporter(stream)
+
+        reporter.report('_posts/post.md', rules_results)
+        reporter.close()
+
+        self.assertEqual([loads(line) for line in stream.getvalue().splitlines()], [
+            {'filepath': '_posts/post.md', 'rule': 'filename_starts_with_a_date', 'severity': 'error',
+             'message': 'Filename must start with a date'},
+            {'filepath': '_posts/post.md', 'rule': 'KeyTagsRecommender.recommend_tags', 'severity': 'recommendation',
+             'message': 'Following tags would be recommended: Clojure'},
+        ])
+
+    def test_expect_results_to_be_written_in_batches(self):
+        stream = mock.Mock()
+        reporter = NdjsonReporter(stream, buffer_size=4)
+
+        for post_number in range(5):
+            reporter.report('_posts/post{}.md'.format(post_number), rules_results)
+
+        self.assertEqual(stream.write.call_count, 2)
+        reporter.close()
+        self.assertEqual(stream.write.call_count, 3)
+        self.assertEqual(sum(call.args[0].count('\n') for call in stream.write.call_args_list), 10)
+
+
+class TestSarifReporter(unittest.TestCase):
+    def test_expect_single_sarif_document_with_all_results(self):
+        stream = StringIO()
+        reporter = SarifReporter(stream)
+
+        reporter.report('_posts/post1.md', rules_results)
+        reporter.report('_posts/post2.md', rules_results[1:])
+        reporter.close()
+
+        sarif_log = loads(stream.getvalue())
+        self.assertEqual(sarif_log['version'], '2.1.0')
+        self.assertEqual(sarif_log['runs'][0]['tool']['driver']['rules'], [
+            {'id': 'filename_starts_with_a_date'}, {'id': 'KeyTagsRecommender.recommend_tags'}
+        ])
+        self.assertEqual(
+            [(result['ruleIndex'], result['level']) for result in sarif_log['runs'][0]['results']],
+            [(0, 'error'), (1, 'note'), (1, 'note')]
+        )
+        self.assertEqual(
+            sarif_log['runs'][0]['results'][2]['locations'][0]['physicalLocation']['artifactLocation']['uri'],
+            '_posts/post2.md'
+        )
+
+
+class TestSummaryReporter(unittest.TestCase):
+    def test_expect_only_counts_of_results_to_be_written(self):
+        stream = StringIO()
+        reporter = create_reporter('summary', stream)
+
+        reporter.report('_posts/post1.md', rules_results)
+        self.assertEqual(stream.getvalue(), '')
+        reporter.close()
+
+        self.assertIsInstance(reporter, SummaryReporter)
+        self.assertTrue(stream.getvalue().startswith('Audited 1 posts, 1 of them with errors'))
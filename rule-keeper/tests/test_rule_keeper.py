@@ -1,5 +1,20 @@
+import os
+import tempfile
 from unittest import TestCase, mock
-from rule_keeper import RuleKeeper
+from post import PostDataExtractor, PostData
+from rule_keeper import CONTENT, CORPUS, FILENAME, METADATA, RuleKeeper, RuleCheckResults, RulesResults, requires
+from tokens import tokenize
+
+
+def report_title(post_data: PostData) -> RuleCheckResults:
+    return {'recommendations': [post_data.metadata['title']]}
+
+
+def fail_on_odd_number(post_data: PostData) -> RuleCheckResults:
+    if int(post_data.metadata['title'].split(' ')[-1]) % 2:
+        return {'errors': ['Odd number']}
+
+    return {}
 
 
 class TestRuleKeeper(TestCase):
@@ -17,7 +32,12 @@ class TestRuleKeeper(TestCase):
 
         self.post_data_extractor_mock = mock.Mock()
         self.post_data_extractor_mock.extract_data = mock.MagicMock(
-            side_effect=lambda filepath: type('obj', (object,), {'metadata': {'tags': self.existing_tags[filepath]}})
+            side_effect=lambda filepath: PostData(
+                filename=filepath, content=[], metadata={'tags': self.existing_tags[filepath], 'title': 'Title'}
+            )
+        )
+        self.post_data_extractor_mock.extract_metadata = mock.MagicMock(
+            side_effect=lambda filepath: {'tags': self.existing_tags[filepath], 'title': 'Title'}
         )
         self.printer = mock.Mock()
 
@@ -27,11 +47,18 @@ class TestRuleKeeper(TestCase):
         RuleKeeper(self.post_data_extractor_mock, [], self.printer) \
             .check_rules_for_files([self.filename1, self.filename2, self.filename3])
 
-        self.post_data_extractor_mock.extract_data.assert_has_calls(
+        self.post_data_extractor_mock.extract_metadata.assert_has_calls(
             [mock.call(self.filename1), mock.call(self.filename2)])
 
         with self.assertRaises(AssertionError):
-            self.post_data_extractor_mock.extract_data.assert_has_calls([mock.call(self.filename3)])
+            self.post_data_extractor_mock.extract_metadata.assert_has_calls([mock.call(self.filename3)])
+
+    def test_expect_to_tell_when_no_files_are_given_even_as_generator(self):
+        for files_to_check in [[], (filepath for filepath in [self.filename3])]:
+            with mock.patch('builtins.print') as print_mock:
+                RuleKeeper(self.post_data_extractor_mock, [], self.printer).check_rules_for_files(files_to_check)
+
+            print_mock.assert_called_once_with('There was no files to check')
 
     def test_expect_all_results_to_be_merged_and_grouped_by_type_when_passing_to_printer(self):
         RuleKeeper(
@@ -65,3 +92,155 @@ class TestRuleKeeper(TestCase):
             self.printer
         ).check_rules_for_files([self.filename1, self.filename2]))
 
+    def test_expect_results_of_each_rule_to_be_passed_to_listener(self):
+        rules_results_listener = mock.Mock()
+
+        RuleKeeper(
+            self.post_data_extractor_mock,
+            [report_title, lambda post_data: {'warnings': ['Warning1']}],
+            self.printer,
+            rules_results_listener=rules_results_listener,
+        ).check_rules_for_files([self.filename1])
+
+        rules_results_listener.assert_called_once_with(self.filename1, [
+            ('report_title', {'recommendations': ['Title']}),
+            ('TestRuleKeeper.test_expect_results_of_each_rule_to_be_passed_to_listener.<locals>.<lambda>',
+             {'warnings': ['Warning1']}),
+        ])
+
+    def test_expect_extraction_errors_to_be_reported_as_errors_when_enabled(self):
+        self.post_data_extractor_mock.extract_metadata = mock.MagicMock(side_effect=RuntimeError('Invalid metadata'))
+
+        self.assertTrue(
+            RuleKeeper(self.post_data_extractor_mock, [], self.printer, report_extraction_errors=True)
+            .check_rules_for_files([self.filename1])
+        )
+        self.printer.assert_called_once_with(
+            self.filename1, {'errors': ['Invalid metadata'], 'warnings': [], 'recommendations': []}
+        )
+
+
+class TestRuleKeeperInParallel(TestCase):
+    def setUp(self) -> None:
+        self.posts_directory = tempfile.TemporaryDirectory()
+        self.filepaths = []
+        for number in range(6):
+            filepath = os.path.join(self.posts_directory.name, '2020-01-0{}-post.md'.format(number + 1))
+            with open(filepath, 'w') as file:
+                file.write('---\nlayout: post\ntitle: Post {}\n---\nContent\n'.format(number))
+            self.filepaths.append(filepath)
+
+    def tearDown(self) -> None:
+        self.posts_directory.cleanup()
+
+    def check_files(self, workers: int, rule_checkers: list) -> tuple[bool, list]:
+        printer = mock.Mock()
+        error_found = RuleKeeper(PostDataExtractor(), rule_checkers, printer, workers=workers) \
+            .check_rules_for_files(self.filepaths)
+
+        return error_found, printer.call_args_list
+
+    def test_expect_results_to_be_printed_in_order_of_files_when_checked_in_parallel(self):
+        self.assertEqual(
+            self.check_files(workers=3, rule_checkers=[report_title]),
+            self.check_files(workers=1, rule_checkers=[report_title])
+        )
+
+    def test_expect_content_to_be_tokenized_once_for_all_checkers(self):
+        tokens = []
+        rule_checkers = [lambda post_data: tokens.append(post_data.tokens) or {}] * 2
+
+        with mock.patch('rule_keeper.tokenize', wraps=tokenize) as tokenize_mock:
+            self.check_files(workers=1, rule_checkers=rule_checkers)
+
+        self.assertEqual(tokenize_mock.call_count, len(self.filepaths))
+        self.assertIs(tokens[0], tokens[1])
+        self.assertEqual(tokens[0].words, ['Content'])
+
+    def test_expect_files_to_be_streamed_through_pool(self):
+        rules_results_listener = mock.Mock()
+        rule_keeper = RuleKeeper(PostDataExtractor(), [report_title], mock.Mock(), workers=2,
+                                 rules_results_listener=rules_results_listener)
+        rule_keeper.files_per_worker_task = 1
+
+        rule_keeper.check_rules_for_files(filepath for filepath in self.filepaths)
+
+        self.assertEqual([call.args[0] for call in rules_results_listener.call_args_list], self.filepaths)
+
+    def test_expect_to_return_true_when_any_checker_returns_error_in_parallel(self):
+        error_found, printer_calls = self.check_files(workers=3, rule_checkers=[report_title, fail_on_odd_number])
+
+        self.assertTrue(error_found)
+        self.assertEqual([call.args[0] for call in printer_calls], self.filepaths)
+
+
+class TestRuleKeeperScheduling(TestCase):
+    filename = '_posts/post.md'
+
+    def setUp(self) -> None:
+        self.post_data_extractor_mock = mock.Mock()
+        self.post_data_extractor_mock.extract_metadata = mock.MagicMock(return_value={'title': 'Title'})
+        self.post_data_extractor_mock.extract_data = mock.MagicMock(
+            side_effect=lambda filepath: PostData(filename='post.md', content=['Content'], metadata={'title': 'Title'})
+        )
+        self.checked_rules = []
+
+        @requires(FILENAME)
+        def check_filename(post_data: PostData) -> RuleCheckResults:
+            self.checked_rules.append('filename')
+            return {'errors': ['Filename must start with a date']}
+
+        @requires(METADATA)
+        def check_title(post_data: PostData) -> RuleCheckResults:
+            self.checked_rules.append('metadata')
+            return {'warnings': [post_data.metadata['title']]}
+
+        @requires(CONTENT, CORPUS)
+        def check_content(post_data: PostData) -> RuleCheckResults:
+            self.checked_rules.append('content')
+            return {'recommendations': post_data.find_tokens().words}
+
+        self.check_filename = check_filename
+        self.check_title = check_title
+        self.check_content = check_content
+
+    def check_file(self, rule_checkers: list, fail_fast: bool = False) -> RulesResults:
+        return RuleKeeper(self.post_data_extractor_mock, rule_checkers, mock.Mock(), fail_fast=fail_fast) \
+            .check_file(self.filename)
+
+    def test_expect_cheap_checkers_to_be_run_first(self):
+        rules_results = self.check_file([self.check_content, self.check_title, self.check_filename])
+
+        self.assertEqual(self.checked_rules, ['filename', 'metadata', 'content'])
+        self.assertEqual([checker_results for rule_name, checker_results in rules_results], [
+            {'errors': ['Filename must start with a date']}, {'warnings': ['Title']}, {'recommendations': ['Content']},
+        ])
+        self.post_data_extractor_mock.extract_data.assert_called_once_with(self.filename)
+        self.post_data_extractor_mock.extract_metadata.assert_not_called()
+
+    def test_expect_content_not_to_be_read_when_only_metadata_is_required(self):
+        self.check_file([self.check_title, self.check_filename])
+
+        self.post_data_extractor_mock.extract_metadata.assert_called_once_with(self.filename)
+        self.post_data_extractor_mock.extract_data.assert_not_called()
+
+    def test_expect_post_not_to_be_read_after_filename_error_when_failing_fast(self):
+        rules_results = self.check_file([self.check_content, self.check_title, self.check_filename], fail_fast=True)
+
+        self.assertEqual(self.checked_rules, ['filename'])
+        self.assertEqual(len(rules_results), 1)
+        self.post_data_extractor_mock.extract_metadata.assert_not_called()
+        self.post_data_extractor_mock.extract_data.assert_not_called()
+
+    def test_expect_metadata_to_be_validated_when_no_checker_reads_it(self):
+        self.post_data_extractor_mock.extract_metadata.side_effect = RuntimeError('Invalid metadata')
+
+        rules_results = RuleKeeper(
+            self.post_data_extractor_mock, [self.check_filename], mock.Mock(), report_extraction_errors=True
+        ).check_file(self.filename)
+
+        self.assertEqual(rules_results[-1], ('post_data_extractor', {'errors': ['Invalid metadata']}))
+
+    def test_expect_unknown_requirements_to_be_rejected(self):
+        with self.assertRaises(ValueError):
+            requires('database')
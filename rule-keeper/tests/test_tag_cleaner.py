@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from tag_cleaner import TagCleaner, find_singular_form, load_canonical_tags, save_canonical_tags
+
+
+class TestTagCleaner(unittest.TestCase):
+    def setUp(self):
+        self.tag_cleaner = TagCleaner()
+        self.tag_cleaner.add_tags(['Microservices', 'Kubernetes', 'Python', 'C#', 'C++', 'Java 11'])
+        self.tag_cleaner.add_tags(['Microservice', 'Kubernets', 'python', 'C', 'Java 14'])
+        self.tag_cleaner.add_tags(['Microservices', 'Kubernetes', 'Python', 'Front End', 'Frontend', 'Frontend', None])
+
+    def test_expect_case_plural_separator_and_spelling_variants_to_be_clustered(self):
+        self.assertEqual(self.tag_cleaner.find_clusters(), [
+            ['Frontend', 'Front End'],
+            ['Kubernetes', 'Kubernets'],
+            ['Microservices', 'Microservice'],
+            ['Python', 'python'],
+        ])
+
+    def test_expect_most_used_tag_to_be_canonical(self):
+        self.assertEqual(self.tag_cleaner.build_canonical_tags(), {
+            'Front End': 'Frontend',
+            'Kubernets': 'Kubernetes',
+            'Microservice': 'Microservices',
+            'python': 'Python',
+        })
+
+    def test_expect_canonical_tags_to_be_stored_and_loaded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'canonical_tags.json')
+            self.assertEqual(load_canonical_tags(filepath), {})
+
+            save_canonical_tags(filepath, self.tag_cleaner.build_canonical_tags())
+
+            self.assertEqual(load_canonical_tags(filepath), self.tag_cleaner.build_canonical_tags())
+
+    def test_expect_singular_forms_of_plurals(self):
+        for tag, singular_form in [
+            ('libraries', 'library'), ('patches', 'patch'), ('boxes', 'box'), ('tests', 'test'), ('aws', 'aws'),
+            ('kubernetes', 'kubernete'), ('class', 'class'), ('status', 'status'), ('analysis', 'analysis'),
+        ]:
+            self.assertEqual(find_singular_form(tag), singular_form)
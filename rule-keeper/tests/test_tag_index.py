@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from json import dump
+from unittest import mock
+from tag_index import TagIndex
+
+
+class TestTagIndex(unittest.TestCase):
+    filename1 = '_posts/2020-01-01-file1.md'
+    filename2 = '_posts/2021-01-01-file1.md'
+
+    existing_tags: dict[str, list[str]] = {}
+    fingerprints: dict[str, str] = {}
+
+    def setUp(self) -> None:
+        self.existing_tags = {
+            self.filename1: ['tag1', 'tag2', 'tag3'],
+            self.filename2: ['tag4', 'tag5', 'tag6'],
+        }
+        self.fingerprints = {self.filename1: '1:10', self.filename2: '2:20'}
+        self.post_data_extractor_mock = mock.Mock()
+        self.post_data_extractor_mock.extract_metadata = mock.MagicMock(
+            side_effect=lambda filepath: {'tags': self.existing_tags[filepath]}
+        )
+        self.cache_directory = tempfile.TemporaryDirectory()
+        self.cache_filepath = os.path.join(self.cache_directory.name, 'tag_index.json')
+
+    def tearDown(self) -> None:
+        self.cache_directory.cleanup()
+
+    def create_tag_index(self) -> TagIndex:
+        tag_index = TagIndex(
+            self.post_data_extractor_mock,
+            self.cache_filepath,
+            fingerprint=lambda filepath: self.fingerprints[filepath],
+        )
+        tag_index.load()
+        return tag_index
+
+    def test_expect_all_tags_from_processed_files_to_be_combined(self):
+        self.assertEqual(
+            self.create_tag_index().find_existing_tags([self.filename1, self.filename2]),
+            self.existing_tags[self.filename1] + self.existing_tags[self.filename2]
+        )
+
+    def test_expect_posts_which_can_not_be_parsed_to_be_left_out(self):
+        self.post_data_extractor_mock.extract_metadata.side_effect = lambda filepath: (
+            {'tags': self.existing_tags[filepath]} if filepath == self.filename2 else self.raise_parsing_error()
+        )
+        tag_index = self.create_tag_index()
+
+        self.assertEqual(tag_index.find_existing_tags([self.filename1, self.filename2]), ['tag4', 'tag5', 'tag6'])
+        self.assertNotIn(self.filename1, tag_index.entries)
+
+    def raise_parsing_error(self):
+        raise RuntimeError('File metadata could not be parsed. Metadata might be invalid.')
+
+    def test_expect_unchanged_posts_to_be_read_from_cache(self):
+        tag_index = self.create_tag_index()
+        tag_index.find_existing_tags([self.filename1, self.filename2])
+        tag_index.save()
+        self.post_data_extractor_mock.extract_metadata.reset_mock()
+
+        tags = self.create_tag_index().find_existing_tags([self.filename1, self.filename2])
+
+        self.assertEqual(tags, self.existing_tags[self.filename1] + self.existing_tags[self.filename2])
+        self.post_data_extractor_mock.extract_metadata.assert_not_called()
+
+    def test_expect_only_changed_posts_to_be_parsed_again(self):
+        tag_index = self.create_tag_index()
+        tag_index.find_existing_tags([self.filename1, self.filename2])
+        tag_index.save()
+        self.post_data_extractor_mock.extract_metadata.reset_mock()
+        self.fingerprints[self.filename2] = '3:30'
+        self.existing_tags[self.filename2] = ['tag7']
+
+        tags = self.create_tag_index().find_existing_tags([self.filename1, self.filename2])
+
+        self.assertEqual(tags, self.existing_tags[self.filename1] + ['tag7'])
+        self.post_data_extractor_mock.extract_metadata.assert_called_once_with(self.filename2)
+
+    def test_expect_cache_in_different_format_version_to_be_ignored(self):
+        with open(self.cache_filepath, 'w') as file:
+            dump({'version': TagIndex.FORMAT_VERSION + 1, 'posts': {
+                self.filename1: {'fingerprint': '1:10', 'tags': ['outdated']}
+            }}, file)
+
+        tags = self.create_tag_index().find_existing_tags([self.filename1])
+
+        self.assertEqual(tags, self.existing_tags[self.filename1])
+
+    def test_expect_corrupted_cache_to_be_ignored(self):
+        with open(self.cache_filepath, 'w') as file:
+            file.write('{"version": 1, "posts": ')
+
+        tags = self.create_tag_index().find_existing_tags([self.filename1])
+
+        self.assertEqual(tags, self.existing_tags[self.filename1])
+
+    def test_expect_removed_posts_to_be_dropped_from_cache(self):
+        tag_index = self.create_tag_index()
+        tag_index.find_existing_tags([self.filename1, self.filename2])
+        tag_index.retain([self.filename1])
+
+        self.assertEqual(list(tag_index.entries.keys()), [self.filename1])
@@ -1,6 +1,7 @@
 import unittest
 from unittest import mock
-from tag_recommender import find_existing_tags, ExistingTagsRecommender, KeyTagsRecommender
+import jellyfish
+from tag_recommender import ExistingTagsRecommender, KeyTagsRecommender, TagSimilarityIndex
 from rule_keeper import RuleCheckResults
 from post import PostData
 
@@ -65,6 +66,41 @@ class TestKeyTagsrecommender(unittest.TestCase):
         self.assertNotIn('recommendations', result)
 
 
+    def test_expect_multi_word_key_tag_to_be_recommended(self):
+        key_tags_recommender = KeyTagsRecommender(['Azure', 'Google Cloud'])
+        post_data = PostData(
+            filename='some-file.md', content=['Deploying to Google', 'Cloud Run'], metadata={'tags': ['Azure']}
+        )
+        result = key_tags_recommender.recommend_tags(post_data)
+        self.assertIn('recommendations', result)
+        self.assertIn('Google Cloud', result['recommendations'][0])
+
+    def test_expect_key_tag_not_to_be_recommended_from_code_or_link_addresses(self):
+        key_tags_recommender = KeyTagsRecommender(['Azure', 'AWS'])
+        post_data = PostData(filename='some-file.md', content=[
+            'Read [the guide](https://docs.aws.amazon.com/AWS/guide)',
+            '{% highlight java %}',
+            'Azure azure = new Azure();',
+            '{% endhighlight %}',
+        ], metadata={})
+        result = key_tags_recommender.recommend_tags(post_data)
+        self.assertNotIn('recommendations', result)
+
+    def test_expect_key_tag_case_to_be_ignored_when_matching_is_case_insensitive(self):
+        key_tags_recommender = KeyTagsRecommender(['Azure', 'AWS'], case_sensitive=False)
+        post_data = PostData(filename='some-file.md', content=self.content, metadata={'tags': ['azure']})
+        result = key_tags_recommender.recommend_tags(post_data)
+        self.assertIn('recommendations', result)
+        self.assertIn('AWS', result['recommendations'][0])
+        self.assertNotIn('Azure', result['recommendations'][0])
+
+    def test_expect_key_tag_not_to_be_recommended_when_its_variant_is_used(self):
+        key_tags_recommender = KeyTagsRecommender(['Azure'], canonical_tags={'azure': 'Azure'})
+        post_data = PostData(filename='some-file.md', content=self.content, metadata={'tags': ['azure']})
+        result = key_tags_recommender.recommend_tags(post_data)
+        self.assertNotIn('recommendations', result)
+
+
 class TestExistingTagsrecommender(unittest.TestCase):
     def setUp(self) -> None:
         self.existing_tags_recommender = ExistingTagsRecommender({'Software development', 'Low-code', 'JavaScript'})
@@ -105,6 +141,20 @@ class TestExistingTagsrecommender(unittest.TestCase):
         result = self.existing_tags_recommender.recommend_tags(post_data)
         self.assertNotIn('recommendations', result)
 
+    def test_expect_canonical_tag_recommended_for_variants(self):
+        existing_tags_recommender = ExistingTagsRecommender(
+            {'Low-code', 'Low Code', 'Javascript'}, canonical_tags={'Low Code': 'Low-code', 'Javascript': 'JavaScript'}
+        )
+        post_data = PostData(
+            filename='some-file.md', content=[], metadata={'tags': ['Low Code', 'lowcode', 'javascrip']}
+        )
+        result = existing_tags_recommender.recommend_tags(post_data)
+        self.assertEqual(result['recommendations'], [
+            'Tag "Low Code" is a variant of tag "Low-code". Consider changing it to the canonical one',
+            'Tag "lowcode" looks similar to existing tag "Low-code". Consider changing it to the existing one',
+            'Tag "javascrip" looks similar to existing tag "JavaScript". Consider changing it to the existing one',
+        ])
+
     def all_matches_found(self, result: RuleCheckResults, matches: dict[str, str]) -> bool:
         matches_found = []
         for key, value in matches.items():
@@ -116,29 +166,48 @@ class TestExistingTagsrecommender(unittest.TestCase):
         return all(matches_found) and len(matches_found) == len(matches)
 
 
-class TestFindExistingTags(unittest.TestCase):
-    filename1 = '_posts/2020-01-01-file1.md'
-    filename2 = '_posts/2021-01-01-file1.md'
-
-    existing_tags: dict[str, list[str]] = {}
-
-    def setUp(self) -> None:
-        self.existing_tags = {
-            self.filename1: ['tag1', 'tag2', 'tag3'],
-            self.filename2: ['tag4', 'tag5', 'tag6'],
-        }
-        self.post_data_extractor_mock = mock.Mock()
-        self.post_data_extractor_mock.extract_data = mock.MagicMock(
-            side_effect=lambda filepath: type('obj', (object,), {'metadata': {'tags': self.existing_tags[filepath]}})
-        )
-
-    def test_expect_all_tags_from_processed_files_to_be_combined(self):
-        expected_result_tags = self.existing_tags[self.filename1] + self.existing_tags[self.filename2]
+class TestTagSimilarityIndex(unittest.TestCase):
+    existing_tags = [
+        'Low-code', 'low-code', 'JavaScript', 'Javascript', 'Java', 'Software development', 'Softwre development',
+        'AWS', 'Azure', 'Kubernetes', 'Kubernets', 'K8s', 'Machine learning', 'Machine-learning', 'a', '', None,
+    ]
 
-        self.assertEqual(
-            find_existing_tags(
-                self.post_data_extractor_mock,
-                [self.filename1, self.filename2]
-            ),
-            expected_result_tags
-        )
+    def find_similar_tags_by_comparing_all_pairs(self, new_tag: str) -> list[str]:
+        similar_tags = []
+        for existing_tag in self.existing_tags:
+            if not existing_tag:
+                continue
+            similarity = jellyfish.jaro_similarity(new_tag.lower(), existing_tag.lower())
+            if similarity >= 0.90 and (similarity != 1 or existing_tag != new_tag):
+                similar_tags.append(existing_tag)
+
+        return similar_tags
+
+    def test_expect_same_similar_tags_as_comparing_all_pairs(self):
+        similarity_index = TagSimilarityIndex(self.existing_tags)
+
+        for new_tag in ['lowcode', 'Low-Code', 'javascript', 'Jav', 'Kubernetes', 'machine learnin', 'a', 'A', 'AWZ']:
+            self.assertEqual(
+                similarity_index.find_similar_tags(new_tag),
+                self.find_similar_tags_by_comparing_all_pairs(new_tag),
+                'Similar tags differ for tag "{}"'.format(new_tag)
+            )
+
+    def test_expect_similar_pairs_to_be_found_once(self):
+        unique_tags = [tag for tag in self.existing_tags if tag]
+        similarity_index = TagSimilarityIndex(unique_tags)
+
+        self.assertEqual(sorted(similarity_index.find_similar_pairs()), sorted(
+            (tag, other_tag)
+            for position, tag in enumerate(unique_tags)
+            for other_tag in unique_tags[position + 1:]
+            if jellyfish.jaro_similarity(tag.lower(), other_tag.lower()) >= 0.90
+        ))
+
+    def test_expect_similarity_scores_to_be_memoized(self):
+        similarity_index = TagSimilarityIndex(self.existing_tags)
+        similarity_index.find_similar_tags('lowcode')
+
+        with mock.patch('jellyfish.jaro_similarity') as jaro_similarity:
+            similarity_index.find_similar_tags('lowcode')
+            jaro_similarity.assert_not_called()
@@ -0,0 +1,50 @@
+import unittest
+from tokens import CodeBlock, Link, tokenize
+
+
+class TestTokenize(unittest.TestCase):
+    content = [
+        '# Deploying with **AWS** and [Terraform](https://www.terraform.io/docs "Docs")',
+        '{% highlight java %}',
+        'Azure client = new Azure();',
+        '{% endhighlight %}',
+        '```python',
+        'import kubernetes',
+        '```',
+        '![Architecture on GCP](/img/2020/architecture.png) and <img src="/img/logo.png">',
+        '[reference]: https://example.com/reference',
+        'Written in C# and snake_case by <a href="/2020/01/01/post.html">others</a>',
+    ]
+
+    def test_expect_code_blocks_of_fences_and_highlight_tags_to_be_found(self):
+        post_tokens = tokenize(self.content)
+
+        self.assertEqual(post_tokens.code_blocks, [CodeBlock('java', 1, 3), CodeBlock('python', 4, 6)])
+        self.assertEqual(post_tokens.text_lines[1:7], [''] * 6)
+        self.assertEqual(len(post_tokens.text_lines), len(self.content))
+
+    def test_expect_links_and_images_outside_of_code_blocks_to_be_found(self):
+        post_tokens = tokenize(self.content)
+
+        self.assertEqual(post_tokens.links, [
+            Link('https://www.terraform.io/docs', 'Terraform', 0),
+            Link('https://example.com/reference', 'reference', 8),
+            Link('/2020/01/01/post.html', '', 9),
+        ])
+        self.assertEqual(post_tokens.images, [
+            Link('/img/2020/architecture.png', 'Architecture on GCP', 7),
+            Link('/img/logo.png', '', 7),
+        ])
+
+    def test_expect_words_without_markdown_syntax_and_code(self):
+        post_tokens = tokenize(self.content)
+
+        self.assertEqual(post_tokens.words, [
+            'Deploying', 'with', 'AWS', 'and', 'Terraform', 'Architecture', 'on', 'GCP', 'and',
+            'Written', 'in', 'C#', 'and', 'snake_case', 'by', 'others',
+        ])
+        self.assertEqual(post_tokens.plain_lines[0], 'Deploying with AWS and  Terraform')
+        self.assertNotIn('Azure', post_tokens.word_set)
+
+    def test_expect_unclosed_code_block_to_continue_until_end(self):
+        self.assertEqual(tokenize(['Text', '```', 'code']).code_blocks, [CodeBlock('', 1, 2)])
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from watcher import InotifyChangeSource, PollingChangeSource, PostsWatcher
+
+
+class TestChangeSources(unittest.TestCase):
+    def setUp(self) -> None:
+        self.posts_directory = tempfile.TemporaryDirectory()
+        self.existing_post = os.path.join(self.posts_directory.name, '2020-01-01-existing.md')
+        self.write_file(self.existing_post, 'Existing post')
+
+    def tearDown(self) -> None:
+        self.posts_directory.cleanup()
+
+    def write_file(self, filepath: str, content: str) -> None:
+        with open(filepath, 'w') as file:
+            file.write(content)
+
+    def assert_changes_detected(self, change_source) -> None:
+        new_post = os.path.join(self.posts_directory.name, '2020-01-02-new.md')
+        self.write_file(self.existing_post, 'Existing post with more content')
+        self.write_file(new_post, 'New post')
+
+        self.assertEqual(change_source.wait_for_changes(timeout=1), {self.existing_post, new_post})
+        self.assertEqual(change_source.wait_for_changes(timeout=0), set())
+
+    def test_expect_polling_to_detect_new_and_modified_files(self):
+        self.assert_changes_detected(PollingChangeSource(self.posts_directory.name, interval=0.01))
+
+    def test_expect_inotify_to_detect_new_and_modified_files(self):
+        try:
+            change_source = InotifyChangeSource(self.posts_directory.name)
+        except (OSError, AttributeError):
+            self.skipTest('inotify is not available')
+
+        try:
+            self.assert_changes_detected(change_source)
+        finally:
+            change_source.close()
+
+
+class TestPostsWatcher(unittest.TestCase):
+    def test_expect_only_existing_markdown_files_to_be_passed_to_checker(self):
+        with tempfile.TemporaryDirectory() as posts_directory:
+            post_filepath = os.path.join(posts_directory, '2020-01-01-post.md')
+            with open(post_filepath, 'w') as file:
+                file.write('Post')
+            change_source = mock.Mock()
+            change_source.wait_for_changes = mock.MagicMock(return_value={
+                post_filepath,
+                os.path.join(posts_directory, '.2020-01-01-post.md.swp'),
+                os.path.join(posts_directory, '2020-01-02-removed.md'),
+            })
+            on_posts_changed = mock.Mock()
+
+            PostsWatcher(change_source, on_posts_changed).watch_once()
+
+            on_posts_changed.assert_called_once_with([post_filepath])
@@ -0,0 +1,140 @@
+from typing import Iterable, NamedTuple
+import re
+
+code_fence_pattern = re.compile(r'^ {0,3}(```+|~~~+)\s*([\w+#.-]*)')
+highlight_start_pattern = re.compile(r'\{%-?\s*highlight\s+([\w+#.-]+)[^%]*-?%\}')
+highlight_end_pattern = re.compile(r'\{%-?\s*endhighlight\s*-?%\}')
+inline_link_pattern = re.compile(
+    r'(?:(!?)\[([^\[\]]*))?\]\(\s*<?((?:[^()\s<>]|\([^()\s<>]*\))+)>?(?:\s+"[^"]*")?\s*\)?'
+)
+reference_definition_pattern = re.compile(r'^ {0,3}\[([^\]]+)\]:\s*<?([^\s>]+)>?.*$')
+autolink_pattern = re.compile(r'<(https?://[^\s<>]+)>')
+html_link_pattern = re.compile(r'<a\s[^>]*?href=["\']([^"\']+)["\'][^>]*>', re.IGNORECASE)
+html_image_pattern = re.compile(r'<(?:img|source|video|audio)\s[^>]*?src=["\']([^"\']+)["\'][^>]*>', re.IGNORECASE)
+html_tag_pattern = re.compile(r'</?[a-zA-Z][^>]*>')
+liquid_pattern = re.compile(r'\{%.*?%\}|\{\{.*?\}\}')
+emphasis_pattern = re.compile(r'(?<!\w)[*_~`]+|[*_~`]+(?!\w)')
+word_pattern = re.compile(r'[^\W_]\w*(?:[+#]+(?!\w))?')
+
+
+class Link(NamedTuple):
+    url: str
+    text: str
+    line_number: int
+
+
+class CodeBlock(NamedTuple):
+    language: str
+    start_line_number: int
+    end_line_number: int
+
+
+class PostTokens(NamedTuple):
+    # Lines of code blocks are left empty, so line numbers of all lines match the content
+    text_lines: list[str]
+    plain_lines: list[str]
+    words: list[str]
+    word_set: frozenset[str]
+    links: list[Link]
+    images: list[Link]
+    code_blocks: list[CodeBlock]
+
+
+def find_code_blocks(lines: list[str]) -> list[CodeBlock]:
+    code_blocks = []
+    closing_pattern = None
+    start_line_number = 0
+    language = ''
+
+    for line_number, line in enumerate(lines):
+        if closing_pattern is None:
+            fence_match = code_fence_pattern.match(line)
+            highlight_match = highlight_start_pattern.search(line) if fence_match is None else None
+            if fence_match is not None:
+                closing_pattern = re.compile(r'^ {0,3}' + re.escape(fence_match.group(1)))
+                language = fence_match.group(2)
+            elif highlight_match is not None:
+                closing_pattern = highlight_end_pattern
+                language = highlight_match.group(1)
+                # Short snippets may be highlighted within a single line
+                if highlight_end_pattern.search(line, highlight_match.end()):
+                    code_blocks.append(CodeBlock(language, line_number, line_number))
+                    closing_pattern = None
+                    continue
+            else:
+                continue
+            start_line_number = line_number
+        elif closing_pattern.search(line):
+            code_blocks.append(CodeBlock(language, start_line_number, line_number))
+            closing_pattern = None
+
+    # Unclosed block continues until the end of the post
+    if closing_pattern is not None:
+        code_blocks.append(CodeBlock(language, start_line_number, len(lines) - 1))
+
+    return code_blocks
+
+
+def tokenize_line(line: str, line_number: int, links: list[Link], images: list[Link]) -> str:
+    reference_match = reference_definition_pattern.match(line)
+    if reference_match is not None:
+        links.append(Link(reference_match.group(2), reference_match.group(1), line_number))
+        return ''
+
+    # Only texts of links and images are kept, so that addresses and markup do not look like words of the post
+    if '](' in line:
+        plain_parts = []
+        position = 0
+        for link_match in inline_link_pattern.finditer(line):
+            (images if link_match.group(1) else links).append(
+                Link(link_match.group(3), link_match.group(2) or '', line_number)
+            )
+            plain_parts.extend([line[position:link_match.start()], ' ', link_match.group(2) or '', ' '])
+            position = link_match.end()
+        line = ''.join(plain_parts) + line[position:]
+    if '<' in line:
+        links.extend(Link(url, url, line_number) for url in autolink_pattern.findall(line))
+        links.extend(Link(url, '', line_number) for url in html_link_pattern.findall(line))
+        images.extend(Link(url, '', line_number) for url in html_image_pattern.findall(line))
+        line = html_tag_pattern.sub(' ', autolink_pattern.sub(' ', line))
+    if '{' in line:
+        line = liquid_pattern.sub(' ', line)
+
+    line = line.lstrip('#>-+* ')
+    if '*' in line or '_' in line or '`' in line or '~' in line:
+        line = emphasis_pattern.sub('', line)
+
+    return line.strip()
+
+
+def tokenize(content: Iterable[str]) -> PostTokens:
+    lines = list(content)
+    code_blocks = find_code_blocks(lines)
+    text_lines = list(lines)
+    for code_block in code_blocks:
+        for line_number in range(code_block.start_line_number, code_block.end_line_number + 1):
+            text_lines[line_number] = ''
+
+    links = []
+    images = []
+    plain_lines = []
+    words = []
+
+    for line_number, line in enumerate(text_lines):
+        if not line:
+            plain_lines.append('')
+            continue
+
+        plain_line = tokenize_line(line, line_number, links, images)
+        plain_lines.append(plain_line)
+        words.extend(word_pattern.findall(plain_line))
+
+    return PostTokens(
+        text_lines=text_lines,
+        plain_lines=plain_lines,
+        words=words,
+        word_set=frozenset(words),
+        links=links,
+        images=images,
+        code_blocks=code_blocks,
+    )
@@ -1,8 +1,9 @@
 import re
-from rule_keeper import RuleCheckResults
+from rule_keeper import FILENAME, RuleCheckResults, requires
 from post import PostData
 
 
+@requires(FILENAME)
 def filename_starts_with_a_date(post_data: PostData) -> RuleCheckResults:
     if not re.search('^[0-9]{4}-[0-9]{2}-[0-9]{2}', post_data.filename):
         return {'errors': ['Filename must start with a date']}
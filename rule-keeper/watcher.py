@@ -0,0 +1,142 @@
+from ctypes import CDLL, get_errno
+from ctypes.util import find_library
+from select import select
+from struct import calcsize, unpack_from
+from typing import Callable
+import os
+import time
+
+
+class ChangeSource:
+    def wait_for_changes(self, timeout: float | None = None) -> set[str]:
+        pass
+
+
+class InotifyChangeSource(ChangeSource):
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    EVENT_HEADER_FORMAT = 'iIII'
+    EVENT_HEADER_SIZE = calcsize(EVENT_HEADER_FORMAT)
+
+    directory: str
+    debounce_time: float
+    file_descriptor: int
+
+    def __init__(self, directory: str, debounce_time: float = 0.02):
+        self.directory = directory
+        self.debounce_time = debounce_time
+
+        libc = CDLL(find_library('c') or 'libc.so.6', use_errno=True)
+        self.file_descriptor = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.file_descriptor < 0:
+            raise OSError(get_errno(), 'Could not initialize inotify')
+
+        # Editors often save by renaming a temporary file, so moves are watched next to finished writes
+        watch_descriptor = libc.inotify_add_watch(
+            self.file_descriptor, os.fsencode(directory), self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        )
+        if watch_descriptor < 0:
+            os.close(self.file_descriptor)
+            raise OSError(get_errno(), 'Could not watch directory {}'.format(directory))
+
+    def wait_for_changes(self, timeout: float | None = None) -> set[str]:
+        changed_filepaths = set()
+
+        readable, _, _ = select([self.file_descriptor], [], [], timeout)
+        # Saving a file triggers a burst of events, they are collected until the directory is quiet again
+        while readable:
+            changed_filepaths.update(self.read_events())
+            readable, _, _ = select([self.file_descriptor], [], [], self.debounce_time)
+
+        return changed_filepaths
+
+    def read_events(self) -> list[str]:
+        try:
+            events = os.read(self.file_descriptor, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        filepaths = []
+        offset = 0
+        while offset < len(events):
+            _, _, _, name_length = unpack_from(self.EVENT_HEADER_FORMAT, events, offset)
+            name_start = offset + self.EVENT_HEADER_SIZE
+            name = events[name_start:name_start + name_length].rstrip(b'\0')
+            if name:
+                filepaths.append(os.path.join(self.directory, os.fsdecode(name)))
+            offset = name_start + name_length
+
+        return filepaths
+
+    def close(self) -> None:
+        os.close(self.file_descriptor)
+
+
+class PollingChangeSource(ChangeSource):
+    directory: str
+    interval: float
+    snapshot: dict[str, tuple[int, int]]
+
+    def __init__(self, directory: str, interval: float = 0.1):
+        self.directory = directory
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    entry_stat = entry.stat()
+                    snapshot[os.path.join(self.directory, entry.name)] = (entry_stat.st_mtime_ns, entry_stat.st_size)
+
+        return snapshot
+
+    def wait_for_changes(self, timeout: float | None = None) -> set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            time.sleep(self.interval)
+            snapshot = self.take_snapshot()
+            changed_filepaths = {
+                filepath for filepath, signature in snapshot.items() if self.snapshot.get(filepath) != signature
+            }
+            self.snapshot = snapshot
+
+            if changed_filepaths or (deadline is not None and time.monotonic() >= deadline):
+                return changed_filepaths
+
+
+def create_change_source(directory: str) -> ChangeSource:
+    try:
+        return InotifyChangeSource(directory)
+    except (OSError, AttributeError):
+        # inotify is available only on Linux, other systems fall back to polling
+        return PollingChangeSource(directory)
+
+
+class PostsWatcher:
+    change_source: ChangeSource
+    on_posts_changed: Callable[[list[str]], None]
+
+    def __init__(self, change_source: ChangeSource, on_posts_changed: Callable[[list[str]], None]):
+        self.change_source = change_source
+        self.on_posts_changed = on_posts_changed
+
+    def watch_once(self, timeout: float | None = None) -> bool:
+        changed_posts = sorted(
+            filepath for filepath in self.change_source.wait_for_changes(timeout)
+            if filepath.endswith('.md') and os.path.isfile(filepath)
+        )
+
+        if changed_posts:
+            self.on_posts_changed(changed_posts)
+
+        return bool(changed_posts)
+
+    def run(self) -> None:
+        try:
+            while True:
+                self.watch_once()
+        except KeyboardInterrupt:
+            pass